@@ -0,0 +1,136 @@
+from abc import abstractmethod
+from statistics import mean, median, quantiles, stdev
+from time import perf_counter
+from typing import List
+
+from .case import TestCase
+
+
+class BenchmarkResult:
+    """
+    基准测试结果：时间均为单次迭代的耗时（单位秒），已扣除计时器开销。
+    """
+
+    def __init__(self, rounds: int, iterations: int, min_time: float, max_time: float, mean_time: float,
+                 median_time: float, stddev: float, outliers: int, timer_overhead: float):
+        """
+        :param rounds: 测量轮数
+        :param iterations: 每轮迭代次数
+        :param min_time: 最小值
+        :param max_time: 最大值
+        :param mean_time: 平均值
+        :param median_time: 中位数
+        :param stddev: 标准差
+        :param outliers: 离群轮数：超出[Q1 - 1.5 * IQR, Q3 + 1.5 * IQR]范围的轮数
+        :param timer_overhead: 单次计时的开销（单位秒）
+        """
+        self.rounds = rounds
+        self.iterations = iterations
+        self.min_time = min_time
+        self.max_time = max_time
+        self.mean_time = mean_time
+        self.median_time = median_time
+        self.stddev = stddev
+        self.outliers = outliers
+        self.timer_overhead = timer_overhead
+
+
+def measure_timer_overhead(samples: int = 1000) -> float:
+    """
+    测量计时器开销：取连续两次调用perf_counter()的最小间隔。
+    :param samples: 采样次数
+    :return: 单次计时的开销（单位秒）
+    """
+    timer = perf_counter
+    overhead = float('inf')
+    for _ in range(samples):
+        start = timer()
+        overhead = min(overhead, timer() - start)
+    return overhead
+
+
+def calculate_statistics(times: List[float], iterations: int, timer_overhead: float) -> BenchmarkResult:
+    """
+    计算基准测试的统计结果
+    :param times: 每轮的单次迭代耗时（单位秒）
+    :param iterations: 每轮迭代次数
+    :param timer_overhead: 单次计时的开销（单位秒）
+    :return:
+    """
+    if not times:
+        raise ValueError('没有基准测试的测量结果！')
+    outliers = 0
+    if len(times) >= 4:
+        q1, _, q3 = quantiles(times, n=4)
+        iqr = q3 - q1
+        outliers = sum(1 for item in times if item < q1 - 1.5 * iqr or item > q3 + 1.5 * iqr)
+    return BenchmarkResult(len(times), iterations, min(times), max(times), mean(times), median(times),
+                           stdev(times) if len(times) > 1 else 0.0, outliers, timer_overhead)
+
+
+class BenchmarkCase(TestCase):
+    """
+    基准测试用例抽象类：重写benchmark()方法编写被测代码，test_case()方法会先预热，再按校准的迭代次数测量多轮，
+    统计结果保存在benchmark_result属性中，并展示在HTML测试报告中。可配合@parameterized装饰器测试不同的输入规模。
+    """
+
+    warmup_rounds = 1  # 预热轮数
+    rounds = 10  # 测量轮数
+    iterations = None  # 每轮迭代次数，None-自动校准，使每轮耗时不少于min_round_time
+    min_round_time = 0.005  # 自动校准时每轮的最小耗时（单位秒）
+    max_median_time = None  # 单次迭代耗时中位数的上限（单位秒），超过时测试用例失败，None-不限制
+
+    @abstractmethod
+    def benchmark(self):
+        """
+        被测代码，每次迭代调用一次
+        :return:
+        """
+        pass
+
+    def test_case(self):
+        if self.rounds <= 0:
+            raise ValueError('测量轮数必须是正整数！')
+        timer_overhead = measure_timer_overhead()
+        iterations = self.iterations if self.iterations else self._calibrate()
+        if iterations <= 0:
+            raise ValueError('迭代次数必须是正整数！')
+        for _ in range(self.warmup_rounds):
+            self._run_round(iterations)
+        times = list()
+        for _ in range(self.rounds):
+            self.check_cancelled()
+            elapsed = self._run_round(iterations) - timer_overhead
+            times.append(max(elapsed, 0.0) / iterations)
+        self.benchmark_result = calculate_statistics(times, iterations, timer_overhead)
+        if self.max_median_time is not None:
+            assert self.benchmark_result.median_time <= self.max_median_time, \
+                f'单次迭代耗时的中位数{self.benchmark_result.median_time:.9f}秒超过上限{self.max_median_time}秒'
+
+    def _calibrate(self) -> int:
+        """
+        校准迭代次数：从1次开始成倍增加，直到单轮耗时不少于min_round_time。
+        :return: 每轮迭代次数
+        """
+        iterations = 1
+        while True:
+            elapsed = self._run_round(iterations)
+            if elapsed >= self.min_round_time:
+                return iterations
+            if elapsed <= 0:
+                iterations *= 10
+            else:  # 按已测得的耗时估算，最多放大10倍，避免单次测量误差导致迭代次数过多
+                iterations = max(iterations + 1, min(iterations * 10, int(iterations * self.min_round_time / elapsed)))
+
+    def _run_round(self, iterations: int) -> float:
+        """
+        执行一轮
+        :param iterations: 迭代次数
+        :return: 本轮耗时（单位秒）
+        """
+        benchmark = self.benchmark
+        timer = perf_counter
+        start = timer()
+        for _ in range(iterations):
+            benchmark()
+        return timer() - start
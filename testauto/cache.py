@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import sys
+from hashlib import sha256
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from .case import TestCase, TestCaseResult
+from .history import get_test_case_key
+
+
+class ResultCache:
+    """
+    测试结果缓存：记录执行成功的测试用例及其所在模块的内容哈希，模块内容和参数值均未变化的测试用例无需再次执行。
+    注意只有测试用例所在模块的内容参与计算哈希，被测代码或其它依赖发生变化时，需调用clear()使缓存失效。
+    """
+
+    def __init__(self, path: str = 'testauto-cache.db'):
+        """
+        :param path: 数据库文件路径
+        """
+        self.path = path
+        self._lock = Lock()
+        self._file_hashes: Dict[str, Tuple[int, int, str]] = dict()  # 文件路径：(修改时间, 文件大小, 哈希)
+        self._passed: Dict[str, str] = dict()  # 测试用例标识：模块哈希
+        self._changes: Dict[str, Optional[str]] = dict()  # 待写入数据库的变更，值为None表示删除
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS result_cache (key TEXT PRIMARY KEY, module_hash TEXT)')
+        for key, module_hash in self._connection.execute('SELECT key, module_hash FROM result_cache'):
+            self._passed[key] = module_hash
+
+    def get_module_hash(self, test_case: TestCase) -> Optional[str]:
+        """
+        获取测试用例所在模块的内容哈希，模块没有对应的文件时返回None。
+        :param test_case: 测试用例
+        :return:
+        """
+        module = sys.modules.get(type(test_case).__module__)
+        file_path = getattr(module, '__file__', None)
+        if not file_path or not os.path.isfile(file_path):
+            return None
+        stat = os.stat(file_path)
+        with self._lock:
+            file_hash = self._file_hashes.get(file_path)
+            if file_hash and file_hash[0] == stat.st_mtime_ns and file_hash[1] == stat.st_size:
+                return file_hash[2]
+        with open(file_path, 'rb') as file:
+            module_hash = sha256(file.read()).hexdigest()
+        with self._lock:
+            self._file_hashes[file_path] = (stat.st_mtime_ns, stat.st_size, module_hash)
+        return module_hash
+
+    def is_passed(self, test_case: TestCase) -> bool:
+        """
+        判断测试用例是否已执行成功且所在模块的内容未变化
+        :param test_case: 测试用例
+        :return:
+        """
+        module_hash = self.get_module_hash(test_case)
+        if module_hash is None:
+            return False
+        with self._lock:
+            return self._passed.get(get_test_case_key(test_case)) == module_hash
+
+    def record(self, test_case: TestCase, result: TestCaseResult):
+        """
+        记录测试结果：执行成功时写入缓存，否则从缓存中删除。
+        :param test_case: 测试用例
+        :param result: 测试结果
+        :return:
+        """
+        key = get_test_case_key(test_case)
+        module_hash = self.get_module_hash(test_case) if result == TestCaseResult.PASS else None
+        with self._lock:
+            if module_hash:
+                self._passed[key] = module_hash
+            elif self._passed.pop(key, None) is None:
+                return
+            self._changes[key] = module_hash
+
+    def clear(self):
+        """
+        清空缓存，使所有缓存的测试结果失效。
+        :return:
+        """
+        with self._lock:
+            self._passed.clear()
+            self._changes.clear()
+            with self._connection:
+                self._connection.execute('DELETE FROM result_cache')
+
+    def flush(self):
+        """
+        将变更批量写入数据库
+        :return:
+        """
+        with self._lock:
+            if not self._changes:
+                return
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO result_cache (key, module_hash) VALUES (?, ?)',
+                    [(key, module_hash) for key, module_hash in self._changes.items() if module_hash])
+                self._connection.executemany(
+                    'DELETE FROM result_cache WHERE key = ?',
+                    [(key,) for key, module_hash in self._changes.items() if not module_hash])
+            self._changes.clear()
+
+    def close(self):
+        self.flush()
+        self._connection.close()
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from enum import Enum
 from typing import Tuple
 
+_cancel_event = ContextVar('cancel_event', default=None)
+_CANCELLED_DETAIL = '满足终止策略后提前结束，测试结果记为未执行'
+
 
 class TestCasePriority(Enum):
     P0 = '冒烟测试用例'
@@ -19,11 +23,36 @@ class TestCaseResult(Enum):
     TIMEOUT = '超时'
 
 
+class TestCaseCancelled(Exception):
+    """
+    测试用例已提前结束：满足终止策略后，测试用例抛出该异常时测试结果记为未执行。
+    """
+    pass
+
+
+def bind_cancel_event(cancel_event):
+    """
+    为当前线程或协程绑定取消事件，由测试执行器调用。
+    :param cancel_event: 取消事件，threading.Event或multiprocessing.Event对象
+    :return:
+    """
+    _cancel_event.set(cancel_event)
+
+
+# 参数名不能与这些实例属性同名
+_BUILTIN_ATTRS = ('start_time', 'stop_time', 'result', 'result_detail', 'cached', 'profile_result',
+                  'benchmark_result', 'load_result', '_fixtures', '_param_keys', '_param_row')
+
+
 class TestCase(ABC):
     """
     测试用例抽象类
     """
 
+    # 内置的实例属性，参数化测试时大量生成的测试用例不必各自保存一份属性字典。
+    # 参数名保存在_param_keys中：@parameterized装饰器设置的类属性_param_names会遮蔽同名的实例属性
+    __slots__ = ('start_time', 'stop_time', 'result', 'result_detail', '_param_keys', '_param_row')
+
     project = 'Default Project'
     module = 'Default Module'
     title = 'Default Title'
@@ -32,6 +61,17 @@ class TestCase(ABC):
     designer = 'Anonymous'
     version = '1.0.0'
     completed = True  # 测试用例完成状态：True-已完成/False-未完成（草拟中）
+    timeout = None  # 单次执行的超时时间（单位秒）：None-使用测试执行器的超时时间
+    resources = None  # 需要占用的资源：资源名元组（各占用1个令牌）或{资源名: 令牌数量}，None-不占用资源
+    fixtures = ()  # 依赖的夹具类，在作用域内共享初始化和清理操作
+    profile = False  # 是否始终测量资源消耗：True-始终测量/False-按资源消耗测量器的采样率测量
+
+    # 只有部分测试用例才会用到的执行结果，默认值保存在类属性中，被赋值时才成为实例属性
+    cached = False  # 测试结果是否来自测试结果缓存
+    profile_result = None  # 最近一次执行的资源消耗CaseProfile对象，未测量时为None
+    benchmark_result = None  # 最近一次执行的基准测试结果BenchmarkResult对象，非基准测试用例为None
+    load_result = None  # 最近一次负载测试的LoadResult对象，未使用负载测试执行器时为None
+    _fixtures = None  # 夹具类：夹具对象，由测试执行器在执行前设置
 
     def __init__(self, param_names: Tuple[str, ...] = None, param_values: tuple = None):
         """
@@ -42,19 +82,33 @@ class TestCase(ABC):
         self.stop_time = ''
         self.result = TestCaseResult.NOT_EXECUTED
         self.result_detail = ''
-        builtin_instance_attr = self.__dict__.keys()
+        self._param_keys = ()
+        self._param_row = ()
         if param_names and param_values:
             if len(param_names) != len(param_values):
                 raise ValueError('参数名数量与参数值数量不匹配！')
+            test_case_class = type(self)
             for i, param_name in enumerate(param_names):
-                if param_name in builtin_instance_attr:
+                if param_name in _BUILTIN_ATTRS:
                     raise ValueError('参数名与内置的实例属性名冲突了！')
-                self.__dict__[param_name] = param_values[i]  # 动态添加实例属性
+                if hasattr(test_case_class, param_name):  # 被类属性遮蔽的参数无法通过__getattr__()访问
+                    self.__dict__[param_name] = param_values[i]  # 动态添加实例属性
+            # 只引用参数名和这组参数值，不复制到实例属性中
+            self._param_keys = param_names
+            self._param_row = param_values
         elif not param_names and not param_values:
             pass
         else:
             raise ValueError('只有参数名或参数值！')
 
+    def __getattr__(self, name: str):
+        # 实例属性和类属性中都不存在时才会调用，从这组参数值中读取参数
+        if name not in TestCase.__slots__:
+            param_names = self._param_keys
+            if name in param_names:
+                return self._param_row[param_names.index(name)]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     def setup(self):
         """
         测试用例前置条件（初始化操作）
@@ -77,13 +131,57 @@ class TestCase(ABC):
         """
         pass
 
+    def is_cancelled(self) -> bool:
+        """
+        判断测试任务是否已被终止：满足终止策略后，正在执行的测试用例可通过该方法协作式地提前结束。
+        :return:
+        """
+        cancel_event = _cancel_event.get()
+        return cancel_event is not None and cancel_event.is_set()
+
+    def check_cancelled(self):
+        """
+        检查测试任务是否已被终止：已被终止时抛出TestCaseCancelled异常提前结束测试用例，测试结果记为未执行。
+        :return:
+        """
+        if self.is_cancelled():
+            raise TestCaseCancelled(_CANCELLED_DETAIL)
+
+    def get_fixture(self, fixture_class):
+        """
+        获取依赖的夹具对象
+        :param fixture_class: 夹具类，须在fixtures属性中声明
+        :return:
+        """
+        try:
+            return self._fixtures[fixture_class]
+        except (KeyError, TypeError):
+            raise ValueError(f'夹具{fixture_class.__name__}未在fixtures属性中声明！')
+
+    def set_fixture(self, fixture_class, fixture):
+        """
+        设置依赖的夹具对象，由夹具管理器调用。
+        :param fixture_class: 夹具类
+        :param fixture: 夹具对象
+        :return:
+        """
+        if self._fixtures is None:
+            self._fixtures = dict()
+        self._fixtures[fixture_class] = fixture
+
     def get_param_value(self, param_name: str):
         """
         获取参数值：参数化测试时，配合@parameterized装饰器使用。
         :param param_name: 参数名
         :return:
         """
-        try:
-            return self.__dict__[param_name]
-        except KeyError:
+        if param_name not in self._param_keys:
             raise ValueError(f'参数{param_name}不存在！')
+        return getattr(self, param_name)  # 测试用例给参数重新赋值时以实例属性为准
+
+    def get_param_values(self) -> tuple:
+        """
+        获取全部参数值：非参数化测试时返回空元组。
+        :return:
+        """
+        return self._param_row
@@ -1,11 +1,24 @@
 import sys
 from argparse import ArgumentParser
 from importlib import import_module
+from threading import Thread
 from typing import Any
 
+from .cache import ResultCache
+from .discovery import TestCaseIndex
+from .distributed import parse_address, serve_worker
+from .event import EventListener, event_bus
+from .history import DurationHistory
+from .monitor import WorkerMonitor
+from .profiler import Profiler
+from .resource import ResourceManager
+from .shard import parse_shard, dump_shard_result, merge_shard_results
+from .scheduler import TestScheduler, LongestFirstTestScheduler
 from .recorder import TestRecorder, DefaultTestRecorder
-from .runner import TestRunner, DefaultTestRunner, StopStrategy, RetryStrategy
+from .runner import TestRunner, DefaultTestRunner, StopStrategy, RetryStrategy, ExecutionMode
 from .task import TestTask, DefaultTestTask
+from .util import Writer
+from .watcher import TestWatcher
 
 
 class TestAuto:
@@ -21,10 +34,54 @@ class TestAuto:
             retry_strategy: 重试策略RetryStrategy对象
             timeout: 执行单个测试用例的超时时间，int类型，单位秒
             parallel: 并行执行数量，int类型
+            execution_mode: 执行模式ExecutionMode对象
+            duration_history: 执行耗时历史DurationHistory对象，为None时不记录执行耗时
+            test_scheduler: 测试调度器TestScheduler对象
+            result_cache: 测试结果缓存ResultCache对象，为None时不使用缓存
+            resource_manager: 资源管理器ResourceManager对象，为None时资源均为互斥资源
+            profiler: 资源消耗测量器Profiler对象，为None时只测量声明了profile = True的测试用例
+            worker_monitor: 工作者监视器WorkerMonitor对象，为None时不统计工作者的忙碌、空闲和排队时间
+            shard: 分片，(分片序号, 分片总数)元组，分片序号从1开始，为None时不分片
+            shard_output: 分片结果的文件路径，str类型，默认为testauto-shard-分片序号-of-分片总数.json
+            event_listeners: 事件监听器EventListener对象的列表，执行期间订阅全局事件总线，执行完毕后取消订阅
+            test_case_index: 测试用例索引TestCaseIndex对象，通过传入的测试模块创建测试任务时使用，为None时导入全部测试模块
         """
+        # 初始化事件监听器：先于测试任务订阅，以便接收发现测试用例的事件
+        result = kwargs.get('event_listeners', None)
+        if result is not None:
+            if isinstance(result, (list, tuple)) and all(isinstance(item, EventListener) for item in result):
+                event_listeners = list(result)
+            else:
+                raise ValueError('event_listeners不是EventListener类型的对象的列表！')
+        else:
+            event_listeners = []
+        for event_listener in event_listeners:
+            event_bus.subscribe(event_listener)
+        try:
+            self._run(*args, **kwargs)
+        finally:
+            for event_listener in event_listeners:
+                event_bus.unsubscribe(event_listener)
+
+    def _run(self, *args, **kwargs):
+        """
+        初始化测试参数并执行测试任务
+        :param args: 测试模块
+        :param kwargs: 测试参数
+        :return:
+        """
+        # 初始化测试用例索引
+        result = kwargs.get('test_case_index', None)
+        if result is not None:
+            if isinstance(result, TestCaseIndex):
+                test_case_index = result
+            else:
+                raise ValueError('test_case_index不是TestCaseIndex类型的对象！')
+        else:
+            test_case_index = None
         # 初始化测试任务
         if len(args) != 0:  # 通过传入的测试模块创建测试任务
-            test_task: TestTask = DefaultTestTask()
+            test_task: TestTask = DefaultTestTask(test_case_index)
             try:
                 test_task.add_test_cases_by_files(*args)
             except AttributeError:
@@ -39,7 +96,7 @@ class TestAuto:
             else:  # 自动创建测试任务
                 test_task: TestTask = DefaultTestTask()
                 test_task.add_test_cases_by_modules('__main__')
-        if len(test_task.test_cases) == 0:
+        if len(test_task.test_cases) == 0 and not test_task.lazy_test_cases:
             raise ValueError('没有待执行的测试用例！')
         # 初始化测试记录器
         result = kwargs.get('test_recorder', None)
@@ -95,8 +152,102 @@ class TestAuto:
                 raise ValueError('parallel不是正整数！')
         else:
             parallel = 1  # 默认单线程（串行）执行测试用例
+        # 初始化执行模式
+        result = kwargs.get('execution_mode', None)
+        if result is not None:
+            if isinstance(result, ExecutionMode):
+                execution_mode = result
+            else:
+                raise ValueError('execution_mode不是ExecutionMode类型的对象！')
+        else:
+            execution_mode = ExecutionMode.THREAD
+        # 初始化执行耗时历史
+        result = kwargs.get('duration_history', None)
+        if result is not None:
+            if isinstance(result, DurationHistory):
+                duration_history = result
+            else:
+                raise ValueError('duration_history不是DurationHistory类型的对象！')
+        else:
+            duration_history = None
+        # 初始化测试调度器
+        result = kwargs.get('test_scheduler', None)
+        if result is not None:
+            if isinstance(result, TestScheduler):
+                test_scheduler = result
+            else:
+                raise ValueError('test_scheduler不是TestScheduler类型的对象！')
+        else:
+            test_scheduler = None  # 由测试执行器使用默认测试调度器
+        # 初始化测试结果缓存
+        result = kwargs.get('result_cache', None)
+        if result is not None:
+            if isinstance(result, ResultCache):
+                result_cache = result
+            else:
+                raise ValueError('result_cache不是ResultCache类型的对象！')
+        else:
+            result_cache = None
+        # 初始化资源管理器
+        result = kwargs.get('resource_manager', None)
+        if result is not None:
+            if isinstance(result, ResourceManager):
+                resource_manager = result
+            else:
+                raise ValueError('resource_manager不是ResourceManager类型的对象！')
+        else:
+            resource_manager = None  # 由测试执行器使用默认资源管理器
+        # 初始化资源消耗测量器
+        result = kwargs.get('profiler', None)
+        if result is not None:
+            if isinstance(result, Profiler):
+                profiler = result
+            else:
+                raise ValueError('profiler不是Profiler类型的对象！')
+        else:
+            profiler = None  # 由测试执行器使用默认资源消耗测量器
+        # 初始化工作者监视器
+        result = kwargs.get('worker_monitor', None)
+        if result is not None:
+            if isinstance(result, WorkerMonitor):
+                worker_monitor = result
+            else:
+                raise ValueError('worker_monitor不是WorkerMonitor类型的对象！')
+        else:
+            worker_monitor = None
+        # 初始化分片：按执行耗时历史划分测试用例
+        result = kwargs.get('shard', None)
+        if result is not None:
+            if isinstance(result, tuple) and len(result) == 2 and all(isinstance(item, int) for item in result):
+                shard_index, shard_total = result
+                test_task.shard(shard_index, shard_total, duration_history)
+            else:
+                raise ValueError('shard不是(分片序号, 分片总数)元组！')
+            result = kwargs.get('shard_output', None)
+            if result is not None:
+                if isinstance(result, str):
+                    shard_output = result
+                else:
+                    raise ValueError('shard_output不是字符串！')
+            else:
+                shard_output = f'testauto-shard-{shard_index}-of-{shard_total}.json'
+            # 测试用例少于分片总数时，部分分片可能没有测试用例
+            if len(test_task.test_cases) == 0 and not test_task.lazy_test_cases:
+                Writer().write_line(f'分片{shard_index}/{shard_total}没有待执行的测试用例。')
+                test_recorder.test_cases = []
+                dump_shard_result(shard_output, shard_index, shard_total, test_recorder)
+                return
+        # 只传递非默认值的扩展参数，只接收基本参数的自定义测试执行器不使用这些功能时仍可正常执行
+        options = {'duration_history': duration_history, 'test_scheduler': test_scheduler,
+                   'result_cache': result_cache, 'resource_manager': resource_manager, 'profiler': profiler,
+                   'worker_monitor': worker_monitor}
+        options = {name: value for name, value in options.items() if value is not None}
+        if execution_mode != ExecutionMode.THREAD:
+            options['execution_mode'] = execution_mode
         test_runner.run(test_task=test_task, test_recorder=test_recorder, stop_strategy=stop_strategy,
-                        retry_strategy=retry_strategy, timeout=timeout, parallel=parallel)
+                        retry_strategy=retry_strategy, timeout=timeout, parallel=parallel, **options)
+        if kwargs.get('shard', None) is not None:
+            dump_shard_result(shard_output, shard_index, shard_total, test_recorder)
 
 
 class CommandLine:
@@ -108,10 +259,64 @@ class CommandLine:
         self.retry_strategy = RetryStrategy.NOT_RERUN
         self.timeout = None
         self.parallel = None
+        self.execution_mode = ExecutionMode.THREAD
+        self.worker = None
+        self.authkey = None
+        self.duration_history = None
+        self.test_scheduler = None
+        self.result_cache = None
+        self.resource_manager = None
+        self.profiler = None
+        self.worker_monitor = None
+        self.event_listeners = None
+        self.watch = False
+        self.shard = None
+        self.shard_output = None
+        self.merge_shards = None
+        self.test_case_index = None
         self._parse_argv()
-        TestAuto(*self.test_modules, test_task=self.test_task, test_recorder=self.test_recorder,
+        if self.worker:  # 作为分布式测试的工作节点运行
+            self._serve_worker()
+            return
+        if self.merge_shards:  # 合并分片结果
+            merge_shard_results(*self.merge_shards).gen_test_report()
+            return
+        if self.watch:  # 监视模式
+            self._watch()
+            return
+        self._run_test_task(*self.test_modules, test_task=self.test_task)
+
+    def _run_test_task(self, *test_modules: str, test_task=None):
+        """
+        使用命令行参数执行测试任务
+        :param test_modules: 测试模块
+        :param test_task: 测试任务
+        :return:
+        """
+        TestAuto(*test_modules, test_task=test_task, test_recorder=self.test_recorder,
                  test_runner=self.test_runner, stop_strategy=self.stop_strategy, retry_strategy=self.retry_strategy,
-                 timeout=self.timeout, parallel=self.parallel)
+                 timeout=self.timeout, parallel=self.parallel, execution_mode=self.execution_mode,
+                 duration_history=self.duration_history, test_scheduler=self.test_scheduler,
+                 result_cache=self.result_cache, resource_manager=self.resource_manager, profiler=self.profiler,
+                 worker_monitor=self.worker_monitor, shard=self.shard, shard_output=self.shard_output,
+                 event_listeners=self.event_listeners, test_case_index=self.test_case_index)
+
+    def _watch(self):
+        """
+        启动监视模式：先执行完整的测试任务，之后测试模块发生变化时只执行受影响的测试用例。
+        :return:
+        """
+        if self.test_modules:
+            test_task = DefaultTestTask(self.test_case_index)
+            test_task.add_test_cases_by_files(*self.test_modules)
+        elif self.test_task:
+            test_task = self.test_task
+        else:
+            raise ValueError('监视模式（-wa/--watch）需要指定测试模块或测试任务，请执行-h/-help获取帮助信息！')
+        try:
+            TestWatcher(test_task).watch(lambda changed_task: self._run_test_task(test_task=changed_task))
+        except KeyboardInterrupt:
+            pass
 
     def _parse_argv(self):
         """
@@ -132,6 +337,42 @@ class CommandLine:
         parser.add_argument('-rt', '--retry-strategy', type=int, help='重试策略。参数取值：0-不重试（默认）/1-立即重新执行测试用例/2-最后重新执行测试用例')
         parser.add_argument('-to', '--timeout', type=int, help='超时时间（单位秒）。参数取值：正整数')
         parser.add_argument('-p', '--parallel', type=int, help='并行执行数量。参数取值：正整数')
+        parser.add_argument('-em', '--execution-mode', type=int, help='执行模式。参数取值：0-多线程（默认）/1-多进程')
+        parser.add_argument('-dh', '--duration-history',
+                            help='执行耗时历史的数据库文件路径，指定后会记录每个测试用例的执行耗时。示例：-dh testauto-history.db')
+        parser.add_argument('-sc', '--scheduler', type=int,
+                            help='测试调度器。参数取值：0-按添加顺序（默认）/1-耗时最长优先/2-优先级优先（同优先级耗时最长优先），'
+                                 '1和2需同时指定-dh/--duration-history')
+        parser.add_argument('-rc', '--result-cache',
+                            help='测试结果缓存的数据库文件路径，指定后模块内容和参数值均未变化且上次执行成功的测试用例不再执行。'
+                                 '示例：-rc testauto-cache.db')
+        parser.add_argument('-crc', '--clear-result-cache', action='store_true', help='执行前清空测试结果缓存。')
+        parser.add_argument('-ti', '--test-index',
+                            help='测试用例索引的数据库文件路径，指定后先静态解析测试模块，只导入包含测试用例类的模块。'
+                                 '示例：-ti testauto-index.db')
+        parser.add_argument('-rs', '--resources', type=str, nargs='*',
+                            help='资源容量，未指定容量的资源均为互斥资源。示例：-rs device=2 license=3')
+        parser.add_argument('-pf', '--profile', type=float,
+                            help='资源消耗的采样率，指定后按采样率测量测试用例的CPU时间、内存峰值和净分配内存块数量。参数取值：0~1')
+        parser.add_argument('-npm', '--no-profile-memory', action='store_true',
+                            help='采样的测试用例只测量执行耗时和CPU时间，不测量内存峰值和净分配内存块数量，以降低测量开销。')
+        parser.add_argument('-wm', '--worker-monitor', action='store_true',
+                            help='统计每个工作者的执行次数、忙碌时间、空闲时间和测试用例的排队时间，并在执行完毕后输出。')
+        parser.add_argument('-sh', '--shard',
+                            help='只执行指定分片的测试用例，并保存分片结果。有执行耗时历史时按耗时均衡划分，否则按哈希值划分。示例：-sh 2/20')
+        parser.add_argument('-so', '--shard-output',
+                            help='分片结果的文件路径，默认为testauto-shard-INDEX-of-TOTAL.json。示例：-so shard-2.json')
+        parser.add_argument('-ms', '--merge-shards', type=str, nargs='*',
+                            help='合并多个分片结果并生成测试报告，此时不执行测试用例。示例：-ms testauto-shard-*.json')
+        parser.add_argument('-el', '--event-listeners', type=str, nargs='*',
+                            help='事件监听器。示例：-el path.to.module.callable，其中callable为返回EventListener对象的可调用对象。')
+        parser.add_argument('-wa', '--watch', action='store_true',
+                            help='监视模式：执行后持续监视测试模块，文件发生变化时只重新加载变化的模块，'
+                                 '并执行其中的测试用例和此前未执行成功的测试用例。')
+        parser.add_argument('-w', '--worker',
+                            help='作为分布式测试的工作节点运行，连接指定的协调者，此时-p/--parallel表示工作节点数量。'
+                                 '示例：-w host:port或-w /path/to/socket')
+        parser.add_argument('-ak', '--authkey', help='分布式测试的认证密钥，需与协调者一致。')
         args = parser.parse_args(sys.argv[1:])  # 接收命令行参数（排除第一个参数）
         self.test_modules = args.test_modules if args.test_modules else []
         if not self.test_modules:
@@ -160,6 +401,66 @@ class CommandLine:
                 raise ValueError('重试策略（-rt/--retry-strategy）的参数输入错误，请执行-h/-help获取帮助信息！')
         self.timeout = args.timeout if args.timeout else None
         self.parallel = args.parallel if args.parallel else None
+        tmp_execution_mode = args.execution_mode
+        execution_mode_flag = True
+        if tmp_execution_mode:
+            for execution_mode in ExecutionMode:
+                if tmp_execution_mode == execution_mode.value[1]:
+                    execution_mode_flag = False
+                    self.execution_mode = execution_mode
+                    break
+            if execution_mode_flag:
+                raise ValueError('执行模式（-em/--execution-mode）的参数输入错误，请执行-h/-help获取帮助信息！')
+        self.duration_history = DurationHistory(args.duration_history) if args.duration_history else None
+        if args.scheduler:
+            if args.scheduler not in (1, 2):
+                raise ValueError('测试调度器（-sc/--scheduler）的参数输入错误，请执行-h/-help获取帮助信息！')
+            if not self.duration_history:
+                raise ValueError('耗时最长优先需要执行耗时历史，请同时指定-dh/--duration-history！')
+            self.test_scheduler = LongestFirstTestScheduler(self.duration_history, priority_first=args.scheduler == 2)
+        if args.result_cache:
+            self.result_cache = ResultCache(args.result_cache)
+            if args.clear_result_cache:
+                self.result_cache.clear()
+        self.test_case_index = TestCaseIndex(args.test_index) if args.test_index else None
+        if args.resources:
+            capacities = dict()
+            for resource in args.resources:
+                name, _, capacity = resource.partition('=')
+                if not name or not capacity.isdigit() or int(capacity) <= 0:
+                    raise ValueError('资源容量（-rs/--resources）的参数输入错误，请执行-h/-help获取帮助信息！')
+                capacities[name] = int(capacity)
+            self.resource_manager = ResourceManager(capacities)
+        if args.profile is not None:
+            if not 0.0 <= args.profile <= 1.0:
+                raise ValueError('资源消耗的采样率（-pf/--profile）的参数输入错误，请执行-h/-help获取帮助信息！')
+            self.profiler = Profiler(args.profile, trace_memory=not args.no_profile_memory)
+        if args.worker_monitor:
+            self.worker_monitor = WorkerMonitor()
+        if args.shard:
+            self.shard = parse_shard(args.shard)
+        self.shard_output = args.shard_output
+        self.merge_shards = args.merge_shards
+        if args.event_listeners:
+            self.event_listeners = [self._parse_object(event_listener, EventListener)
+                                    for event_listener in args.event_listeners]
+        self.watch = args.watch
+        self.worker = args.worker
+        if self.worker and not args.authkey:
+            raise ValueError('作为工作节点运行时，必须指定认证密钥（-ak/--authkey），请执行-h/-help获取帮助信息！')
+        self.authkey = args.authkey.encode('UTF-8') if args.authkey else None
+
+    def _serve_worker(self):
+        """
+        启动工作节点，每个工作节点对应一个与协调者的连接。
+        :return:
+        """
+        address = parse_address(self.worker)
+        threads = [Thread(target=serve_worker, args=(address, self.authkey)) for _ in range(self.parallel or 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
 
     @staticmethod
     def _parse_object(callable_obj_src: str, target_class: Any):
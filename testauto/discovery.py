@@ -0,0 +1,582 @@
+import ast
+import builtins
+import json
+import marshal
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from importlib.machinery import PathFinder, SourceFileLoader
+from importlib.util import MAGIC_NUMBER, cache_from_source
+from inspect import isclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from .case import TestCase
+
+
+class TestCaseIndex:
+    """
+    测试用例索引：静态解析Python文件的语法树（不执行文件），找出其中直接或间接继承至TestCase的测试用例类，
+    以便跳过不包含测试用例类的文件。测试用例过滤器在导入后执行，与不使用索引时的结果一致。
+    解析结果按文件路径保存在本地SQLite数据库中，文件的修改时间和大小均未变化时直接使用。
+    跨文件继承时，按导入语句定位基类所在的文件，同样只解析不执行；无法静态确定的基类（比如动态创建的类）视为可能的测试用例类，
+    由调用方导入模块后再确认。
+    """
+
+    def __init__(self, path: str = 'testauto-index.db'):
+        """
+        :param path: 数据库文件路径
+        """
+        self.path = path
+        self._lock = Lock()
+        self._entries: Dict[str, Tuple[int, int, str]] = dict()  # 文件路径：(修改时间, 文件大小, 解析结果JSON)
+        self._infos: Dict[str, Optional[dict]] = dict()  # 文件路径：解析结果，无法解析时为None
+        self._changes: Dict[str, Tuple[int, int, str]] = dict()  # 待写入数据库的变更
+        self._classes: Dict[Tuple[str, str], tuple] = dict()  # (文件路径, 类名)：(是否为测试用例类, 抽象方法)
+        self._search_paths: List[str] = list()  # 查找基类所在文件时额外搜索的路径
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS test_case_index '
+                                 '(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, info TEXT)')
+        for file_path, mtime_ns, size, info in self._connection.execute(
+                'SELECT path, mtime_ns, size, info FROM test_case_index'):
+            self._entries[file_path] = (mtime_ns, size, info)
+
+    def add_search_path(self, path: str):
+        """
+        增加查找基类所在文件时额外搜索的路径（sys.path之外），比如通过路径添加测试用例时的根目录
+        :param path: 目录路径
+        :return:
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._search_paths:
+                self._search_paths.append(path)
+
+    def update(self, file_paths: List[str], workers: Optional[int] = None):
+        """
+        批量解析新增或发生变化的文件：文件较多时使用多个进程并行解析
+        :param file_paths: 文件路径列表
+        :param workers: 进程数量，为None时等于CPU核数
+        :return:
+        """
+        stale_files = list()
+        with self._lock:
+            for file_path in file_paths:
+                file_path = os.path.abspath(file_path)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entry = self._entries.get(file_path)
+                if not entry or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                    stale_files.append((file_path, stat.st_mtime_ns, stat.st_size))
+        if not stale_files:
+            return
+        infos = _map_files(_parse_file, [file_path for file_path, _, _ in stale_files], workers)
+        with self._lock:
+            for (file_path, mtime_ns, size), info in zip(stale_files, infos):
+                entry = (mtime_ns, size, json.dumps(info, ensure_ascii=False))
+                self._entries[file_path] = self._changes[file_path] = entry
+                self._infos[file_path] = info
+            self._classes.clear()
+
+    def find_test_case_classes(self, file_path: str) -> Optional[List[str]]:
+        """
+        找出文件中定义的测试用例类（不包括抽象类和从其它模块导入的类）
+        :param file_path: 文件路径
+        :return: 按类名排序的类名列表，可能包含无法静态确定是否为测试用例类的类；
+            文件无法静态解析或存在无法静态确定的模块级名称（比如通过函数调用创建的类）时返回None，由调用方导入后确认
+        """
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            info = self._get_info(file_path)
+            if info is None or info['dynamic']:
+                return None
+            class_names = list()
+            for class_name in sorted(info['classes']):
+                is_test_case, abstract_methods = self._classify(file_path, class_name, set())
+                if is_test_case is False or is_test_case and abstract_methods:
+                    continue
+                class_names.append(class_name)
+            return class_names
+
+    def flush(self):
+        """
+        将新的解析结果写入数据库
+        :return:
+        """
+        with self._lock:
+            if not self._changes:
+                return
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO test_case_index (path, mtime_ns, size, info) VALUES (?, ?, ?, ?)',
+                    [(file_path, *entry) for file_path, entry in self._changes.items()])
+            self._changes.clear()
+
+    def clear(self):
+        """
+        清空索引
+        :return:
+        """
+        with self._lock:
+            self._entries.clear()
+            self._infos.clear()
+            self._changes.clear()
+            self._classes.clear()
+            with self._connection:
+                self._connection.execute('DELETE FROM test_case_index')
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def _get_info(self, file_path: str) -> Optional[dict]:
+        """
+        获取文件的解析结果，文件的修改时间或大小变化时重新解析
+        :param file_path: 文件路径
+        :return: 无法解析时返回None
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        entry = self._entries.get(file_path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            if file_path not in self._infos:
+                self._infos[file_path] = json.loads(entry[2])
+            return self._infos[file_path]
+        info = _parse_file(file_path)
+        entry = (stat.st_mtime_ns, stat.st_size, json.dumps(info, ensure_ascii=False))
+        self._entries[file_path] = self._changes[file_path] = entry
+        self._infos[file_path] = info
+        self._classes.clear()  # 文件变化后，依赖该文件的类需要重新判断
+        return info
+
+    def _classify(self, file_path: str, class_name: str, visiting: set) -> tuple:
+        """
+        判断类是否为测试用例类
+        :param file_path: 类所在的文件
+        :param class_name: 类名
+        :param visiting: 正在判断的类，用于检测循环继承
+        :return: (是否为测试用例类：True/False/None-无法确定, 未实现的抽象方法)
+        """
+        key = (file_path, class_name)
+        result = self._classes.get(key)
+        if result is not None:
+            return result
+        if key in visiting:
+            return None, frozenset()
+        visiting.add(key)
+        class_info = self._infos[file_path]['classes'][class_name]
+        statuses = list()
+        abstract_methods = set()
+        for base in class_info['bases']:
+            status, base_abstract_methods = self._classify_target(
+                self._resolve(file_path, base, visiting) if base else None, visiting)
+            statuses.append(status)
+            if status:
+                abstract_methods |= base_abstract_methods
+        if any(statuses):
+            is_test_case = True
+        elif None in statuses:
+            is_test_case = None
+        else:
+            is_test_case = False
+        abstract_methods -= set(class_info['defines'])
+        abstract_methods |= set(class_info['abstract'])
+        visiting.discard(key)
+        result = (is_test_case, frozenset(abstract_methods))
+        self._classes[key] = result
+        return result
+
+    def _classify_target(self, target, visiting: set) -> tuple:
+        """
+        判断解析得到的基类是否为测试用例类
+        :param target: _resolve()的返回值
+        :param visiting: 正在判断的类
+        :return: 同_classify()
+        """
+        if target is None:
+            return None, frozenset()
+        kind, value = target
+        if kind == 'class':
+            return self._classify(value[0], value[1], visiting)
+        if kind == 'object' and isclass(value):
+            if issubclass(value, TestCase):
+                return True, frozenset(getattr(value, '__abstractmethods__', ()))
+            return False, frozenset()
+        return None, frozenset()
+
+    def _resolve(self, file_path: str, dotted: str, visiting: set):
+        """
+        解析文件中的点分名称
+        :param file_path: 文件路径
+        :param dotted: 点分名称，比如TestCase02、case.TestCase
+        :param visiting: 正在判断的类
+        :return: ('class', (文件路径, 类名))、('module', 文件路径)、('object', 已导入的对象)，无法确定时返回None
+        """
+        info = self._infos.get(file_path)
+        if info is None:
+            return None
+        head, *rest = dotted.split('.')
+        if head in info['classes']:
+            return ('class', (file_path, head)) if not rest else None
+        if head in info['aliases']:
+            alias = info['aliases'][head]
+            return self._resolve(file_path, '.'.join([alias, *rest]), visiting) if alias else None
+        if head in info['imports']:
+            module_name, name = info['imports'][head]
+            module = self._find_module(file_path, module_name)
+            return self._resolve_attrs(module, [name, *rest] if name else rest, visiting)
+        for module_name in info['stars']:
+            target = self._resolve_attrs(self._find_module(file_path, module_name), [head, *rest], visiting)
+            if target:
+                return target
+        if not info['stars'] and not info['getattr'] and not info['dynamic'] and hasattr(builtins, head):
+            return self._resolve_attrs(('object', builtins), [head, *rest], visiting)
+        return None
+
+    def _resolve_attrs(self, target, attrs: list, visiting: set):
+        """
+        依次解析模块或对象的属性
+        :param target: _resolve()的返回值
+        :param attrs: 属性名列表
+        :return: 同_resolve()
+        """
+        for i, attr in enumerate(attrs):
+            if target is None:
+                return None
+            kind, value = target
+            if kind == 'object':
+                if hasattr(value, attr):
+                    target = ('object', getattr(value, attr))
+                    continue
+                name = getattr(value, '__name__', None)
+                # 尚未导入的子模块
+                target = self._find_module(None, f'{name}.{attr}') if isinstance(name, str) else None
+            elif kind == 'module':
+                info = self._get_info(value)
+                if info is None:
+                    return None
+                if attr in info['classes'] or attr in info['aliases'] or attr in info['imports'] or info['stars']:
+                    return self._resolve(value, '.'.join(attrs[i:]), visiting)
+                if os.path.basename(value) == '__init__.py':  # 包的子模块
+                    target = self._find_file(os.path.dirname(value), attr)
+                    target = ('module', target) if target else None
+                else:
+                    return None
+            else:
+                return None
+        return target
+
+    def _find_module(self, file_path: Optional[str], module_name: str):
+        """
+        查找模块：testauto自身的模块和已导入的模块直接使用模块对象，其它模块只查找文件，不导入。
+        :param file_path: 导入该模块的文件，用于解析相对导入
+        :param module_name: 模块名，相对导入时以.开头
+        :return: ('module', 文件路径)或('object', 模块对象)，找不到时返回None
+        """
+        if module_name.startswith('.'):
+            if file_path is None:
+                return None
+            level = len(module_name) - len(module_name.lstrip('.'))
+            directory = os.path.dirname(file_path)
+            for _ in range(level - 1):
+                directory = os.path.dirname(directory)
+            parts = [part for part in module_name[level:].split('.') if part]
+            if not parts:
+                init_file = os.path.join(directory, '__init__.py')
+                return ('module', init_file) if os.path.isfile(init_file) else None
+            module_file = self._find_file(directory, parts[0])
+            for part in parts[1:]:
+                module_file = self._find_file(os.path.dirname(module_file), part) if module_file else None
+            return ('module', module_file) if module_file else None
+        if module_name in sys.modules:
+            return 'object', sys.modules[module_name]
+        if module_name == 'testauto' or module_name.startswith('testauto.'):
+            try:
+                return 'object', import_module(module_name)
+            except ImportError:
+                return None
+        search_paths = list(sys.path)
+        if file_path:
+            search_paths.insert(0, os.path.dirname(file_path))
+        search_paths.extend(self._search_paths)
+        module_file = None
+        for part in module_name.split('.'):
+            spec = PathFinder.find_spec(part, search_paths)
+            if spec is None:
+                return None
+            module_file = spec.origin
+            search_paths = list(spec.submodule_search_locations or [])
+        if not module_file or not module_file.endswith('.py'):
+            return None  # 扩展模块或命名空间包
+        return 'module', os.path.abspath(module_file)
+
+    @staticmethod
+    def _find_file(directory: str, name: str) -> Optional[str]:
+        """
+        在目录中查找模块文件
+        :param directory: 目录
+        :param name: 模块名
+        :return:
+        """
+        for module_file in (os.path.join(directory, f'{name}.py'), os.path.join(directory, name, '__init__.py')):
+            if os.path.isfile(module_file):
+                return module_file
+        return None
+
+
+# 文件数量达到该值时才使用多个进程，避免启动进程的开销超过收益
+_MIN_PARALLEL_FILES = 16
+
+
+def _map_files(func, file_paths: List[str], workers: Optional[int] = None) -> list:
+    """
+    对每个文件执行函数：文件较多时使用多个进程并行执行
+    :param func: 模块级函数，参数为文件路径，返回值须可序列化
+    :param file_paths: 文件路径列表
+    :param workers: 进程数量，为None时等于CPU核数
+    :return: 与文件路径一一对应的返回值列表
+    """
+    workers = min(workers or os.cpu_count() or 1, len(file_paths))
+    if workers <= 1 or len(file_paths) < _MIN_PARALLEL_FILES:
+        return [func(file_path) for file_path in file_paths]
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(func, file_paths, chunksize=max(1, len(file_paths) // (workers * 4))))
+
+
+def _is_bytecode_stale(file_path: str) -> bool:
+    """
+    判断文件在__pycache__中的字节码缓存是否不存在或已过期
+    :param file_path: 文件路径
+    :return:
+    """
+    try:
+        stat = os.stat(file_path)
+        with open(cache_from_source(file_path), 'rb') as file:
+            header = file.read(16)
+    except (OSError, NotImplementedError, ValueError):
+        return True
+    if len(header) != 16 or header[:4] != MAGIC_NUMBER:
+        return True
+    if int.from_bytes(header[4:8], 'little') != 0:  # 基于哈希值的字节码缓存，由导入系统自行校验
+        return False
+    return (int.from_bytes(header[8:12], 'little') != int(stat.st_mtime) & 0xFFFFFFFF or
+            int.from_bytes(header[12:16], 'little') != stat.st_size & 0xFFFFFFFF)
+
+
+def _compile_file(file_path: str) -> Optional[bytes]:
+    """
+    编译文件：与导入系统相同，优先使用有效的字节码缓存，否则编译并写入字节码缓存（sys.dont_write_bytecode为True时除外）
+    :param file_path: 文件路径
+    :return: 序列化的代码对象，编译失败时返回None，由导入时抛出异常
+    """
+    module_name = os.path.basename(file_path)[:-3]
+    try:
+        return marshal.dumps(SourceFileLoader(module_name, file_path).get_code(module_name))
+    except Exception:
+        return None
+
+
+def compile_files(file_paths: List[str], workers: Optional[int] = None) -> Dict[str, bytes]:
+    """
+    使用多个进程并行编译字节码缓存不存在或已过期的文件，文件较少时不编译，由导入系统在导入时编译
+    :param file_paths: 文件路径列表
+    :param workers: 进程数量，为None时等于CPU核数
+    :return: {文件路径: 序列化的代码对象}，不包括编译失败的文件
+    """
+    stale_files = [file_path for file_path in file_paths if _is_bytecode_stale(file_path)]
+    if len(stale_files) < _MIN_PARALLEL_FILES:
+        return dict()
+    return {file_path: code for file_path, code in zip(stale_files, _map_files(_compile_file, stale_files, workers))
+            if code is not None}
+
+
+def _parse_file(file_path: str) -> Optional[dict]:
+    """
+    解析文件的语法树，记录模块级的导入、别名和类定义
+    :param file_path: 文件路径
+    :return: 文件无法读取或存在语法错误时返回None
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            tree = ast.parse(file.read(), file_path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    info = {'imports': dict(), 'stars': list(), 'aliases': dict(), 'classes': dict(), 'getattr': False,
+            'dynamic': False}
+    _visit_statements(tree.body, info)
+    for statement in tree.body:
+        if isinstance(statement, ast.If) and _is_main_check(statement.test):
+            continue
+        for node in ast.walk(statement):
+            # 可能动态绑定模块级名称或修改类属性的语句和函数
+            if isinstance(node, (ast.Global, ast.NamedExpr)) or \
+                    isinstance(node, ast.Name) and node.id in ('globals', 'vars', 'exec', 'setattr', 'delattr'):
+                info['dynamic'] = True
+    return info
+
+
+def _visit_statements(statements: list, info: dict):
+    """
+    按执行顺序访问模块级语句，后面的绑定覆盖前面的同名绑定
+    :param statements: 语句列表
+    :param info: 解析结果
+    :return:
+    """
+    for statement in statements:
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname:
+                    _bind(info, alias.asname, 'imports', [alias.name, None])
+                else:  # import a.b绑定的是a
+                    name = alias.name.split('.')[0]
+                    _bind(info, name, 'imports', [name, None])
+        elif isinstance(statement, ast.ImportFrom):
+            module_name = '.' * statement.level + (statement.module or '')
+            for alias in statement.names:
+                if alias.name == '*':
+                    info['stars'].append(module_name)
+                else:
+                    _bind(info, alias.asname or alias.name, 'imports', [module_name, alias.name])
+        elif isinstance(statement, ast.ClassDef):
+            _bind(info, statement.name, 'classes', _parse_class(statement))
+        elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if statement.name == '__getattr__':
+                info['getattr'] = True
+            _bind(info, statement.name, 'aliases', None)
+        elif isinstance(statement, ast.Assign):
+            for target in statement.targets:
+                _bind_target(info, target, statement.value)
+        elif isinstance(statement, ast.AnnAssign):
+            if statement.value is not None:
+                _bind_target(info, statement.target, statement.value)
+        elif isinstance(statement, ast.AugAssign):
+            _bind_target(info, statement.target, None)
+        elif isinstance(statement, ast.Delete):
+            for target in statement.targets:
+                if isinstance(target, ast.Name):
+                    for kind in ('imports', 'classes', 'aliases'):
+                        info[kind].pop(target.id, None)
+                else:
+                    _bind_target(info, target, None)
+        elif isinstance(statement, ast.If) and _is_main_check(statement.test):
+            _visit_statements(statement.orelse, info)  # 导入时不会执行if __name__ == '__main__'的语句
+        elif isinstance(statement, (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith)):
+            if isinstance(statement, (ast.For, ast.AsyncFor)):
+                _bind_target(info, statement.target, None)
+            elif isinstance(statement, (ast.With, ast.AsyncWith)):
+                for item in statement.items:
+                    if item.optional_vars is not None:
+                        _bind_target(info, item.optional_vars, None)
+            _visit_statements(statement.body, info)
+            _visit_statements(getattr(statement, 'orelse', []), info)
+        elif isinstance(statement, ast.Try) or type(statement).__name__ == 'TryStar':
+            _visit_statements(statement.body, info)
+            for handler in statement.handlers:
+                _visit_statements(handler.body, info)
+            _visit_statements(statement.orelse, info)
+            _visit_statements(statement.finalbody, info)
+        elif not isinstance(statement, (ast.Expr, ast.Pass, ast.Assert, ast.Raise, ast.Return, ast.Break,
+                                        ast.Continue)):
+            info['dynamic'] = True  # 比如match语句，可能绑定任意名称
+
+
+def _is_main_check(node) -> bool:
+    """
+    判断条件是否为__name__ == '__main__'
+    :param node: 条件节点
+    :return:
+    """
+    return isinstance(node, ast.Compare) and isinstance(node.left, ast.Name) and node.left.id == '__name__' and \
+        len(node.ops) == 1 and isinstance(node.ops[0], ast.Eq) and \
+        isinstance(node.comparators[0], ast.Constant) and node.comparators[0].value == '__main__'
+
+
+# 一定不是类的值
+_STATIC_VALUES = (ast.Constant, ast.JoinedStr, ast.List, ast.Tuple, ast.Dict, ast.Set, ast.ListComp, ast.SetComp,
+                  ast.DictComp, ast.GeneratorExp, ast.Lambda)
+
+
+def _bind_target(info: dict, target, value):
+    """
+    绑定赋值语句的目标：名称成为别名，修改本模块中类的属性或下标不影响其是否为测试用例类，
+    其它无法静态确定的绑定会使整个文件的解析结果无法确定。
+    :param info: 解析结果
+    :param target: 目标节点
+    :param value: 值节点，为None表示无法静态确定
+    :return:
+    """
+    if isinstance(target, ast.Name):
+        dotted = _get_dotted_name(value)
+        if dotted is None and not isinstance(value, _STATIC_VALUES):
+            info['dynamic'] = True  # 可能是动态创建的测试用例类
+        _bind(info, target.id, 'aliases', dotted)
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        values = value.elts if isinstance(value, (ast.Tuple, ast.List)) and len(value.elts) == len(target.elts) \
+            and not any(isinstance(item, ast.Starred) for item in target.elts + value.elts) else None
+        for i, item in enumerate(target.elts):
+            _bind_target(info, item, values[i] if values else None)
+    elif isinstance(target, ast.Starred):
+        _bind_target(info, target.value, None)
+    else:  # 属性或下标
+        root = target
+        while isinstance(root, (ast.Attribute, ast.Subscript)):
+            root = root.value
+        if not isinstance(root, ast.Name) or root.id not in info['classes']:
+            info['dynamic'] = True  # 可能修改了其它模块中的基类，或者通过globals()等绑定了名称
+
+
+def _bind(info: dict, name: str, kind: str, value):
+    """
+    绑定模块级名称
+    :param info: 解析结果
+    :param name: 名称
+    :param kind: imports/classes/aliases
+    :param value: 绑定的值，别名为None表示无法静态确定
+    :return:
+    """
+    for other in ('imports', 'classes', 'aliases'):
+        info[other].pop(name, None)
+    info[kind][name] = value
+
+
+def _parse_class(node: ast.ClassDef) -> dict:
+    """
+    解析类定义
+    :param node: 类定义节点
+    :return:
+    """
+    defines = list()
+    abstract = list()
+    for statement in node.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            decorators = [_get_dotted_name(decorator) or '' for decorator in statement.decorator_list]
+            if any(decorator.split('.')[-1] == 'abstractmethod' for decorator in decorators):
+                abstract.append(statement.name)
+            else:
+                defines.append(statement.name)
+        elif isinstance(statement, (ast.Assign, ast.AnnAssign)) and statement.value is not None:
+            targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    defines.append(target.id)
+    return {'bases': [_get_dotted_name(base) for base in node.bases], 'defines': defines, 'abstract': abstract}
+
+
+def _get_dotted_name(node) -> Optional[str]:
+    """
+    获取Name或Attribute节点的点分名称
+    :param node: 节点
+    :return: 其它节点返回None
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _get_dotted_name(node.value)
+        return f'{value}.{node.attr}' if value else None
+    return None
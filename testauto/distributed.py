@@ -0,0 +1,317 @@
+import os
+import pickle
+import traceback
+from collections import deque
+from itertools import count
+from multiprocessing import Process
+from multiprocessing.connection import Listener, Client, Connection, wait
+from threading import Thread, Condition
+from time import perf_counter
+from typing import Optional, Tuple, Union
+
+from .cache import ResultCache
+from .case import TestCaseResult
+from .event import EventType, event_bus
+from .history import DurationHistory
+from .monitor import WorkerMonitor
+from .profiler import Profiler
+from .recorder import TestRecorder
+from .resource import ResourceManager
+from .runner import DefaultTestRunner, ExecutionMode, ProcessWorker, RetryStrategy, StopStrategy
+from .scheduler import TestScheduler
+from .task import TestTask
+from .util import Writer
+
+RESPONSE_GRACE = 30  # 工作节点自身会终止超时的测试用例，协调者额外等待的时间（单位秒）
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    解析地址
+    :param address: 地址，格式：
+        TCP：host:port
+        Unix套接字：/path/to/socket
+    :return:
+    """
+    if ':' in address and not address.startswith(os.sep):
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+    return address
+
+
+def serve_worker(address: Union[str, Tuple[str, int]], authkey: bytes, worker_id: Optional[int] = None):
+    """
+    工作节点：连接协调者，循环接收测试用例，在独占的子进程中执行后返回测试结果，接收到None时退出。
+    :param address: 协调者地址
+    :param authkey: 认证密钥
+    :param worker_id: 本机自动启动的工作节点的编号，其它主机上的工作节点为None
+    :return:
+    """
+    connection = Client(address, authkey=authkey)
+    process_worker = ProcessWorker()
+    try:
+        connection.send(worker_id)  # 协调者据此找到失去响应的本机工作节点
+        while True:
+            message = connection.recv_bytes()
+            try:
+                message = pickle.loads(message)
+            except Exception:  # 工作节点无法导入测试用例所在的模块
+                connection.send((TestCaseResult.BLOCK, traceback.format_exc()))
+                continue
+            if message is None:
+                return
+            test_case, timeout, profile_level = message
+            connection.send(process_worker.execute(test_case, timeout, profile_level))
+    except (EOFError, OSError):  # 协调者已关闭连接
+        pass
+    finally:
+        process_worker.close()
+        connection.close()
+
+
+class DistributedTestRunner(DefaultTestRunner):
+    """
+    分布式测试执行器实现类：作为协调者分发测试用例，测试结果统一由协调者的测试记录器记录。
+    工作节点可以是本机自动启动的子进程，也可以是其它主机上通过命令行启动的进程：
+    python -m testauto -w host:port -ak authkey
+    工作节点异常退出或失去响应时，正在执行的测试用例会被重新分配给其它工作节点，
+    超过重新分配次数上限后记录为阻塞（异常退出）或超时（失去响应），避免导致工作节点崩溃的测试用例被无限重新分配。
+    失去响应的本机工作节点会被终止并替换；持续connect_timeout秒没有任何工作节点连接时，剩余的测试用例记为未执行。
+    """
+
+    def __init__(self, address: str = '127.0.0.1:0', authkey: Optional[bytes] = None,
+                 local_workers: Optional[int] = None, max_reassign: int = 1, connect_timeout: Optional[float] = 60):
+        """
+        :param address: 协调者监听地址，格式：host:port或/path/to/socket，端口为0时随机分配。
+        :param authkey: 认证密钥：为None时随机生成，此时只有本机自动启动的工作节点能够连接。
+        :param local_workers: 本机自动启动的工作节点数量：为None时与并行执行数量一致。
+        :param max_reassign: 单个测试用例因工作节点异常退出或失去响应而被重新分配的次数上限
+        :param connect_timeout: 没有任何工作节点连接时的最长等待时间（单位秒），None-一直等待
+        """
+        if max_reassign < 0:
+            raise ValueError('max_reassign不能是负数！')
+        if connect_timeout is not None and connect_timeout <= 0:
+            raise ValueError('connect_timeout必须是正数！')
+        super().__init__()
+        self.max_reassign = max_reassign
+        self.reassign_counts = dict()  # 测试用例的id：已重新分配的次数
+        self.address = parse_address(address)
+        self.authkey = authkey if authkey else os.urandom(32)
+        self.local_workers = local_workers
+        self.connect_timeout = connect_timeout
+        self.listener = None
+        self.local_processes = dict()  # 本机工作节点的编号：进程
+        self.worker_ids = count()
+        self.node_count = 0  # 已连接的工作节点数量
+        self.closed = False
+        self.accepting = False
+
+    def run(self, test_task: TestTask, test_recorder: TestRecorder, stop_strategy: StopStrategy,
+            retry_strategy: RetryStrategy, timeout: int, parallel: int,
+            execution_mode: ExecutionMode = ExecutionMode.THREAD, duration_history: Optional[DurationHistory] = None,
+            test_scheduler: Optional[TestScheduler] = None, result_cache: Optional[ResultCache] = None,
+            resource_manager: Optional[ResourceManager] = None, profiler: Optional[Profiler] = None,
+            worker_monitor: Optional[WorkerMonitor] = None):
+        self._check_process_fixtures(test_task)  # 工作节点同样在子进程中执行测试用例
+        self.pending = deque()
+        self.unsettled_count = 0
+        self.lazy_iterator = None
+        self.reassign_counts = dict()
+        self.condition = Condition()
+        self.node_count = 0
+        self.closed = False
+        self.accepting = True
+        self.listener = Listener(self.address, authkey=self.authkey)
+        Thread(target=self._accept, daemon=True).start()
+        local_workers = parallel if self.local_workers is None else self.local_workers
+        for _ in range(local_workers):
+            self._start_local_worker()
+        try:
+            super().run(test_task, test_recorder, stop_strategy, retry_strategy, timeout, parallel, execution_mode,
+                        duration_history, test_scheduler, result_cache, resource_manager, profiler, worker_monitor)
+        finally:
+            self._close()
+
+    def _run_test_task(self):
+        with self.condition:
+            self.pending.extend((test_case, False) for test_case in self._get_test_cases_to_run())
+            if self.worker_monitor:
+                self.worker_monitor.submit(test_case for test_case, _ in self.pending)
+            self.unsettled_count = len(self.pending)
+            self._start_lazy()
+            self.condition.notify_all()
+            lazy_test_cases = None
+            deadline = None
+            while self.unsettled_count or self.lazy_iterator is not None:
+                if self.node_count or self.connect_timeout is None:
+                    deadline = None
+                    self.condition.wait()
+                    continue
+                if deadline is None:
+                    deadline = perf_counter() + self.connect_timeout
+                elif perf_counter() >= deadline:  # 持续没有工作节点连接，不再等待
+                    lazy_test_cases = self._discard_pending()
+                    break
+                self.condition.wait(max(deadline - perf_counter(), 0.0))
+        if lazy_test_cases is None:
+            return
+        Writer().write_error(f'超过{self.connect_timeout}秒没有工作节点连接，剩余的测试用例记为未执行！')
+        for lazy_test_case in lazy_test_cases:
+            self._settle_lazy(lazy_test_case)
+
+    def _discard_pending(self) -> list:
+        """
+        丢弃剩余的测试用例，不再重新执行。调用时须持有self.condition。
+        :return: 被丢弃的惰性参数化测试用例
+        """
+        self.retry_strategy = RetryStrategy.NOT_RERUN
+        self.unsettled_count -= len(self.pending) + self.resource_manager.clear()
+        lazy_test_cases = self._pop_lazy_ids([item[0] for item in self.pending])
+        self.pending.clear()
+        self.lazy_iterator = None
+        return lazy_test_cases
+
+    def _start_local_worker(self):
+        # 工作节点需要创建子进程，因此不能是守护进程
+        worker_id = next(self.worker_ids)
+        process = Process(target=serve_worker, args=(self.listener.address, self.authkey, worker_id))
+        process.start()
+        self.local_processes[worker_id] = process
+
+    def _accept(self):
+        """
+        接受工作节点的连接，每个工作节点对应一个分发线程。
+        :return:
+        """
+        while True:
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError):
+                if not self.accepting:
+                    return
+                continue  # 认证失败等情况，继续接受其它连接
+            if not self.accepting:
+                connection.close()
+                return
+            if self.closed:  # 测试已结束才连接上的工作节点，直接通知其退出
+                connection.send(None)
+                connection.close()
+                continue
+            Thread(target=self._dispatch, args=(connection,), daemon=True).start()
+
+    def _dispatch(self, connection: Connection):
+        """
+        分发线程：循环将测试用例发送给对应的工作节点，并等待测试结果。
+        :param connection: 与工作节点通信的连接
+        :return:
+        """
+        usage = self.worker_monitor.start_worker() if self.worker_monitor else None
+        worker_id = None
+        with self.condition:
+            self.node_count += 1
+            self.condition.notify_all()  # 协调者的主线程也在等待该条件
+        try:
+            if not connection.poll(RESPONSE_GRACE):
+                raise TimeoutError
+            worker_id = connection.recv()
+            while True:
+                with self.condition:
+                    while True:
+                        if self.closed:
+                            connection.send(None)
+                            return
+                        item = self._pop_pending()
+                        if item:
+                            break
+                        self.condition.wait()
+                    test_case, rerun = item
+                self.test_recorder.start_run(test_case)
+                event_bus.publish(EventType.CASE_STARTED, test_case, rerun=rerun)
+                start_time = perf_counter()
+                if usage:
+                    self.worker_monitor.start_run(usage, test_case, start_time)
+                timeout = self._get_timeout(test_case)
+                try:
+                    connection.send((test_case, timeout, self.profiler.get_level(test_case)))
+                except (EOFError, OSError):  # 交由外层处理
+                    raise
+                except Exception:  # 测试用例无法被序列化
+                    self._release_resources(test_case)
+                    self._handle_result(test_case, rerun, perf_counter() - start_time, TestCaseResult.BLOCK,
+                                        traceback.format_exc())
+                    continue
+                try:
+                    if not connection.poll(timeout + RESPONSE_GRACE):
+                        raise TimeoutError
+                    outcome = connection.recv()
+                except (EOFError, OSError) as e:  # 工作节点异常退出或失去响应，重新分配正在执行的测试用例
+                    self._release_resources(test_case)
+                    reassign_count = self.reassign_counts.pop(id(test_case), 0)
+                    if reassign_count < self.max_reassign:
+                        with self.condition:
+                            self.reassign_counts[id(test_case)] = reassign_count + 1
+                            self.pending.appendleft((test_case, rerun))
+                            self.condition.notify_all()  # 协调者的主线程也在等待该条件
+                    else:
+                        if usage:
+                            self.worker_monitor.stop_run(usage, perf_counter() - start_time)
+                        if isinstance(e, TimeoutError):
+                            result, result_detail = TestCaseResult.TIMEOUT, \
+                                f'工作节点超过{timeout + RESPONSE_GRACE}秒未返回测试结果，已重新分配{reassign_count}次'
+                        else:
+                            result, result_detail = TestCaseResult.BLOCK, \
+                                f'执行测试用例的工作节点异常退出（{e!r}），已重新分配{reassign_count}次'
+                        self._handle_result(test_case, rerun, perf_counter() - start_time, result, result_detail)
+                    raise
+                self.reassign_counts.pop(id(test_case), None)
+                self._release_resources(test_case)
+                if usage:
+                    self.worker_monitor.stop_run(usage, perf_counter() - start_time)
+                self._handle_result(test_case, rerun, perf_counter() - start_time, *outcome)
+        except (EOFError, OSError):
+            self._replace_local_workers(worker_id)
+        finally:
+            with self.condition:
+                self.node_count -= 1
+                self.condition.notify_all()
+            if usage:
+                self.worker_monitor.stop_worker(usage)
+            connection.close()
+
+    def _replace_local_workers(self, worker_id: Optional[int] = None):
+        """
+        本机的工作节点异常退出或失去响应时，启动新的工作节点替换。
+        :param worker_id: 连接断开的工作节点的编号，其它主机上的工作节点为None
+        :return:
+        """
+        # 连接断开时子进程可能尚未退出完毕，最多等待1秒
+        exited = wait([process.sentinel for process in self.local_processes.values()], 1)
+        hung_process = self.local_processes.get(worker_id)
+        if hung_process is not None and hung_process.sentinel not in exited:  # 失去响应，终止后替换
+            hung_process.kill()
+            hung_process.join()
+            exited.append(hung_process.sentinel)
+        with self.condition:
+            if self.closed:
+                return
+            for local_id, process in list(self.local_processes.items()):
+                if process.sentinel in exited:
+                    del self.local_processes[local_id]
+                    self._start_local_worker()
+
+    def _close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        # 本机的工作节点继承了监听套接字，因此需要在其全部退出后再停止接受连接
+        for process in self.local_processes.values():
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+        self.local_processes.clear()
+        self.accepting = False
+        try:
+            Client(self.listener.address, authkey=self.authkey).close()  # 唤醒阻塞在accept()上的线程
+        except (OSError, EOFError):
+            pass
+        self.listener.close()
@@ -0,0 +1,170 @@
+import traceback
+from abc import ABC, abstractmethod
+from collections import deque
+from enum import Enum
+from threading import Thread, Lock, Event as ThreadEvent
+from time import time
+from typing import List, Optional
+
+from .util import Writer
+
+
+class EventType(Enum):
+    TEST_CASES_DISCOVERED = ('发现测试用例', 0)  # 数据：test_cases
+    RUN_STARTED = ('开始执行测试任务', 1)  # 数据：test_task
+    CASE_QUEUED = ('测试用例入队', 2)
+    CASE_STARTED = ('测试用例开始执行', 3)  # 数据：rerun
+    CASE_RETRIED = ('测试用例重新执行', 4)  # 数据：result
+    CASE_FINISHED = ('测试用例执行结束', 5)  # 数据：result、result_detail、duration、rerun
+    REPORT_GENERATED = ('生成测试报告', 6)  # 数据：test_recorder、report_path
+    RUN_FINISHED = ('测试任务执行结束', 7)  # 数据：test_recorder
+
+
+class Event:
+    """
+    事件
+    """
+
+    __slots__ = ('event_type', 'time', 'test_case', 'data')
+
+    def __init__(self, event_type: EventType, test_case=None, data: Optional[dict] = None):
+        """
+        :param event_type: 事件类型
+        :param test_case: 相关的测试用例，与测试用例无关的事件为None
+        :param data: 事件数据
+        """
+        self.event_type = event_type
+        self.time = time()
+        self.test_case = test_case
+        self.data = data if data else dict()
+
+
+class EventListener(ABC):
+    """
+    事件监听器抽象类：事件由事件总线的分发线程批量通知，因此监听器不会阻塞执行测试用例的工作线程。
+    """
+
+    event_types = None  # 关注的事件类型，比如(EventType.CASE_FINISHED,)，None-全部事件
+
+    def on_events(self, events: List[Event]):
+        """
+        批量处理事件，默认逐个调用on_event()
+        :param events: 事件，按发布顺序排列
+        :return:
+        """
+        for event in events:
+            self.on_event(event)
+
+    @abstractmethod
+    def on_event(self, event: Event):
+        """
+        处理单个事件
+        :param event: 事件
+        :return:
+        """
+        pass
+
+
+class EventBus:
+    """
+    事件总线：发布事件时只追加到队列中，由分发线程批量通知监听器；没有监听器时发布事件不做任何操作。
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        """
+        :param batch_size: 每批通知的最大事件数量
+        """
+        self.batch_size = batch_size
+        self.listeners: List[EventListener] = []  # 写时复制，发布事件时无需加锁
+        self._queue = deque()
+        self._lock = Lock()
+        self._wakeup = ThreadEvent()
+        self._dispatcher = None
+
+    def subscribe(self, listener: EventListener):
+        """
+        订阅事件
+        :param listener: 事件监听器
+        :return:
+        """
+        with self._lock:
+            self.listeners = self.listeners + [listener]
+            if self._dispatcher is None:
+                self._dispatcher = Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+
+    def unsubscribe(self, listener: EventListener):
+        """
+        取消订阅事件，已发布的事件仍会通知该监听器。
+        :param listener: 事件监听器
+        :return:
+        """
+        self.flush()
+        with self._lock:
+            self.listeners = [item for item in self.listeners if item is not listener]
+
+    def publish(self, event_type: EventType, test_case=None, **data):
+        """
+        发布事件
+        :param event_type: 事件类型
+        :param test_case: 相关的测试用例
+        :param data: 事件数据
+        :return:
+        """
+        if not self.listeners:
+            return
+        self._queue.append(Event(event_type, test_case, data))
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待已发布的事件全部通知完毕
+        :param timeout: 超时时间（单位秒），None-一直等待
+        :return: 是否在超时时间内通知完毕
+        """
+        if self._dispatcher is None:
+            return True
+        marker = ThreadEvent()
+        self._queue.append(marker)
+        self._wakeup.set()
+        return marker.wait(timeout)
+
+    def _dispatch(self):
+        """
+        分发线程：批量取出事件并通知监听器，监听器抛出的异常不影响其它监听器。
+        :return:
+        """
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                events = list()
+                markers = list()
+                while self._queue and len(events) < self.batch_size:
+                    item = self._queue.popleft()
+                    if isinstance(item, Event):
+                        events.append(item)
+                    else:  # flush()的标记，当前批次通知完毕后设置
+                        markers.append(item)
+                        break
+                if events:
+                    self._notify(events)
+                for marker in markers:
+                    marker.set()
+
+    def _notify(self, events: List[Event]):
+        for listener in self.listeners:
+            if listener.event_types is None:
+                selected_events = events
+            else:
+                selected_events = [event for event in events if event.event_type in listener.event_types]
+            if not selected_events:
+                continue
+            try:
+                listener.on_events(selected_events)
+            except Exception:
+                Writer().write_error(f'事件监听器{type(listener).__name__}处理事件失败：{traceback.format_exc()}')
+
+
+event_bus = EventBus()  # 全局事件总线，测试任务、测试执行器和默认测试记录器均向其发布事件
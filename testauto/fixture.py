@@ -0,0 +1,277 @@
+import asyncio
+import traceback
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from enum import Enum
+from inspect import iscoroutine
+from itertools import count
+from threading import Lock, get_ident
+from time import perf_counter
+from typing import Dict, Iterable, Type
+
+from .case import TestCase
+from .util import Writer
+
+_worker_id = ContextVar('worker_id', default=None)
+_worker_ids = count(1)
+
+
+class FixtureScope(Enum):
+    CLASS = ('测试用例类', 0)  # 同一测试用例类（包括参数化生成的全部测试用例）共享
+    MODULE = ('模块', 1)  # 同一模块中的测试用例共享
+    SESSION = ('会话', 2)  # 全部测试用例共享
+    WORKER = ('工作者', 3)  # 同一工作线程（或子进程、协程）执行的测试用例共享，工作者退出时清理
+
+
+class FixtureError(Exception):
+    """
+    夹具初始化失败，依赖该夹具的测试用例均记录为阻塞。
+    """
+    pass
+
+
+class Fixture(ABC):
+    """
+    夹具抽象类：多个测试用例共享的初始化和清理操作（比如登录、准备数据或启动桩服务），在作用域内只执行一次。
+    测试用例通过fixtures属性声明依赖的夹具类，通过get_fixture()方法获取夹具对象。
+    """
+
+    scope = FixtureScope.SESSION
+
+    @abstractmethod
+    def setup(self):
+        """
+        初始化操作：作用域内第一个依赖该夹具的测试用例执行前调用
+        :return:
+        """
+        pass
+
+    def teardown(self):
+        """
+        清理操作：作用域内最后一个依赖该夹具的测试用例执行后调用
+        :return:
+        """
+        pass
+
+
+class FixtureUsage:
+    """
+    夹具使用情况
+    """
+
+    def __init__(self, name: str, scope: FixtureScope):
+        """
+        :param name: 夹具名
+        :param scope: 作用域
+        """
+        self.name = name
+        self.scope = scope
+        self.setup_count = 0  # 初始化次数
+        self.shared_count = 0  # 依赖该夹具的测试用例执行次数
+        self.setup_time = 0.0  # 累计初始化耗时（单位秒）
+        self.teardown_time = 0.0  # 累计清理耗时（单位秒）
+
+
+class _FixtureEntry:
+
+    def __init__(self, fixture: Fixture):
+        self.fixture = fixture
+        self.lock = Lock()
+        self.ready = False
+        self.error = None  # 初始化失败时的异常信息
+        self.closed = False
+
+
+class FixtureManager:
+    """
+    夹具管理器：按作用域缓存夹具对象，并发执行的测试用例共享同一个夹具对象，且初始化只执行一次。
+    执行前通过start()统计每个夹具的依赖数量，最后一个依赖该夹具的测试用例执行完毕后立即清理夹具，其余夹具在finish()中清理。
+    工作者作用域的夹具不统计依赖数量，在工作者调用stop_worker()时清理。
+    """
+
+    def __init__(self):
+        self.usages: Dict[tuple, FixtureUsage] = dict()
+        self._lock = Lock()
+        self._entries: Dict[tuple, _FixtureEntry] = dict()  # 按初始化顺序排列
+        self._ref_counts: Dict[tuple, int] = dict()  # 夹具标识：尚未执行完毕的依赖数量
+
+    @staticmethod
+    def get_key(fixture_class: Type[Fixture], test_case: TestCase) -> tuple:
+        """
+        获取夹具标识：由夹具类和作用域组成。
+        :param fixture_class: 夹具类
+        :param test_case: 测试用例
+        :return:
+        """
+        if fixture_class.scope == FixtureScope.CLASS:
+            return fixture_class, type(test_case)
+        if fixture_class.scope == FixtureScope.MODULE:
+            return fixture_class, type(test_case).__module__
+        if fixture_class.scope == FixtureScope.WORKER:
+            worker_id = _worker_id.get()
+            return fixture_class, worker_id if worker_id is not None else f'thread-{get_ident()}'
+        return fixture_class, None
+
+    @staticmethod
+    def start_worker():
+        """
+        开始工作者：为当前线程或协程分配工作者标识，由测试执行器在工作线程、子进程或工作协程开始时调用。
+        :return:
+        """
+        _worker_id.set(f'worker-{next(_worker_ids)}')
+
+    def stop_worker(self):
+        """
+        结束工作者：按初始化的相反顺序清理当前工作者的夹具，由测试执行器在工作者退出时调用。
+        :return:
+        """
+        worker_id = _worker_id.get()
+        if worker_id is None:
+            return
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._entries.items() if key[1] == worker_id]
+            for key, _ in entries:
+                del self._entries[key]
+        for key, entry in reversed(entries):
+            self._teardown(key, entry)
+
+    def start(self, test_cases: Iterable[TestCase]):
+        """
+        开始执行测试任务：统计每个夹具的依赖数量。
+        :param test_cases: 待执行的测试用例
+        :return:
+        """
+        with self._lock:
+            self._ref_counts.clear()
+            for test_case in test_cases:
+                for fixture_class in test_case.fixtures:
+                    if fixture_class.scope == FixtureScope.WORKER:
+                        continue
+                    key = self.get_key(fixture_class, test_case)
+                    self._ref_counts[key] = self._ref_counts.get(key, 0) + 1
+
+    def acquire(self, test_case: TestCase):
+        """
+        获取测试用例依赖的夹具，作用域内尚未初始化的夹具先初始化。
+        :param test_case: 测试用例
+        :return:
+        """
+        for fixture_class in test_case.fixtures:
+            key = self.get_key(fixture_class, test_case)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _FixtureEntry(fixture_class())
+                usage = self._get_usage(key)
+                usage.shared_count += 1
+            with entry.lock:  # 其它测试用例等待初始化完成
+                if not entry.ready and entry.error is None:
+                    start_time = perf_counter()
+                    try:
+                        _invoke_fixture(entry.fixture.setup)
+                        entry.ready = True
+                    except BaseException:
+                        entry.error = traceback.format_exc()
+                    with self._lock:
+                        usage.setup_count += 1
+                        usage.setup_time += perf_counter() - start_time
+            if entry.error is not None:
+                raise FixtureError(f'夹具{fixture_class.__name__}初始化失败：\n{entry.error}')
+            test_case.set_fixture(fixture_class, entry.fixture)
+
+    def retain(self, test_case: TestCase):
+        """
+        增加测试用例依赖的夹具的依赖数量，比如测试用例需要重新执行时。
+        :param test_case: 测试用例
+        :return:
+        """
+        with self._lock:
+            for fixture_class in test_case.fixtures:
+                if fixture_class.scope == FixtureScope.WORKER:
+                    continue
+                key = self.get_key(fixture_class, test_case)
+                self._ref_counts[key] = self._ref_counts.get(key, 0) + 1
+
+    def release(self, test_case: TestCase):
+        """
+        测试用例执行完毕：减少其依赖的夹具的依赖数量，没有依赖的夹具立即清理。
+        :param test_case: 测试用例
+        :return:
+        """
+        entries = list()
+        with self._lock:
+            for fixture_class in test_case.fixtures:
+                key = self.get_key(fixture_class, test_case)
+                if key not in self._ref_counts:
+                    continue
+                self._ref_counts[key] -= 1
+                if self._ref_counts[key] <= 0:
+                    del self._ref_counts[key]
+                    entry = self._entries.pop(key, None)
+                    if entry:
+                        entries.append((key, entry))
+        for key, entry in reversed(entries):
+            self._teardown(key, entry)
+
+    def finish(self):
+        """
+        结束执行测试任务：按初始化的相反顺序清理剩余的夹具，比如满足终止策略后未执行的测试用例依赖的夹具。
+        :return:
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+            self._ref_counts.clear()
+        for key, entry in reversed(entries):
+            self._teardown(key, entry)
+
+    def gen_report(self):
+        """
+        生成夹具使用情况报告
+        :return:
+        """
+        writer = Writer()
+        writer.write_line('=' * 150)
+        writer.write_line(f'{"夹具":<30}{"作用域":<10}{"初始化次数":<10}{"共享次数":<10}{"初始化耗时（秒）":<12}清理耗时（秒）')
+        for usage in self.usages.values():
+            writer.write_line(f'{usage.name:<30}{usage.scope.value[0]:<10}{usage.setup_count:<10}'
+                              f'{usage.shared_count:<10}{usage.setup_time:<12.3f}{usage.teardown_time:.3f}')
+        writer.write_line('=' * 150)
+
+    def _get_usage(self, key: tuple) -> FixtureUsage:
+        fixture_class, scope_key = key
+        if fixture_class.scope == FixtureScope.WORKER:  # 工作者作用域的夹具按夹具类汇总
+            key = fixture_class, None
+        usage = self.usages.get(key)
+        if usage is None:
+            name = fixture_class.__name__
+            if fixture_class.scope == FixtureScope.CLASS:
+                name += f'[{scope_key.__name__}]'
+            elif fixture_class.scope == FixtureScope.MODULE:
+                name += f'[{scope_key}]'
+            usage = self.usages[key] = FixtureUsage(name, fixture_class.scope)
+        return usage
+
+    def _teardown(self, key: tuple, entry: _FixtureEntry):
+        with entry.lock:
+            if not entry.ready or entry.closed:
+                return
+            entry.closed = True
+            start_time = perf_counter()
+            try:
+                _invoke_fixture(entry.fixture.teardown)
+            except BaseException:  # 清理失败不影响测试结果
+                Writer().write_error(f'夹具{key[0].__name__}清理失败：{traceback.format_exc()}')
+            with self._lock:
+                self._get_usage(key).teardown_time += perf_counter() - start_time
+
+
+def _invoke_fixture(method):
+    """
+    调用夹具的方法：若方法定义为async def，则在新的事件循环中执行。
+    :param method: setup或teardown方法
+    :return:
+    """
+    result = method()
+    if iscoroutine(result):
+        asyncio.run(result)
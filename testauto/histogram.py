@@ -0,0 +1,170 @@
+from math import ceil
+from typing import Dict
+
+
+class LatencyHistogram:
+    """
+    延迟直方图（HDR风格）：按对数分段、段内线性的桶计数，相对误差不超过2 ** (1 - significant_bits)，
+    内存占用与记录次数无关。相同精度的直方图可以合并，因此每个工作者独立记录，结束后再合并，无需加锁。
+    """
+
+    def __init__(self, significant_bits: int = 8):
+        """
+        :param significant_bits: 有效二进制位数，取值范围：2~16，越大越精确、桶越多
+        """
+        if not isinstance(significant_bits, int) or not 2 <= significant_bits <= 16:
+            raise ValueError('significant_bits的取值范围必须是2~16！')
+        self.significant_bits = significant_bits
+        self.counts: Dict[int, int] = dict()  # 桶序号：记录次数
+        self.total_count = 0
+        self.total = 0  # 记录值的总和
+        self.min = None
+        self.max = 0
+        self._sub_bucket_count = 1 << significant_bits
+        self._half_count = 1 << (significant_bits - 1)
+
+    def record(self, value: int, count: int = 1):
+        """
+        记录值
+        :param value: 非负整数，比如纳秒数
+        :param count: 次数
+        :return:
+        """
+        if value < 0:
+            raise ValueError('记录值必须是非负整数！')
+        if value < self._sub_bucket_count:
+            index = value
+        else:
+            shift = value.bit_length() - self.significant_bits
+            index = shift * self._half_count + (value >> shift)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        合并另一个直方图
+        :param other: 相同精度的直方图
+        :return:
+        """
+        if other.significant_bits != self.significant_bits:
+            raise ValueError('只能合并相同精度的直方图！')
+        for index, bucket_count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + bucket_count
+        self.total_count += other.total_count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def get_percentile(self, percentile: float) -> int:
+        """
+        获取百分位数
+        :param percentile: 百分位，取值范围：0~100，比如99.9
+        :return: 该桶内的最大值（不超过记录的最大值），没有记录时返回0
+        """
+        if not 0.0 <= percentile <= 100.0:
+            raise ValueError('percentile的取值范围必须是0~100！')
+        if not self.total_count:
+            return 0
+        rank = max(1, ceil(round(self.total_count * percentile / 100.0, 6)))  # 避免浮点误差导致多进一位
+        accumulated = 0
+        for index in sorted(self.counts):
+            accumulated += self.counts[index]
+            if accumulated >= rank:
+                return min(self._get_highest_value(index), self.max)
+        return self.max
+
+    def get_mean(self) -> float:
+        return self.total / self.total_count if self.total_count else 0.0
+
+    def to_dict(self) -> dict:
+        """
+        转换为可序列化为JSON的字典，可通过from_dict()还原。
+        :return:
+        """
+        return {
+            'significant_bits': self.significant_bits,
+            'counts': [[index, bucket_count] for index, bucket_count in sorted(self.counts.items())],
+            'total_count': self.total_count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        histogram = cls(data['significant_bits'])
+        histogram.counts = {index: bucket_count for index, bucket_count in data['counts']}
+        histogram.total_count = data['total_count']
+        histogram.total = data['total']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+    def _get_highest_value(self, index: int) -> int:
+        """
+        获取桶内的最大值
+        :param index: 桶序号
+        :return:
+        """
+        if index < self._sub_bucket_count:
+            return index
+        shift = index // self._half_count - 1
+        sub_index = index - shift * self._half_count
+        return ((sub_index + 1) << shift) - 1
+
+
+class LoadResult:
+    """
+    负载测试结果：延迟单位为纳秒。
+    """
+
+    def __init__(self, histogram: LatencyHistogram, errors: int, duration: float):
+        """
+        :param histogram: 全部请求（包括出错的请求）的延迟直方图
+        :param errors: 出错的请求数量
+        :param duration: 施压时间（单位秒）
+        """
+        self.histogram = histogram
+        self.errors = errors
+        self.duration = duration
+
+    @property
+    def requests(self) -> int:
+        return self.histogram.total_count
+
+    @property
+    def throughput(self) -> float:
+        """
+        吞吐量（次/秒）
+        """
+        return self.requests / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def get_percentile(self, percentile: float) -> int:
+        return self.histogram.get_percentile(percentile)
+
+    def merge(self, other: 'LoadResult'):
+        """
+        合并另一个负载测试结果，比如多台施压机同时对同一服务施压的结果，施压时间取最大值。
+        :param other: 负载测试结果
+        :return:
+        """
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        self.duration = max(self.duration, other.duration)
+
+    def to_dict(self) -> dict:
+        return {'histogram': self.histogram.to_dict(), 'errors': self.errors, 'duration': self.duration}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LoadResult':
+        return cls(LatencyHistogram.from_dict(data['histogram']), data['errors'], data['duration'])
@@ -0,0 +1,167 @@
+import json
+import sqlite3
+from collections import deque
+from enum import Enum
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .case import TestCase
+
+_MAX_ENCODE_DEPTH = 10  # 参数值编码的最大嵌套深度
+
+
+def get_test_case_key(test_case: TestCase) -> str:
+    """
+    获取测试用例的唯一标识：由测试用例类和参数值组成，在不同进程和主机中保持一致。
+    :param test_case: 测试用例
+    :return:
+    """
+    test_case_class = type(test_case)
+    key = f'{test_case_class.__module__}.{test_case_class.__qualname__}'
+    if test_case.get_param_values():
+        key += _encode_value(test_case.get_param_values())
+    return key
+
+
+def _encode_value(value, depth: int = 0) -> str:
+    """
+    将参数值编码为与进程无关的字符串：内置类型与repr()相同，集合按元素排序，枚举使用类名和成员名，
+    函数和类使用全限定名，其它对象若未自定义__repr__()则使用类名和实例属性，避免默认repr()中的内存地址。
+    :param value: 参数值
+    :param depth: 嵌套深度，超过_MAX_ENCODE_DEPTH时只编码类名（比如循环引用）
+    :return:
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    value_class = type(value)
+    if depth >= _MAX_ENCODE_DEPTH:
+        return value_class.__qualname__
+    depth += 1
+    if isinstance(value, Enum):
+        return f'{value_class.__qualname__}.{value.name}'
+    if isinstance(value, tuple) and not hasattr(value, '_fields'):  # 具名元组由__repr__()编码
+        items = ', '.join(_encode_value(item, depth) for item in value)
+        return f'({items},)' if len(value) == 1 else f'({items})'
+    if isinstance(value, list):
+        return f'[{", ".join(_encode_value(item, depth) for item in value)}]'
+    if isinstance(value, dict):
+        items = ', '.join(f'{_encode_value(key, depth)}: {_encode_value(item, depth)}' for key, item in value.items())
+        return f'{{{items}}}'
+    if isinstance(value, (set, frozenset)):
+        items = ', '.join(sorted(_encode_value(item, depth) for item in value))  # 字符串的哈希值因进程而异
+        if isinstance(value, frozenset):
+            return f'frozenset({{{items}}})' if items else 'frozenset()'
+        return f'{{{items}}}' if items else 'set()'
+    if hasattr(value, '__qualname__') and hasattr(value, '__module__'):  # 函数和类
+        return f'{value.__module__}.{value.__qualname__}'
+    if value_class.__repr__ is not object.__repr__:
+        return repr(value)
+    attributes = getattr(value, '__dict__', None) or {}
+    items = ', '.join(f'{name}={_encode_value(item, depth)}' for name, item in sorted(attributes.items()))
+    return f'{value_class.__qualname__}({items})'
+
+
+class DurationHistory:
+    """
+    测试用例执行耗时历史：按测试用例类和参数值记录最近若干次执行的耗时（单位秒），保存在本地SQLite数据库中。
+    耗时先记录在内存中，每累计batch_size条或调用flush()时才批量写入数据库。
+    """
+
+    def __init__(self, path: str = 'testauto-history.db', last_n: int = 20, batch_size: int = 10000):
+        """
+        :param path: 数据库文件路径
+        :param last_n: 每个测试用例保留的耗时数量
+        :param batch_size: 批量写入数据库的耗时数量
+        """
+        if last_n <= 0 or batch_size <= 0:
+            raise ValueError('last_n和batch_size必须是正整数！')
+        self.path = path
+        self.last_n = last_n
+        self.batch_size = batch_size
+        self._lock = Lock()
+        self._durations: Dict[str, deque] = dict()
+        self._dirty_keys = set()
+        self._pending_count = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS duration_history (key TEXT PRIMARY KEY, durations TEXT)')
+        for key, durations in self._connection.execute('SELECT key, durations FROM duration_history'):
+            self._durations[key] = deque(json.loads(durations), maxlen=last_n)
+
+    def record(self, test_case: TestCase, duration: float):
+        """
+        记录一次执行耗时
+        :param test_case: 测试用例
+        :param duration: 耗时（单位秒）
+        :return:
+        """
+        key = get_test_case_key(test_case)
+        with self._lock:
+            durations = self._durations.get(key)
+            if durations is None:
+                durations = self._durations[key] = deque(maxlen=self.last_n)
+            durations.append(round(duration, 6))
+            self._dirty_keys.add(key)
+            self._pending_count += 1
+            if self._pending_count >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        """
+        将内存中的耗时写入数据库
+        :return:
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._dirty_keys:
+            return
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO duration_history (key, durations) VALUES (?, ?)',
+                [(key, json.dumps(list(self._durations[key]))) for key in self._dirty_keys])
+        self._dirty_keys.clear()
+        self._pending_count = 0
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def get_durations(self, test_case: TestCase) -> List[float]:
+        """
+        获取最近若干次执行的耗时，按执行顺序排列。
+        :param test_case: 测试用例
+        :return:
+        """
+        with self._lock:
+            return list(self._durations.get(get_test_case_key(test_case), ()))
+
+    def get_last(self, test_case: TestCase) -> Optional[float]:
+        """
+        获取最近一次执行的耗时，无历史记录时返回None。
+        :param test_case: 测试用例
+        :return:
+        """
+        durations = self.get_durations(test_case)
+        return durations[-1] if durations else None
+
+    def get_mean(self, test_case: TestCase) -> Optional[float]:
+        """
+        获取最近若干次执行的平均耗时，无历史记录时返回None。
+        :param test_case: 测试用例
+        :return:
+        """
+        durations = self.get_durations(test_case)
+        return sum(durations) / len(durations) if durations else None
+
+    def get_p95(self, test_case: TestCase) -> Optional[float]:
+        """
+        获取最近若干次执行耗时的95百分位数（最近秩法），无历史记录时返回None。
+        :param test_case: 测试用例
+        :return:
+        """
+        durations = sorted(self.get_durations(test_case))
+        if not durations:
+            return None
+        rank = -(-95 * len(durations) // 100)  # 向上取整
+        return durations[rank - 1]
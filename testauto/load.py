@@ -0,0 +1,256 @@
+import asyncio
+import traceback
+from collections import deque
+from copy import copy
+from enum import Enum
+from inspect import iscoroutinefunction, iscoroutine
+from itertools import count
+from threading import Thread, Condition
+from time import perf_counter, perf_counter_ns, sleep
+from typing import List, Optional
+
+from .cache import ResultCache
+from .case import TestCase, TestCaseResult, bind_cancel_event
+from .event import EventType, event_bus
+from .histogram import LatencyHistogram, LoadResult
+from .history import DurationHistory
+from .monitor import WorkerMonitor
+from .profiler import Profiler
+from .recorder import TestRecorder
+from .resource import ResourceManager
+from .runner import DefaultTestRunner, ExecutionMode, StopStrategy, RetryStrategy
+from .scheduler import TestScheduler
+from .task import TestTask
+
+
+class LoadModel(Enum):
+    CLOSED = ('封闭模型', 0)  # 固定并发：parallel个工作者各自连续发起请求
+    OPEN = ('开放模型', 1)  # 固定到达率：按rate均匀地安排请求，与请求是否完成无关
+
+
+class _WorkerStats:
+    """
+    单个工作者的统计
+    """
+
+    def __init__(self, significant_bits: int):
+        self.histogram = LatencyHistogram(significant_bits)
+        self.errors = 0
+        self.first_error = ''
+
+
+class LoadTestRunner(DefaultTestRunner):
+    """
+    负载测试执行器：把测试用例作为负载场景，依次对每个测试用例施压duration秒，此时parallel表示并发数量（工作者数量）。
+    每个工作者持有测试用例的浅拷贝，施压前后分别调用一次setup和teardown，期间反复调用test_case，抛出异常的请求计为错误。
+    test_case定义为async def时，工作者为同一事件循环中的协程，否则为线程。
+    开放模型下，请求的延迟从计划发起时间开始计算，因此工作者全部忙碌导致的排队时间也会计入延迟。
+    """
+
+    def __init__(self, load_model: LoadModel = LoadModel.CLOSED, duration: float = 10.0,
+                 rate: Optional[float] = None, max_error_rate: float = 0.0, significant_bits: int = 8):
+        """
+        :param load_model: 负载模型
+        :param duration: 每个测试用例的施压时间（单位秒）
+        :param rate: 开放模型的到达率（次/秒）
+        :param max_error_rate: 错误率的上限，取值范围：0~1，超过时测试用例失败
+        :param significant_bits: 延迟直方图的有效二进制位数
+        """
+        super().__init__()
+        if duration <= 0:
+            raise ValueError('施压时间必须是正数！')
+        if load_model == LoadModel.OPEN and (rate is None or rate <= 0):
+            raise ValueError('开放模型的到达率必须是正数！')
+        if not 0.0 <= max_error_rate <= 1.0:
+            raise ValueError('max_error_rate的取值范围必须是0~1！')
+        LatencyHistogram(significant_bits)  # 校验精度
+        self.load_model = load_model
+        self.duration = duration
+        self.rate = rate
+        self.max_error_rate = max_error_rate
+        self.significant_bits = significant_bits
+
+    def run(self, test_task: TestTask, test_recorder: TestRecorder, stop_strategy: StopStrategy,
+            retry_strategy: RetryStrategy, timeout: int, parallel: int,
+            execution_mode: ExecutionMode = ExecutionMode.THREAD, duration_history: Optional[DurationHistory] = None,
+            test_scheduler: Optional[TestScheduler] = None, result_cache: Optional[ResultCache] = None,
+            resource_manager: Optional[ResourceManager] = None, profiler: Optional[Profiler] = None,
+            worker_monitor: Optional[WorkerMonitor] = None):
+        if execution_mode != ExecutionMode.THREAD:
+            raise ValueError(f'负载测试执行器不支持该执行模式：{execution_mode.value[0]}！')
+        if worker_monitor:
+            raise ValueError('负载测试执行器不支持工作者监视器！')
+        if test_task.lazy_test_cases:
+            raise ValueError('负载测试执行器不支持惰性参数化的测试用例！')
+        super().run(test_task, test_recorder, stop_strategy, retry_strategy, timeout, parallel, execution_mode,
+                    duration_history, test_scheduler, result_cache, resource_manager, profiler)
+
+    def _run_test_task(self):
+        """
+        执行测试任务：依次对每个测试用例施压，终止策略和重试策略与默认测试执行器相同。
+        :return:
+        """
+        self.pending = deque((test_case, False) for test_case in self._get_test_cases_to_run())
+        self.unsettled_count = len(self.pending)
+        self.condition = Condition()
+        self.fixture_manager.start_worker()
+        try:
+            while self.pending:
+                test_case, rerun = self.pending.popleft()
+                self.test_recorder.start_run(test_case)
+                event_bus.publish(EventType.CASE_STARTED, test_case, rerun=rerun)
+                start_time = perf_counter()
+                result, result_detail = self._load_test_case(test_case)
+                self._handle_result(test_case, rerun, perf_counter() - start_time, result, result_detail)
+        finally:
+            self.fixture_manager.stop_worker()
+
+    def _load_test_case(self, test_case: TestCase):
+        """
+        对单个测试用例施压
+        :param test_case: 测试用例
+        :return: 测试结果和结果详情
+        """
+        if test_case.load_result is not None:  # 未赋值时使用类属性的默认值
+            test_case.load_result = None
+        try:
+            if test_case.fixtures:
+                self.fixture_manager.acquire(test_case)
+        except BaseException:
+            return TestCaseResult.BLOCK, traceback.format_exc()
+        workers = [copy(test_case) for _ in range(self.parallel)]
+        stats = [_WorkerStats(self.significant_bits) for _ in workers]
+        timeout_ns = int(self._get_timeout(test_case) * 1e9)
+        try:
+            if iscoroutinefunction(test_case.test_case):
+                duration = asyncio.run(self._drive_async(workers, stats, timeout_ns))
+            else:
+                duration = self._drive(workers, stats, timeout_ns)
+        except BaseException:  # setup或teardown出错
+            return TestCaseResult.BLOCK, traceback.format_exc()
+        histogram = LatencyHistogram(self.significant_bits)
+        errors = 0
+        first_error = ''
+        for item in stats:
+            histogram.merge(item.histogram)
+            errors += item.errors
+            first_error = first_error or item.first_error
+        test_case.load_result = LoadResult(histogram, errors, duration)
+        if not histogram.total_count:
+            return TestCaseResult.BLOCK, '施压期间没有完成任何请求'
+        if test_case.load_result.error_rate > self.max_error_rate:
+            return TestCaseResult.FAIL, (f'错误率{test_case.load_result.error_rate * 100.0:.2f}%超过上限'
+                                         f'{self.max_error_rate * 100.0:.2f}%，第一个错误：\n{first_error}')
+        return TestCaseResult.PASS, ''
+
+    def _drive(self, workers: List[TestCase], stats: List[_WorkerStats], timeout_ns: int) -> float:
+        """
+        使用线程施压
+        :param workers: 各工作者的测试用例
+        :param stats: 各工作者的统计
+        :param timeout_ns: 单次请求的超时时间（单位纳秒），超过时计为错误
+        :return: 施压时间（单位秒）
+        """
+        for worker in workers:
+            result = worker.setup()
+            if iscoroutine(result):  # 异步的setup在新的事件循环中执行
+                asyncio.run(result)
+        arrivals = count()  # 开放模型的请求序号，next()在CPython中是原子操作
+        start = perf_counter_ns()
+        deadline = start + int(self.duration * 1e9)
+        threads = [Thread(target=self._work_load, args=(worker, item, arrivals, start, deadline, timeout_ns), daemon=True)
+                   for worker, item in zip(workers, stats)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = (perf_counter_ns() - start) / 1e9
+        for worker in workers:
+            result = worker.teardown()
+            if iscoroutine(result):
+                asyncio.run(result)
+        return duration
+
+    def _work_load(self, worker: TestCase, stats: _WorkerStats, arrivals, start: int, deadline: int, timeout_ns: int):
+        bind_cancel_event(self.cancel_event)
+        interval = 1e9 / self.rate if self.load_model == LoadModel.OPEN else 0.0
+        while not self.cancel_event.is_set():
+            if self.load_model == LoadModel.OPEN:
+                scheduled = start + int(next(arrivals) * interval)
+                if scheduled >= deadline:
+                    return
+                delay = scheduled - perf_counter_ns()
+                if delay > 0:
+                    sleep(delay / 1e9)
+            else:
+                scheduled = perf_counter_ns()
+                if scheduled >= deadline:
+                    return
+            try:
+                worker.test_case()
+                error = None
+            except Exception:
+                error = traceback.format_exc()
+            self._record(stats, perf_counter_ns() - scheduled, error, timeout_ns)
+
+    async def _drive_async(self, workers: List[TestCase], stats: List[_WorkerStats], timeout_ns: int) -> float:
+        """
+        使用协程施压，参数和返回值同_drive()
+        """
+        bind_cancel_event(self.cancel_event)
+        for worker in workers:
+            result = worker.setup()
+            if iscoroutine(result):
+                await result
+        arrivals = count()
+        start = perf_counter_ns()
+        deadline = start + int(self.duration * 1e9)
+        await asyncio.gather(*[self._work_load_async(worker, item, arrivals, start, deadline, timeout_ns)
+                               for worker, item in zip(workers, stats)])
+        duration = (perf_counter_ns() - start) / 1e9
+        for worker in workers:
+            result = worker.teardown()
+            if iscoroutine(result):
+                await result
+        return duration
+
+    async def _work_load_async(self, worker: TestCase, stats: _WorkerStats, arrivals, start: int, deadline: int,
+                               timeout_ns: int):
+        interval = 1e9 / self.rate if self.load_model == LoadModel.OPEN else 0.0
+        while not self.cancel_event.is_set():
+            if self.load_model == LoadModel.OPEN:
+                scheduled = start + int(next(arrivals) * interval)
+                if scheduled >= deadline:
+                    return
+                delay = scheduled - perf_counter_ns()
+                if delay > 0:
+                    await asyncio.sleep(delay / 1e9)
+            else:
+                scheduled = perf_counter_ns()
+                if scheduled >= deadline:
+                    return
+                await asyncio.sleep(0)  # 让出事件循环，避免不挂起的test_case独占事件循环
+            try:
+                await worker.test_case()
+                error = None
+            except Exception:
+                error = traceback.format_exc()
+            self._record(stats, perf_counter_ns() - scheduled, error, timeout_ns)
+
+    @staticmethod
+    def _record(stats: _WorkerStats, latency: int, error: Optional[str], timeout_ns: int):
+        """
+        记录单次请求
+        :param stats: 工作者的统计
+        :param latency: 延迟（单位纳秒）
+        :param error: 错误信息，成功时为None
+        :param timeout_ns: 单次请求的超时时间（单位纳秒）
+        :return:
+        """
+        stats.histogram.record(latency)
+        if error is None and latency > timeout_ns:
+            error = f'单次请求超时，延迟为：{latency / 1e9:.3f}秒'
+        if error is not None:
+            stats.errors += 1
+            if not stats.first_error:
+                stats.first_error = error
@@ -0,0 +1,135 @@
+from itertools import count
+from threading import Lock
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+
+from .case import TestCase
+from .util import Writer
+
+
+class WorkerUsage:
+    """
+    工作者使用情况
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: 工作者名
+        """
+        self.name = name
+        self.executed_count = 0  # 执行次数
+        self.busy_time = 0.0  # 执行测试用例的时间（单位秒）
+        self.idle_time = 0.0  # 空闲时间（单位秒）：存活时间减去执行测试用例的时间，包括等待测试用例和进程间通信的时间
+        self.utilization = 0.0  # 利用率：执行测试用例的时间÷存活时间
+        self.queue_time = 0.0  # 由该工作者执行的测试用例的累计排队时间（单位秒）
+        self.max_queue_time = 0.0  # 最长排队时间（单位秒）
+        self.start_time = 0.0
+        self.stop_time = None
+
+
+class WorkerMonitor:
+    """
+    工作者监视器：统计每个工作者（工作线程、子进程或分布式测试的工作节点）的忙碌和空闲时间，
+    以及测试用例的排队时间，即从进入待执行队列到开始执行的时间。
+    每个工作者只更新自身的使用情况，因此除注册工作者外无需加锁。
+    """
+
+    def __init__(self):
+        self.usages: List[WorkerUsage] = []
+        self._lock = Lock()
+        self._names = count(1)
+        self._submitted: Dict[int, float] = dict()  # 测试用例id：进入待执行队列的时间
+
+    def start(self):
+        """
+        开始执行测试任务：重置使用情况。
+        :return:
+        """
+        self.usages.clear()
+        self._names = count(1)
+        self._submitted.clear()
+
+    def stop(self):
+        """
+        结束执行测试任务：计算尚未退出的工作者的空闲时间和利用率。
+        :return:
+        """
+        now = perf_counter()
+        for usage in self.usages:
+            if usage.stop_time is None:
+                self.stop_worker(usage, now)
+
+    def submit(self, test_cases: Iterable[TestCase]):
+        """
+        测试用例进入待执行队列
+        :param test_cases: 测试用例
+        :return:
+        """
+        now = perf_counter()
+        for test_case in test_cases:
+            self._submitted[id(test_case)] = now
+
+    def start_worker(self) -> WorkerUsage:
+        """
+        注册工作者，由工作者开始时调用。
+        :return: 工作者的使用情况
+        """
+        with self._lock:
+            usage = WorkerUsage(f'worker-{next(self._names)}')
+            usage.start_time = perf_counter()
+            self.usages.append(usage)
+        return usage
+
+    def stop_worker(self, usage: WorkerUsage, now: Optional[float] = None):
+        """
+        工作者退出：计算空闲时间和利用率。
+        :param usage: 工作者的使用情况
+        :param now: 退出时间，None-当前时间
+        :return:
+        """
+        usage.stop_time = perf_counter() if now is None else now
+        elapsed = usage.stop_time - usage.start_time
+        usage.idle_time = max(elapsed - usage.busy_time, 0.0)
+        usage.utilization = usage.busy_time / elapsed if elapsed > 0 else 0.0
+
+    def start_run(self, usage: WorkerUsage, test_case: TestCase, now: Optional[float] = None):
+        """
+        工作者开始执行测试用例：记录测试用例的排队时间。
+        :param usage: 工作者的使用情况
+        :param test_case: 测试用例
+        :param now: 开始执行的时间，None-当前时间
+        :return:
+        """
+        submitted = self._submitted.pop(id(test_case), None)
+        if submitted is None:
+            return
+        queue_time = (perf_counter() if now is None else now) - submitted
+        usage.queue_time += queue_time
+        usage.max_queue_time = max(usage.max_queue_time, queue_time)
+
+    @staticmethod
+    def stop_run(usage: WorkerUsage, duration: float):
+        """
+        工作者执行完测试用例
+        :param usage: 工作者的使用情况
+        :param duration: 执行耗时（单位秒）
+        :return:
+        """
+        usage.executed_count += 1
+        usage.busy_time += duration
+
+    def gen_report(self):
+        """
+        生成工作者使用情况报告
+        :return:
+        """
+        writer = Writer()
+        writer.write_line('=' * 150)
+        writer.write_line(f'{"工作者":<12}{"执行次数":<10}{"忙碌（秒）":<12}{"空闲（秒）":<12}{"利用率（%）":<12}'
+                          f'{"平均排队（秒）":<12}最长排队（秒）')
+        for usage in self.usages:
+            mean_queue_time = usage.queue_time / usage.executed_count if usage.executed_count else 0.0
+            writer.write_line(f'{usage.name:<12}{usage.executed_count:<10}{usage.busy_time:<12.3f}'
+                              f'{usage.idle_time:<12.3f}{usage.utilization * 100.0:<12.2f}'
+                              f'{mean_queue_time:<12.3f}{usage.max_queue_time:.3f}')
+        writer.write_line('=' * 150)
@@ -0,0 +1,113 @@
+import sys
+import tracemalloc
+from enum import Enum
+from random import Random
+from threading import Lock
+from time import perf_counter, thread_time
+from typing import Optional
+
+from .case import TestCase
+
+_tracing_lock = Lock()
+_tracing_count = 0  # 正在测量内存的测试用例数量
+_tracing_started = False  # tracemalloc是否由测量器启动
+
+
+class ProfileLevel(Enum):
+    NONE = ('不测量', 0)
+    TIME = ('测量时间', 1)  # 测量执行耗时和CPU时间，开销很小
+    MEMORY = ('测量时间和内存', 2)  # 另外测量内存峰值（tracemalloc）和净分配内存块数量，开销较大
+
+
+class CaseProfile:
+    """
+    测试用例资源消耗
+    """
+
+    def __init__(self, wall_time: float, cpu_time: float, peak_memory: Optional[int] = None,
+                 allocated_blocks: Optional[int] = None):
+        """
+        :param wall_time: 执行耗时（单位秒）
+        :param cpu_time: 执行线程的CPU时间（单位秒）
+        :param peak_memory: 内存峰值（单位字节）：执行期间tracemalloc跟踪到的内存峰值与执行前的差值，未测量内存时为None
+        :param allocated_blocks: 净分配内存块数量：执行后与执行前已分配内存块数量的差值，未测量内存时为None
+        """
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_memory = peak_memory
+        self.allocated_blocks = allocated_blocks
+
+
+class Profiler:
+    """
+    资源消耗测量器：决定哪些测试用例需要测量资源消耗。
+    声明了profile = True的测试用例始终测量时间和内存，其它测试用例按采样率随机测量。
+    测量内存时tracemalloc会跟踪进程中的全部内存分配，开销较大，因此长期开启时建议只测量时间。
+    多线程并行执行时无法区分各个测试用例的内存分配，测试执行器只测量时间。
+    """
+
+    def __init__(self, sample_rate: float = 0.0, trace_memory: bool = True, seed: Optional[int] = None):
+        """
+        :param sample_rate: 采样率，取值范围：0~1，为0时只测量声明了profile = True的测试用例。
+        :param trace_memory: 采样的测试用例是否测量内存峰值和净分配内存块数量
+        :param seed: 随机数种子，相同的种子测量相同的测试用例。
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError('sample_rate的取值范围必须是0~1！')
+        self.sample_rate = sample_rate
+        self.trace_memory = trace_memory
+        self._random = Random(seed)
+
+    def get_level(self, test_case: TestCase) -> ProfileLevel:
+        """
+        获取测试用例的测量级别
+        :param test_case: 测试用例
+        :return:
+        """
+        if test_case.profile:
+            return ProfileLevel.MEMORY
+        if self.sample_rate > 0.0 and self._random.random() < self.sample_rate:
+            return ProfileLevel.MEMORY if self.trace_memory else ProfileLevel.TIME
+        return ProfileLevel.NONE
+
+
+def start_profile(level: ProfileLevel) -> tuple:
+    """
+    开始测量资源消耗，须在执行测试用例的线程中调用：第一个测量内存的测试用例开始时启动tracemalloc。
+    :param level: 测量级别
+    :return: 测量的起始状态，传给stop_profile()
+    """
+    global _tracing_count, _tracing_started
+    if level != ProfileLevel.MEMORY:
+        return perf_counter(), thread_time(), None, None
+    with _tracing_lock:
+        if _tracing_count == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        elif _tracing_count == 0 and hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+            tracemalloc.reset_peak()
+        _tracing_count += 1
+        start_memory = tracemalloc.get_traced_memory()[0]
+    return perf_counter(), thread_time(), start_memory, sys.getallocatedblocks()
+
+
+def stop_profile(start: tuple) -> CaseProfile:
+    """
+    结束测量资源消耗，须在调用start_profile()的线程中调用：最后一个测量内存的测试用例结束时停止tracemalloc。
+    :param start: start_profile()的返回值
+    :return:
+    """
+    global _tracing_count, _tracing_started
+    start_wall_time, start_cpu_time, start_memory, start_blocks = start
+    wall_time = perf_counter() - start_wall_time
+    cpu_time = thread_time() - start_cpu_time
+    if start_memory is None:
+        return CaseProfile(wall_time, cpu_time)
+    allocated_blocks = sys.getallocatedblocks() - start_blocks  # 需要遍历内存池，因此只在测量内存时统计
+    with _tracing_lock:
+        peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+        _tracing_count -= 1
+        if _tracing_count == 0 and _tracing_started:
+            tracemalloc.stop()  # 不再测量时停止跟踪，避免影响其它测试用例的执行效率
+            _tracing_started = False
+    return CaseProfile(wall_time, cpu_time, max(peak_memory, 0), allocated_blocks)
@@ -1,11 +1,46 @@
+import os
 from abc import ABC, abstractmethod
+from sys import intern
 from time import time
 from typing import List, Optional
 
 from .case import TestCase, TestCaseResult
+from .event import EventType, event_bus
+from .history import get_test_case_key
 from .util import Writer, format_timestamp, seconds_to_time
 
 
+class TestCaseRecord:
+    """
+    测试用例记录：惰性参数化的测试用例执行成功后，测试记录器只保留测试报告需要的字段，测试用例实例即可释放。
+    """
+
+    __slots__ = ('key', 'project', 'module', 'title', 'priority', 'start_time', 'stop_time', 'result',
+                 'result_detail', 'cached', 'profile_result', 'benchmark_result', 'load_result')
+
+    def __init__(self, test_case: TestCase):
+        """
+        :param test_case: 已记录测试结果的测试用例
+        """
+        self.key = get_test_case_key(test_case)
+        self.project = test_case.project
+        self.module = test_case.module
+        self.title = test_case.title
+        self.priority = test_case.priority
+        self.start_time = test_case.start_time
+        self.stop_time = test_case.stop_time
+        self.result = test_case.result
+        self.result_detail = test_case.result_detail
+        self.cached = test_case.cached
+        self.profile_result = test_case.profile_result
+        self.benchmark_result = test_case.benchmark_result
+        self.load_result = test_case.load_result
+
+    @staticmethod
+    def get_param_values() -> tuple:
+        return ()
+
+
 class TestRecorder(ABC):
     """
     测试记录器抽象类
@@ -52,16 +87,21 @@ class DefaultTestRecorder(TestRecorder):
     默认测试记录器实现类
     """
 
-    def __init__(self):
+    def __init__(self, profile_top_n: int = 10):
+        """
+        :param profile_top_n: HTML测试报告中展示的资源消耗最多的测试用例数量
+        """
         super().__init__()
         self.writer = Writer()
+        self.profile_top_n = profile_top_n
 
     def start_run(self, test_case: TestCase):
-        test_case.start_time = format_timestamp(time(), target_format='%H:%M:%S')
+        # 时间精确到秒，取值有限，驻留后大量测试用例共享同一字符串
+        test_case.start_time = intern(format_timestamp(time(), target_format='%H:%M:%S'))
         test_case.result = TestCaseResult.EXECUTING
 
     def stop_run(self, test_case: TestCase, result: TestCaseResult, result_detail=''):
-        test_case.stop_time = format_timestamp(time(), target_format='%H:%M:%S')
+        test_case.stop_time = intern(format_timestamp(time(), target_format='%H:%M:%S'))
         test_case.result = result
         test_case.result_detail = result_detail
         if test_case.result == TestCaseResult.FAIL:
@@ -171,17 +211,115 @@ class DefaultTestRecorder(TestRecorder):
             file.write('    </tr>\n')
             file.write('</table>\n')
             file.write('<br>\n')
+            # 生成资源消耗最多的测试用例（按CPU时间排序）
+            profiled_test_cases = [test_case for test_case in self.test_cases if test_case.profile_result]
+            profiled_test_cases.sort(key=lambda test_case: test_case.profile_result.cpu_time, reverse=True)
+            if profiled_test_cases and self.profile_top_n > 0:
+                file.write('<table style="width: 100%; text-align: center">\n')
+                file.write('    <caption style="border-bottom: none; background-color: lightgray; font-size: 1.5rem; '
+                           f'font-weight: bold">资源消耗Top {self.profile_top_n}\n')
+                file.write('    </caption>\n')
+                file.write('    <tr>\n')
+                file.write('        <th style="width: 20%">模块</th>\n')
+                file.write('        <th style="width: 40%">标题</th>\n')
+                file.write('        <th style="width: 10%">执行耗时（秒）</th>\n')
+                file.write('        <th style="width: 10%">CPU时间（秒）</th>\n')
+                file.write('        <th style="width: 10%">内存峰值（KB）</th>\n')
+                file.write('        <th style="width: 10%">净分配内存块</th>\n')
+                file.write('    </tr>\n')
+                for test_case in profiled_test_cases[:self.profile_top_n]:
+                    profile_result = test_case.profile_result
+                    file.write('    <tr>\n')
+                    file.write(f'        <td style="text-align: left">{test_case.module}</td>\n')
+                    file.write(f'        <td style="text-align: left">{test_case.title}</td>\n')
+                    file.write(f'        <td>{profile_result.wall_time:.3f}</td>\n')
+                    file.write(f'        <td>{profile_result.cpu_time:.3f}</td>\n')
+                    peak_memory = profile_result.peak_memory
+                    file.write(f'        <td>{"--" if peak_memory is None else f"{peak_memory / 1024:.1f}"}</td>\n')
+                    allocated_blocks = profile_result.allocated_blocks
+                    file.write(f'        <td>{"--" if allocated_blocks is None else allocated_blocks}</td>\n')
+                    file.write('    </tr>\n')
+                file.write('</table>\n')
+                file.write('<br>\n')
+            # 生成基准测试结果（单次迭代耗时，单位微秒）
+            benchmarked_test_cases = [test_case for test_case in self.test_cases if test_case.benchmark_result]
+            if benchmarked_test_cases:
+                file.write('<table style="width: 100%; text-align: center">\n')
+                file.write('    <caption style="border-bottom: none; background-color: lightgray; font-size: 1.5rem; '
+                           'font-weight: bold">基准测试\n')
+                file.write('    </caption>\n')
+                file.write('    <tr>\n')
+                file.write('        <th style="width: 15%">模块</th>\n')
+                file.write('        <th style="width: 25%">标题</th>\n')
+                file.write('        <th style="width: 10%">参数</th>\n')
+                file.write('        <th style="width: 10%">轮数×迭代次数</th>\n')
+                file.write('        <th style="width: 8%">最小值（微秒）</th>\n')
+                file.write('        <th style="width: 8%">中位数（微秒）</th>\n')
+                file.write('        <th style="width: 8%">平均值（微秒）</th>\n')
+                file.write('        <th style="width: 8%">标准差（微秒）</th>\n')
+                file.write('        <th style="width: 8%">离群轮数</th>\n')
+                file.write('    </tr>\n')
+                for test_case in benchmarked_test_cases:
+                    benchmark_result = test_case.benchmark_result
+                    param_values = ', '.join(str(param_value) for param_value in test_case.get_param_values())
+                    file.write('    <tr>\n')
+                    file.write(f'        <td style="text-align: left">{test_case.module}</td>\n')
+                    file.write(f'        <td style="text-align: left">{test_case.title}</td>\n')
+                    file.write(f'        <td>{param_values if param_values else "--"}</td>\n')
+                    file.write(f'        <td>{benchmark_result.rounds}×{benchmark_result.iterations}</td>\n')
+                    file.write(f'        <td>{benchmark_result.min_time * 1e6:.3f}</td>\n')
+                    file.write(f'        <td>{benchmark_result.median_time * 1e6:.3f}</td>\n')
+                    file.write(f'        <td>{benchmark_result.mean_time * 1e6:.3f}</td>\n')
+                    file.write(f'        <td>{benchmark_result.stddev * 1e6:.3f}</td>\n')
+                    file.write(f'        <td>{benchmark_result.outliers}</td>\n')
+                    file.write('    </tr>\n')
+                file.write('</table>\n')
+                file.write('<br>\n')
+            # 生成负载测试结果（延迟单位为毫秒）
+            loaded_test_cases = [test_case for test_case in self.test_cases if test_case.load_result]
+            if loaded_test_cases:
+                file.write('<table style="width: 100%; text-align: center">\n')
+                file.write('    <caption style="border-bottom: none; background-color: lightgray; font-size: 1.5rem; '
+                           'font-weight: bold">负载测试\n')
+                file.write('    </caption>\n')
+                file.write('    <tr>\n')
+                file.write('        <th style="width: 15%">模块</th>\n')
+                file.write('        <th style="width: 25%">标题</th>\n')
+                file.write('        <th style="width: 8%">请求数</th>\n')
+                file.write('        <th style="width: 8%">吞吐量（次/秒）</th>\n')
+                file.write('        <th style="width: 8%">错误率（%）</th>\n')
+                for percentile in ('P50', 'P90', 'P99', 'P99.9'):
+                    file.write(f'        <th style="width: 6%">{percentile}（毫秒）</th>\n')
+                file.write('        <th style="width: 6%">最大值（毫秒）</th>\n')
+                file.write('    </tr>\n')
+                for test_case in loaded_test_cases:
+                    load_result = test_case.load_result
+                    file.write('    <tr>\n')
+                    file.write(f'        <td style="text-align: left">{test_case.module}</td>\n')
+                    file.write(f'        <td style="text-align: left">{test_case.title}</td>\n')
+                    file.write(f'        <td>{load_result.requests}</td>\n')
+                    file.write(f'        <td>{load_result.throughput:.1f}</td>\n')
+                    file.write(f'        <td>{load_result.error_rate * 100.0:.2f}</td>\n')
+                    for percentile in (50.0, 90.0, 99.0, 99.9):
+                        file.write(f'        <td>{load_result.get_percentile(percentile) / 1e6:.3f}</td>\n')
+                    file.write(f'        <td>{load_result.histogram.max / 1e6:.3f}</td>\n')
+                    file.write('    </tr>\n')
+                file.write('</table>\n')
+                file.write('<br>\n')
+            has_cached = any(test_case.cached for test_case in self.test_cases)  # 未使用测试结果缓存时不显示缓存列
             file.write('<table style="width: 100%; text-align: center">\n')
             file.write('    <caption style="border-bottom: none; background-color: lightgray; font-size: 1.5rem; '
                        'font-weight: bold">详 情\n')
             file.write('    </caption>\n')
             file.write('    <tr>\n')
             file.write('        <th style="width: 20%">模块</th>\n')
-            file.write('        <th style="width: 50%">标题</th>\n')
+            file.write(f'        <th style="width: {45 if has_cached else 50}%">标题</th>\n')
             file.write('        <th style="width: 5%">优先级</th>\n')
             file.write('        <th style="width: 10%">开始时间</th>\n')
             file.write('        <th style="width: 10%">结束时间</th>\n')
             file.write('        <th style="width: 5%">测试结果</th>\n')
+            if has_cached:
+                file.write('        <th style="width: 5%">缓存</th>\n')
             file.write('        <th style="display: none">详情</th>\n')
             file.write('    </tr>\n')
             # 生成每条测试用例的测试结果
@@ -213,6 +351,8 @@ class DefaultTestRecorder(TestRecorder):
                     file.write('        <td>--</td>\n')
                     file.write('        <td>--</td>\n')
                     file.write('        <td>未执行</td>\n')
+                if has_cached:
+                    file.write(f'        <td>{"是" if test_case.cached else "否"}</td>\n')
                 file.write(f'        <td style="display: none">{test_case.result_detail}</td>\n')
                 file.write('    </tr>\n')
             file.writelines('''</table>
@@ -227,7 +367,7 @@ class DefaultTestRecorder(TestRecorder):
 <script>
 
     function openDetail(obj) {
-        document.getElementById('detail-content').innerHTML = obj.nextElementSibling.innerHTML;
+        document.getElementById('detail-content').innerHTML = obj.parentElement.lastElementChild.innerHTML;
         document.getElementById('detail').style.display = 'inline';
     }
 
@@ -238,3 +378,5 @@ class DefaultTestRecorder(TestRecorder):
 </script>
 </body>
 </html>\n''')
+        event_bus.publish(EventType.REPORT_GENERATED, test_recorder=self,
+                          report_path=os.path.abspath('test-report.html'))
@@ -0,0 +1,240 @@
+from collections import deque
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from .case import TestCase
+from .util import Writer
+
+
+class ResourceUsage:
+    """
+    资源使用情况
+    """
+
+    def __init__(self, name: str, capacity: int):
+        """
+        :param name: 资源名
+        :param capacity: 容量
+        """
+        self.name = name
+        self.capacity = capacity
+        self.acquired_count = 0  # 占用次数
+        self.busy_time = 0.0  # 占用时间（令牌数×秒）
+        self.utilization = 0.0  # 利用率：占用时间÷（容量×总执行耗时）
+        self.queued_count = 0  # 因该资源不足而排队的测试用例数量
+        self.queue_time = 0.0  # 累计排队时间（单位秒）
+        self.max_queue_time = 0.0  # 最长排队时间（单位秒）
+
+
+class ResourceManager:
+    """
+    资源管理器：测试用例通过resources属性声明需要占用的命名资源（比如数据库、设备或许可证），资源的容量即可同时占用的令牌数量。
+    资源不足的测试用例会排队等待，期间其它测试用例照常并行执行；资源释放后，排队的测试用例按原顺序优先执行。
+    未设置容量的资源默认容量为default_capacity，即默认为互斥资源。
+    注意该类不是线程安全的，由测试执行器在持有锁时调用。
+    """
+
+    def __init__(self, capacities: Optional[Dict[str, int]] = None, default_capacity: int = 1):
+        """
+        :param capacities: 资源容量，格式：{资源名: 容量}
+        :param default_capacity: 未设置容量的资源的默认容量
+        """
+        capacities = dict(capacities) if capacities else dict()
+        if default_capacity <= 0 or any(capacity <= 0 for capacity in capacities.values()):
+            raise ValueError('资源容量必须是正整数！')
+        self.capacities = capacities
+        self.default_capacity = default_capacity
+        self.usages: Dict[str, ResourceUsage] = dict()
+        self._in_use: Dict[str, int] = dict()  # 资源名：已占用的令牌数量
+        self._last_changed: Dict[str, float] = dict()  # 资源名：占用数量最近一次变化的时间
+        self._waiting: Dict[str, deque] = dict()  # 资源名：因该资源不足而排队的(测试用例, 待执行项)
+        self._parked: Dict[int, tuple] = dict()  # 测试用例id：(排队的资源名, 开始排队的时间)
+        self._waits: Dict[int, Dict[str, float]] = dict()  # 测试用例id：{资源名: 累计排队时间}
+        self._start_time = 0.0
+
+    @staticmethod
+    def get_requirements(test_case: TestCase) -> Dict[str, int]:
+        """
+        获取测试用例需要占用的资源
+        :param test_case: 测试用例
+        :return: {资源名: 令牌数量}
+        """
+        resources = test_case.resources
+        if not resources:
+            return dict()
+        if isinstance(resources, dict):
+            return resources
+        if isinstance(resources, str):
+            return {resources: 1}
+        return {name: 1 for name in resources}
+
+    def get_capacity(self, name: str) -> int:
+        """
+        获取资源容量
+        :param name: 资源名
+        :return:
+        """
+        return self.capacities.get(name, self.default_capacity)
+
+    @property
+    def waiting_count(self) -> int:
+        """
+        排队中的测试用例数量
+        :return:
+        """
+        return len(self._parked)
+
+    def start(self, test_cases: Iterable[TestCase]):
+        """
+        开始执行测试任务：校验测试用例需要占用的资源，并重置使用情况。
+        :param test_cases: 测试用例
+        :return:
+        """
+        self.usages.clear()
+        self._in_use.clear()
+        self._last_changed.clear()
+        self._waiting.clear()
+        self._parked.clear()
+        self._waits.clear()
+        for test_case in test_cases:
+            for name, tokens in self.get_requirements(test_case).items():
+                capacity = self.get_capacity(name)
+                if not isinstance(tokens, int) or tokens <= 0 or tokens > capacity:
+                    raise ValueError(f'测试用例“{test_case.title}”占用资源{name}的数量必须是不超过其容量{capacity}的正整数！')
+                if name not in self.usages:
+                    self.usages[name] = ResourceUsage(name, capacity)
+                    self._in_use[name] = 0
+                    self._waiting[name] = deque()
+        self._start_time = perf_counter()
+
+    def stop(self):
+        """
+        结束执行测试任务：计算资源利用率。
+        :return:
+        """
+        now = perf_counter()
+        elapsed = now - self._start_time
+        for name, usage in self.usages.items():
+            self._update_busy_time(name, now)
+            usage.utilization = usage.busy_time / (usage.capacity * elapsed) if elapsed > 0 else 0.0
+
+    def acquire(self, test_case: TestCase, item: Any) -> bool:
+        """
+        占用测试用例需要的资源：资源不足时测试用例进入排队，资源释放后由release()返回。
+        :param test_case: 测试用例
+        :param item: 排队时保存的待执行项
+        :return: 是否占用成功
+        """
+        requirements = self.get_requirements(test_case)
+        if not requirements:
+            return True
+        now = perf_counter()
+        lacking = self._find_lacking(requirements)
+        if lacking is not None:
+            self._park(lacking, test_case, item, now)
+            return False
+        for name, tokens in requirements.items():
+            self._update_busy_time(name, now)
+            self._in_use[name] += tokens
+            self.usages[name].acquired_count += 1
+        for name, queue_time in self._waits.pop(id(test_case), dict()).items():
+            usage = self.usages[name]
+            usage.queued_count += 1
+            usage.queue_time += queue_time
+            usage.max_queue_time = max(usage.max_queue_time, queue_time)
+        return True
+
+    def release(self, test_case: TestCase) -> List[Any]:
+        """
+        释放测试用例占用的资源
+        :param test_case: 测试用例
+        :return: 资源已充足、可以重新执行的待执行项，按排队顺序排列。
+        """
+        requirements = self.get_requirements(test_case)
+        if not requirements:
+            return []
+        now = perf_counter()
+        for name, tokens in requirements.items():
+            self._update_busy_time(name, now)
+            self._in_use[name] -= tokens
+        ready = list()
+        for name in requirements:
+            self._wake(name, now, ready)
+        return ready
+
+    def clear(self) -> int:
+        """
+        丢弃全部排队中的测试用例
+        :return: 丢弃的测试用例数量
+        """
+        count = len(self._parked)
+        for waiting in self._waiting.values():
+            waiting.clear()
+        self._parked.clear()
+        self._waits.clear()
+        return count
+
+    def gen_report(self):
+        """
+        生成资源使用情况报告
+        :return:
+        """
+        writer = Writer()
+        writer.write_line('=' * 150)
+        writer.write_line(f'{"资源":<20}{"容量":<8}{"占用次数":<10}{"利用率（%）":<12}{"排队次数":<10}'
+                          f'{"平均排队（秒）":<12}最长排队（秒）')
+        for usage in self.usages.values():
+            mean_queue_time = usage.queue_time / usage.queued_count if usage.queued_count else 0.0
+            writer.write_line(f'{usage.name:<20}{usage.capacity:<8}{usage.acquired_count:<10}'
+                              f'{usage.utilization * 100.0:<12.2f}{usage.queued_count:<10}'
+                              f'{mean_queue_time:<12.3f}{usage.max_queue_time:.3f}')
+        writer.write_line('=' * 150)
+
+    def _find_lacking(self, requirements: Dict[str, int]) -> Optional[str]:
+        """
+        查找不足的资源
+        :param requirements: 需要占用的资源
+        :return: 第一个不足的资源名，资源均充足时返回None。
+        """
+        for name, tokens in requirements.items():
+            if self._in_use[name] + tokens > self.usages[name].capacity:
+                return name
+        return None
+
+    def _park(self, name: str, test_case: TestCase, item: Any, now: float):
+        self._waiting[name].append((test_case, item))
+        self._parked[id(test_case)] = (name, now)
+
+    def _unpark(self, test_case: TestCase, now: float):
+        name, parked_time = self._parked.pop(id(test_case))
+        waits = self._waits.setdefault(id(test_case), dict())
+        waits[name] = waits.get(name, 0.0) + now - parked_time
+
+    def _wake(self, name: str, now: float, ready: list):
+        """
+        唤醒因资源不足而排队的测试用例：按排队顺序取出资源足够的测试用例，仍缺少其它资源的测试用例转到该资源上排队。
+        :param name: 资源名
+        :param now: 当前时间
+        :param ready: 资源已充足的待执行项
+        :return:
+        """
+        waiting = self._waiting[name]
+        available = self.usages[name].capacity - self._in_use[name]
+        while waiting and available > 0:
+            test_case, item = waiting[0]
+            requirements = self.get_requirements(test_case)
+            if requirements[name] > available:
+                break
+            waiting.popleft()
+            self._unpark(test_case, now)
+            lacking = self._find_lacking(requirements)
+            if lacking is None:
+                ready.append(item)
+                available -= requirements[name]  # 为已唤醒的测试用例预留
+            else:
+                self._park(lacking, test_case, item, now)
+
+    def _update_busy_time(self, name: str, now: float):
+        last_changed = self._last_changed.get(name, self._start_time)
+        self.usages[name].busy_time += self._in_use[name] * (now - last_changed)
+        self._last_changed[name] = now
@@ -1,14 +1,34 @@
+import asyncio
+import os
 import traceback
 from abc import ABC, abstractmethod
-from concurrent.futures._base import wait, FIRST_EXCEPTION
-from concurrent.futures.thread import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from enum import Enum
-from threading import Thread, Event
+from heapq import heapify, heappop, heappush
+from inspect import iscoroutinefunction, iscoroutine
+from itertools import chain, count
+from multiprocessing import Process, Pipe, Event as ProcessEvent
+from threading import Thread, Condition, Event, Lock, local
 from time import perf_counter, time
+from typing import Callable, Optional
 
-from .case import TestCaseResult, TestCasePriority, TestCase
-from .recorder import TestRecorder
+from .benchmark import BenchmarkResult
+from .cache import ResultCache
+from .case import TestCaseResult, TestCasePriority, TestCase, TestCaseCancelled, bind_cancel_event
+from .event import EventType, event_bus
+from .fixture import FixtureManager, FixtureScope
+from .history import DurationHistory
+from .monitor import WorkerMonitor
+from .profiler import CaseProfile, Profiler, ProfileLevel, start_profile, stop_profile
+from .recorder import TestRecorder, TestCaseRecord
+from .resource import ResourceManager
+from .scheduler import TestScheduler, DefaultTestScheduler
 from .task import TestTask
+from .util import Writer
+
+
 
 
 class StopStrategy(Enum):
@@ -23,23 +43,284 @@ class RetryStrategy(Enum):
     RERUN_LAST = ('最后重新执行测试用例', 2)  # 对全部未执行成功的测试用例，最后批量重新执行一次
 
 
-class TestCaseThread(Thread):
+class ExecutionMode(Enum):
+    THREAD = ('多线程', 0)
+    PROCESS = ('多进程', 1)  # 在子进程中执行测试用例，适用于CPU密集型测试用例，超时的子进程会被终止
+
+
+def _set_result_attr(test_case: TestCase, name: str, value):
     """
-    测试用例执行线程
+    设置只有部分测试用例才会用到的执行结果（比如资源消耗）：取值未变化时不赋值，大量测试用例不必各自创建实例属性字典
+    :param test_case: 测试用例
+    :param name: 属性名
+    :param value: 属性值
+    :return:
     """
+    if getattr(test_case, name) is not value:
+        setattr(test_case, name, value)
 
-    def __init__(self, test_case: TestCase):
-        super().__init__()
-        self.test_case = test_case
-        self.exception = None
 
-    def run(self):
+def _invoke_methods(test_case: TestCase):
+    """
+    依次调用测试用例的setup、test_case和teardown方法：从第一个定义为async def的方法开始，剩余的方法在同一个事件循环中执行，
+    因此setup中创建的异步连接等对象可以在test_case和teardown中继续使用。
+    :param test_case: 测试用例
+    :return:
+    """
+    methods = iter((test_case.setup, test_case.test_case, test_case.teardown))
+    for method in methods:
+        result = method()
+        if iscoroutine(result):
+            asyncio.run(_await_methods(result, methods))
+            return
+
+
+async def _await_methods(coroutine, methods):
+    """
+    等待当前协程，然后依次调用剩余的方法
+    :param coroutine: 当前方法返回的协程
+    :param methods: 剩余方法的迭代器
+    :return:
+    """
+    await coroutine
+    for method in methods:
+        result = method()
+        if iscoroutine(result):
+            await result
+
+
+def _execute(test_case: TestCase, fixture_manager: Optional[FixtureManager] = None,
+             profile_level: ProfileLevel = ProfileLevel.NONE):
+    """
+    执行测试用例，可在子进程中调用：异常不一定能被序列化，因此直接转换为测试结果和结果详情。
+    :param test_case: 测试用例
+    :param fixture_manager: 夹具管理器
+    :param profile_level: 资源消耗的测量级别
+    :return: 测试结果、结果详情、资源消耗（未测量时为None）和基准测试结果（非基准测试用例为None）
+    """
+    start = start_profile(profile_level) if profile_level != ProfileLevel.NONE else None
+    _set_result_attr(test_case, 'benchmark_result', None)
+    result, result_detail = _execute_methods(test_case, fixture_manager)
+    # 在子进程中执行时，基准测试结果需随测试结果一起返回给主进程
+    return result, result_detail, stop_profile(start) if start else None, test_case.benchmark_result
+
+
+def _execute_methods(test_case: TestCase, fixture_manager: Optional[FixtureManager]):
+    """
+    获取依赖的夹具，并依次调用测试用例的setup、test_case和teardown方法
+    :param test_case: 测试用例
+    :param fixture_manager: 夹具管理器
+    :return: 测试结果和结果详情
+    """
+    try:
+        if test_case.fixtures and fixture_manager:
+            fixture_manager.acquire(test_case)
+        _invoke_methods(test_case)
+    except TestCaseCancelled as e:  # 满足终止策略后主动提前结束
+        return TestCaseResult.NOT_EXECUTED, str(e)
+    except AssertionError:
+        return TestCaseResult.FAIL, traceback.format_exc()
+    except TimeoutError:
+        return TestCaseResult.TIMEOUT, traceback.format_exc()
+    except BaseException:  # 避免SystemExit等异常导致工作线程退出
+        return TestCaseResult.BLOCK, traceback.format_exc()
+    return TestCaseResult.PASS, ''
+
+
+def _serve(connection, cancel_event):
+    """
+    子进程入口：循环接收测试用例并返回测试结果，接收到None时退出。
+    :param connection: 与主进程通信的连接
+    :param cancel_event: 取消事件
+    :return:
+    """
+    bind_cancel_event(cancel_event)
+    fixture_manager = FixtureManager()  # 子进程中的夹具在子进程正常退出时清理
+    fixture_manager.start_worker()
+    parent_pid = os.getppid()
+    while True:
+        # 子进程继承了主进程的连接，主进程被强制终止时无法收到EOF，因此定期检查主进程是否仍然存在
+        while not connection.poll(1):
+            if os.getppid() != parent_pid:
+                return
+        message = connection.recv()
+        if message is None:
+            fixture_manager.finish()
+            return
+        test_case, profile_level = message
+        if cancel_event is not None and cancel_event.is_set():  # 满足终止策略后不再执行预取的测试用例
+            connection.send(None)
+            continue
+        connection.send(_execute(test_case, fixture_manager, profile_level))
+
+
+class ProcessWorker:
+    """
+    子进程工作者：每个工作线程独占一个子进程，测试用例超时或子进程异常退出时，终止并替换该子进程。
+    子进程按发送顺序依次执行测试用例，因此可以在等待当前测试结果的同时提前发送（预取）后续测试用例。
+    """
+
+    def __init__(self, cancel_event=None):
+        """
+        :param cancel_event: 取消事件，multiprocessing.Event对象，子进程中的测试用例可通过is_cancelled()方法获取其状态。
+        """
+        self.cancel_event = cancel_event
+        self.process = None
+        self.connection = None
+        self.pending_count = 0  # 已发送、尚未返回测试结果的测试用例数量
+
+    def execute(self, test_case: TestCase, timeout: float, profile_level: ProfileLevel = ProfileLevel.NONE):
+        """
+        在子进程中执行测试用例
+        :param test_case: 测试用例
+        :param timeout: 超时时间（单位秒）
+        :param profile_level: 资源消耗的测量级别
+        :return: 测试结果、结果详情和资源消耗（可省略）
+        """
+        error = self.submit(test_case, profile_level)
+        if error:
+            return TestCaseResult.BLOCK, error
+        return self.receive(timeout)
+
+    def submit(self, test_case: TestCase, profile_level: ProfileLevel = ProfileLevel.NONE) -> Optional[str]:
+        """
+        发送测试用例，不等待测试结果
+        :param test_case: 测试用例
+        :param profile_level: 资源消耗的测量级别
+        :return: 测试用例无法被序列化时返回异常信息，否则返回None
+        """
+        if self.process is None or not self.pending_count and not self.process.is_alive():
+            self._start()
         try:
-            self.test_case.setup()
-            self.test_case.test_case()
-            self.test_case.teardown()
-        except Exception as e:
-            self.exception = e
+            self.connection.send((test_case, profile_level))
+        except (OSError, EOFError):  # 子进程已异常退出，由receive()处理
+            pass
+        except Exception:  # 测试用例无法被序列化
+            return traceback.format_exc()
+        self.pending_count += 1
+        return None
+
+    def receive(self, timeout: float, elapsed: float = 0.0):
+        """
+        等待最早发送的测试用例的测试结果，超时或子进程异常退出时终止子进程，此时其余已发送的测试用例均未执行。
+        :param timeout: 超时时间（单位秒）
+        :param elapsed: 该测试用例已执行的时间（单位秒）
+        :return: 测试结果、结果详情和资源消耗（可省略），满足终止策略后子进程未执行的测试用例返回None
+        """
+        try:
+            if self.connection.poll(max(timeout - elapsed, 0.0)):
+                outcome = self.connection.recv()
+                self.pending_count -= 1
+                return outcome
+        except EOFError:
+            self.process.join()
+            exitcode = self.process.exitcode
+            self.terminate()
+            return TestCaseResult.BLOCK, f'执行测试用例的子进程异常退出，退出码为：{exitcode}'
+        self.terminate()
+        return TestCaseResult.TIMEOUT, f'执行单个测试用例超时，超时时间为：{timeout}秒，已终止执行该测试用例的子进程'
+
+    def _start(self):
+        self.connection, child_connection = Pipe()
+        self.process = Process(target=_serve, args=(child_connection, self.cancel_event), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def terminate(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self.process = None
+        self.pending_count = 0
+
+    def close(self):
+        """
+        正常关闭子进程
+        :return:
+        """
+        if self.process is None:
+            return
+        try:
+            self.connection.send(None)
+            self.process.join(1)
+        except (OSError, ValueError):
+            pass
+        self.terminate()
+
+
+class TimeoutWatchdog(Thread):
+    """
+    超时看门狗：由一个线程统一监控所有正在执行的测试用例，测试用例超时后调用回调函数。
+    """
+
+    def __init__(self):
+        super().__init__(name='TimeoutWatchdog', daemon=True)
+        self._condition = Condition()
+        self._entries = []  # 监控项的小顶堆，监控项格式：[截止时间, 序号, 回调函数]
+        self._counter = count()
+        self._cancelled_count = 0
+        self._stopped = False
+
+    def watch(self, timeout: float, callback: Callable[[], None]):
+        """
+        开始监控
+        :param timeout: 超时时间（单位秒）
+        :param callback: 回调函数，在看门狗线程中调用
+        :return: 监控项，用于取消监控
+        """
+        entry = [perf_counter() + timeout, next(self._counter), callback]
+        with self._condition:
+            heappush(self._entries, entry)
+            if self._entries[0] is entry:  # 截止时间最早时才需要唤醒看门狗线程
+                self._condition.notify()
+        return entry
+
+    def cancel(self, entry: list) -> bool:
+        """
+        取消监控
+        :param entry: 监控项
+        :return: 取消成功返回True，已超时返回False
+        """
+        with self._condition:
+            if entry[2] is None:
+                return False
+            entry[2] = None  # 惰性删除，取消的监控项过多时再重建堆
+            self._cancelled_count += 1
+            if self._cancelled_count > 1024 and self._cancelled_count * 2 > len(self._entries):
+                self._entries = [item for item in self._entries if item[2] is not None]
+                heapify(self._entries)
+                self._cancelled_count = 0
+            return True
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self.join()
+
+    def run(self):
+        with self._condition:
+            while not self._stopped:
+                now = perf_counter()
+                callbacks = list()
+                while self._entries and (self._entries[0][2] is None or self._entries[0][0] <= now):
+                    entry = heappop(self._entries)
+                    if entry[2] is None:
+                        self._cancelled_count -= 1
+                    else:
+                        callbacks.append(entry[2])
+                        entry[2] = None
+                if callbacks:
+                    self._condition.release()  # 回调函数中可能再次开始监控，因此在锁外调用
+                    try:
+                        for callback in callbacks:
+                            callback()
+                    finally:
+                        self._condition.acquire()
+                    continue
+                self._condition.wait(self._entries[0][0] - now if self._entries else None)
 
 
 class TestRunner(ABC):
@@ -57,91 +338,728 @@ class DefaultTestRunner(TestRunner):
     默认测试执行器实现类
     """
 
+    def __init__(self, prefetch: int = 1):
+        """
+        :param prefetch: 多进程执行时每个子进程预取的测试用例数量：子进程执行当前测试用例的同时，提前发送后续测试用例，为0时不预取。
+        """
+        if not isinstance(prefetch, int) or prefetch < 0:
+            raise ValueError('prefetch必须是非负整数！')
+        self.prefetch = prefetch
+
     def run(self, test_task: TestTask, test_recorder: TestRecorder, stop_strategy: StopStrategy,
-            retry_strategy: RetryStrategy, timeout: int, parallel: int):
+            retry_strategy: RetryStrategy, timeout: int, parallel: int,
+            execution_mode: ExecutionMode = ExecutionMode.THREAD, duration_history: Optional[DurationHistory] = None,
+            test_scheduler: Optional[TestScheduler] = None, result_cache: Optional[ResultCache] = None,
+            resource_manager: Optional[ResourceManager] = None, profiler: Optional[Profiler] = None,
+            worker_monitor: Optional[WorkerMonitor] = None):
+        if execution_mode == ExecutionMode.PROCESS:
+            self._check_process_fixtures(test_task)
         self.test_task = test_task
         self.test_recorder = test_recorder
-        self.test_recorder.test_cases = self.test_task.test_cases
+        # 惰性参数化测试用例执行成功后只保留测试用例记录，因此测试记录器使用单独的列表
+        self.lazy_pending = bool(self.test_task.lazy_test_cases)  # 惰性参数化测试用例是否尚未开始生成
+        self.lazy_iterator = None
+        self.lazy_ids = set()  # 已生成、尚未得出最终测试结果的惰性参数化测试用例的id
+        if self.lazy_pending:
+            self.test_recorder.test_cases = list(self.test_task.test_cases)
+        else:
+            self.test_recorder.test_cases = self.test_task.test_cases
         self.stop_strategy = stop_strategy
         self.retry_strategy = retry_strategy
         self.timeout = timeout
         self.parallel = parallel
+        self.execution_mode = execution_mode
+        self.duration_history = duration_history
+        self.test_scheduler = test_scheduler if test_scheduler else DefaultTestScheduler()
+        self.result_cache = result_cache
+        self.resource_manager = resource_manager if resource_manager else ResourceManager()
+        self.resource_manager.start(self.test_task.test_cases)
+        self.fixture_manager = FixtureManager()
+        self.profiler = profiler if profiler else Profiler()
+        self.worker_monitor = worker_monitor
+        if self.worker_monitor:
+            self.worker_monitor.start()
+        # 取消事件：满足终止策略时设置，正在执行的测试用例可通过is_cancelled()方法获取其状态
+        self.cancel_event = ProcessEvent() if execution_mode == ExecutionMode.PROCESS else Event()
+        # 超时后仍在被放弃的工作线程中执行的测试用例：id：测试用例，该线程返回前不重新执行，也不释放其夹具和资源
+        self.abandoned = dict()
         self.test_recorder.start_time = time()
+        event_bus.publish(EventType.RUN_STARTED, test_task=self.test_task)
         self._run_test_task()
         self.test_recorder.end_time = time()
         self.test_recorder.calculate_test_result()
         if self.test_recorder.total_count != self.test_recorder.pass_count and self.retry_strategy == RetryStrategy.RERUN_LAST:
+            if event_bus.listeners:
+                for test_case in self.test_task.test_cases:
+                    if test_case.result != TestCaseResult.PASS:
+                        event_bus.publish(EventType.CASE_RETRIED, test_case, result=test_case.result)
             self._run_test_task()
             self.test_recorder.end_time = time()
             self.test_recorder.calculate_test_result()
-        self.test_recorder.gen_test_report()
+        self.fixture_manager.finish()
+        if self.duration_history:
+            self.duration_history.flush()
+        if self.result_cache:
+            self.result_cache.flush()
+        self.resource_manager.stop()
+        if self.worker_monitor:
+            self.worker_monitor.stop()
+        if self.test_recorder.test_cases:
+            self.test_recorder.gen_test_report()
+        else:  # 惰性参数化测试用例可能全部被过滤
+            Writer().write_line('没有执行任何测试用例。')
+        if self.resource_manager.usages:
+            self.resource_manager.gen_report()
+        if self.fixture_manager.usages:
+            self.fixture_manager.gen_report()
+        if self.worker_monitor:
+            self.worker_monitor.gen_report()
+        event_bus.publish(EventType.RUN_FINISHED, test_recorder=self.test_recorder)
+        event_bus.flush()  # 返回前通知完全部事件
+
+    @staticmethod
+    def _check_process_fixtures(test_task: TestTask):
+        """
+        检查在子进程中执行的测试用例依赖的夹具：子进程各自初始化夹具，无法统计依赖数量，因此只支持工作者作用域。
+        :param test_task: 测试任务
+        :return:
+        """
+        fixture_classes = chain.from_iterable(chain(
+            (test_case.fixtures for test_case in test_task.test_cases),
+            (lazy_test_cases.test_case_class.fixtures for lazy_test_cases in test_task.lazy_test_cases)))
+        fixture_names = sorted({fixture_class.__name__ for fixture_class in fixture_classes
+                                if fixture_class.scope != FixtureScope.WORKER})
+        if fixture_names:
+            raise ValueError(f'在子进程中执行测试用例时只支持工作者作用域的夹具：{", ".join(fixture_names)}！')
 
     def _run_test_task(self):
         """
-        执行测试任务
+        执行测试任务：parallel个常驻工作线程从同一个待执行队列中获取测试用例并直接执行，超时由看门狗线程统一监控。
+        多进程执行时，工作线程只负责向独占的子进程分发测试用例和收集测试结果。
         :return:
         """
-        with ThreadPoolExecutor(max_workers=self.parallel) as executor:
-            futures = list()
-            stop_event = Event()
-            for test_case in self.test_task.test_cases:
-                if test_case.result != TestCaseResult.PASS:
-                    futures.append(executor.submit(self._run_test_case, test_case, stop_event))
-            wait(futures, return_when=FIRST_EXCEPTION)  # 第一次抛出异常时返回结果
+        # 待执行队列，元素格式：(测试用例, 是否为重新执行)
+        self.pending = deque((test_case, False) for test_case in self._get_test_cases_to_run())
+        if self.worker_monitor:
+            self.worker_monitor.submit(test_case for test_case, _ in self.pending)
+        self.unsettled_count = len(self.pending)  # 尚未得出最终测试结果的测试用例数量
+        self._start_lazy()
+        self.worker_count = 0  # 未被替换的工作线程数量
+        self.condition = Condition()
+        self.process_workers = list()
+        self.process_workers_lock = Lock()
+        self.local = local()  # 工作线程独占的子进程工作者
+        self.watchdog = TimeoutWatchdog()
+        self.watchdog.start()
+        try:
+            worker_count = self.parallel if self.lazy_iterator else min(self.parallel, self.unsettled_count)
+            for _ in range(worker_count):
+                self._start_worker()
+            with self.condition:
+                while self.unsettled_count or self.worker_count:  # 等待工作线程清理工作者作用域的夹具后退出
+                    self.condition.wait()
+        finally:
+            self.watchdog.stop()
+            for process_worker in self.process_workers:
+                process_worker.close()
 
-    def _run_test_case(self, test_case: TestCase, stop_event: Event):
+    def _get_test_cases_to_run(self):
         """
-        执行测试用例
+        获取待执行的测试用例（排除已执行成功的测试用例），并按测试调度器决定的顺序排列。
+        命中测试结果缓存的测试用例直接记录为执行成功，不再执行。
+        :return:
+        """
+        test_cases = list()
+        for test_case in self.test_task.test_cases:
+            if test_case.result == TestCaseResult.PASS or id(test_case) in self.abandoned:
+                continue
+            if self.result_cache and self.result_cache.is_passed(test_case):
+                self._record_cached(test_case)
+                continue
+            test_cases.append(test_case)
+        self.fixture_manager.start(test_cases)
+        for test_case in list(self.abandoned.values()):
+            if test_case is not None:
+                self.fixture_manager.retain(test_case)  # 被放弃的工作线程返回时才释放
+        test_cases = self.test_scheduler.schedule(test_cases)
+        if event_bus.listeners:
+            for test_case in test_cases:
+                event_bus.publish(EventType.CASE_QUEUED, test_case)
+        return test_cases
+
+    def _record_cached(self, test_case: TestCase):
+        """
+        命中测试结果缓存的测试用例直接记录为执行成功
         :param test_case: 测试用例
-        :param stop_event: 停止事件
         :return:
         """
-        if stop_event.is_set():  # 设置了停止事件，则不再执行测试用例
-            return
+        test_case.cached = True
         self.test_recorder.start_run(test_case)
+        self.test_recorder.stop_run(test_case, TestCaseResult.PASS)
+        event_bus.publish(EventType.CASE_FINISHED, test_case, result=TestCaseResult.PASS, result_detail='',
+                          duration=0.0, rerun=False)
+
+    def _start_lazy(self):
+        """
+        开始生成惰性参数化测试用例：只在第一次执行测试任务时生成，最后重新执行时只执行其中未执行成功的测试用例。
+        :return:
+        """
+        if self.lazy_pending:
+            self.lazy_pending = False
+            self.lazy_iterator = self._gen_lazy_test_cases()
+
+    def _gen_lazy_test_cases(self):
+        """
+        逐个生成惰性参数化测试用例，命中测试结果缓存的测试用例直接记录。
+        生成同一组测试用例期间额外持有一次其依赖的夹具，避免类和模块作用域的夹具在相邻的测试用例之间被反复清理。
+        :return:
+        """
+        for lazy_test_cases in self.test_task.lazy_test_cases:
+            held = None
+            try:
+                for test_case in lazy_test_cases:
+                    if self.result_cache and self.result_cache.is_passed(test_case):
+                        self._record_cached(test_case)
+                        self.test_recorder.test_cases.append(TestCaseRecord(test_case))
+                        continue
+                    if held is None and test_case.fixtures:
+                        held = test_case
+                        self.fixture_manager.retain(held)
+                    self.fixture_manager.retain(test_case)
+                    yield test_case
+            except Exception:  # 参数值有误时跳过该组剩余的测试用例
+                Writer().write_error(f'生成测试用例{lazy_test_cases.test_case_class.__name__}失败：'
+                                     f'{traceback.format_exc()}')
+            finally:  # 满足终止策略后迭代器被丢弃时也会执行
+                if held:
+                    self.fixture_manager.release(held)
+
+    def _next_lazy(self):
+        """
+        生成下一个惰性参数化测试用例。调用时须持有self.condition。
+        :return: 待执行项，已全部生成时返回None
+        """
+        if self.lazy_iterator is None:
+            return None
+        test_case = next(self.lazy_iterator, None)
+        if test_case is None:
+            self.lazy_iterator = None
+            self.condition.notify_all()
+            return None
+        self.lazy_ids.add(id(test_case))
+        self.unsettled_count += 1
+        if self.worker_monitor:
+            self.worker_monitor.submit([test_case])
+        event_bus.publish(EventType.CASE_QUEUED, test_case)
+        return test_case, False
+
+    def _settle_lazy(self, test_case: TestCase):
+        """
+        惰性参数化测试用例得出最终测试结果：执行成功的只保留测试用例记录，其它的加入测试任务，以便最后重新执行。
+        :param test_case: 测试用例
+        :return:
+        """
+        if test_case.result == TestCaseResult.PASS:
+            self.test_recorder.test_cases.append(TestCaseRecord(test_case))
+        else:
+            self.test_recorder.test_cases.append(test_case)
+            self.test_task.test_cases.append(test_case)
+
+    def _start_worker(self):
+        with self.condition:
+            self.worker_count += 1
+        Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        """
+        工作线程：循环从待执行队列中获取测试用例并执行
+        :return:
+        """
+        bind_cancel_event(self.cancel_event)
+        self.fixture_manager.start_worker()
+        self.local.worker_usage = self.worker_monitor.start_worker() if self.worker_monitor else None
+        replaced = False
         try:
-            start_time = perf_counter()
-            thread = TestCaseThread(test_case)
-            thread.start()
-            thread.join(self.timeout)
-            end_time = perf_counter()
-            take_time = end_time - start_time
-            if take_time > self.timeout:
-                raise TimeoutError
-            elif thread.exception:
-                raise thread.exception
-            else:
-                self.test_recorder.stop_run(test_case, TestCaseResult.PASS)
-        except Exception as first:
-            if isinstance(first, AssertionError):
-                self.test_recorder.stop_run(test_case, TestCaseResult.FAIL, traceback.format_exc())
-            elif isinstance(first, TimeoutError):
-                self.test_recorder.stop_run(test_case, TestCaseResult.TIMEOUT, f'执行单个测试用例超时，超时时间为：{self.timeout}秒')
+            if self.execution_mode == ExecutionMode.PROCESS:
+                self._work_process()
+                return
+            while True:
+                with self.condition:
+                    while True:
+                        item = self._pop_pending()
+                        if item or not self.resource_manager.waiting_count:
+                            break
+                        self.condition.wait()  # 剩余的测试用例均在等待资源
+                    if item is None:
+                        return
+                    test_case, rerun = item
+                if not self._run_test_case(test_case, rerun):
+                    replaced = True
+                    return  # 测试用例已超时，当前工作线程已被替换
+        finally:
+            self.fixture_manager.stop_worker()  # 在工作线程中清理工作者作用域的夹具
+            if self.local.worker_usage:
+                self.worker_monitor.stop_worker(self.local.worker_usage)
+            if not replaced:
+                with self.condition:
+                    self.worker_count -= 1
+                    self.condition.notify_all()
+
+    def _work_process(self):
+        """
+        多进程执行时的工作线程：子进程执行当前测试用例的同时，向其预取prefetch个测试用例，
+        子进程执行完当前测试用例后无需等待主进程分发即可执行下一个，从而持续忙碌到测试任务结束。
+        :return:
+        """
+        process_worker = self._get_process_worker()
+        in_flight = deque()  # 已发送给子进程、尚未返回测试结果的(测试用例, 是否为重新执行, 发送时间)
+        ready_time = perf_counter()  # 子进程返回上一个测试结果、开始执行下一个测试用例的时间
+        usage = self.local.worker_usage
+        while True:
+            for test_case, rerun in self._fetch_pending(len(in_flight)):
+                error = process_worker.submit(test_case, self.profiler.get_level(test_case))
+                if error is None:
+                    in_flight.append((test_case, rerun, perf_counter()))
+                    continue
+                self.test_recorder.start_run(test_case)  # 测试用例无法被序列化
+                event_bus.publish(EventType.CASE_STARTED, test_case, rerun=rerun)
+                self._release_resources(test_case)
+                self._handle_result(test_case, rerun, 0.0, TestCaseResult.BLOCK, error)
+            if not in_flight:
+                return
+            test_case, rerun, submit_time = in_flight.popleft()
+            start_time = max(submit_time, ready_time)  # 预取的测试用例在上一个测试用例执行完毕后开始执行
+            previous_result = test_case.result
+            self.test_recorder.start_run(test_case)
+            event_bus.publish(EventType.CASE_STARTED, test_case, rerun=rerun)
+            if usage:
+                self.worker_monitor.start_run(usage, test_case, start_time)
+            outcome = process_worker.receive(self._get_timeout(test_case), perf_counter() - start_time)
+            ready_time = perf_counter()
+            if process_worker.process is None and in_flight:  # 子进程已被终止，预取的测试用例均未执行
+                self._requeue([(item[0], item[1]) for item in in_flight])
+                in_flight.clear()
+            self._release_resources(test_case)
+            if outcome is None:  # 满足终止策略后子进程未执行该测试用例
+                test_case.result = previous_result
+                self._discard([test_case])
+                continue
+            if usage:
+                self.worker_monitor.stop_run(usage, ready_time - start_time)
+            self._handle_result(test_case, rerun, ready_time - start_time, *outcome)
+
+    def _fetch_pending(self, in_flight_count: int) -> list:
+        """
+        获取待发送给子进程的测试用例：子进程空闲时等待获取1个，否则最多预取至prefetch个。
+        占用资源的测试用例不预取，避免在等待子进程期间提前占用资源。
+        :param in_flight_count: 已发送给子进程、尚未返回测试结果的测试用例数量
+        :return: 待执行项的列表，子进程空闲且没有可执行的测试用例时返回空列表
+        """
+        items = list()
+        with self.condition:
+            while in_flight_count + len(items) <= self.prefetch:
+                busy = in_flight_count or items
+                if busy and (self.pending[0][0].resources if self.pending else self.lazy_iterator is None):
+                    break
+                item = self._pop_pending()
+                if item:
+                    items.append(item)
+                    continue
+                if busy or not self.resource_manager.waiting_count:
+                    break
+                self.condition.wait()  # 剩余的测试用例均在等待资源
+        return items
+
+    def _requeue(self, items: list):
+        """
+        将已预取但未执行的测试用例放回待执行队列的头部，满足终止策略后则直接丢弃。
+        :param items: 待执行项的列表
+        :return:
+        """
+        for test_case, _ in items:
+            self._release_resources(test_case)
+        if self.cancel_event.is_set():
+            self._discard([test_case for test_case, _ in items])
+            return
+        with self.condition:
+            self.pending.extendleft(reversed(items))
+            self.condition.notify_all()
+
+    def _discard(self, test_cases: list):
+        """
+        丢弃满足终止策略后未执行的测试用例
+        :param test_cases: 测试用例
+        :return:
+        """
+        with self.condition:
+            self.unsettled_count -= len(test_cases)
+            if not self.unsettled_count:
+                self.condition.notify_all()
+            lazy_test_cases = self._pop_lazy_ids(test_cases)
+        for test_case in test_cases:
+            self.fixture_manager.release(test_case)
+        for test_case in lazy_test_cases:
+            self._settle_lazy(test_case)
+
+    def _pop_pending(self):
+        """
+        从待执行队列中取出第一个资源充足的测试用例，资源不足的测试用例转入资源管理器排队。调用时须持有self.condition。
+        :return: 待执行项，没有可执行的测试用例时返回None。
+        """
+        while self.pending:
+            item = self.pending.popleft()
+            if self.resource_manager.acquire(item[0], item):
+                return item
+        return self._next_lazy()  # 惰性参数化测试用例不占用资源
+
+    def _pop_lazy_ids(self, test_cases) -> list:
+        """
+        找出已得出最终测试结果的惰性参数化测试用例。调用时须持有self.condition。
+        :param test_cases: 测试用例
+        :return: 其中的惰性参数化测试用例
+        """
+        if not self.lazy_ids:
+            return []
+        lazy_test_cases = [test_case for test_case in test_cases if id(test_case) in self.lazy_ids]
+        for test_case in lazy_test_cases:
+            self.lazy_ids.discard(id(test_case))
+        return lazy_test_cases
+
+    def _release_resources(self, test_case: TestCase):
+        """
+        释放测试用例占用的资源，资源已充足的排队测试用例放回待执行队列的头部。
+        :param test_case: 测试用例
+        :return:
+        """
+        if not test_case.resources:
+            return
+        with self.condition:
+            ready = self.resource_manager.release(test_case)
+            if ready:
+                self.pending.extendleft(reversed(ready))
+                self.condition.notify_all()
+
+    def _run_test_case(self, test_case: TestCase, rerun: bool = False) -> bool:
+        """
+        执行测试用例
+        :param test_case: 测试用例
+        :param rerun: 是否为重新执行
+        :return: 测试用例超时返回False
+        """
+        self.test_recorder.start_run(test_case)
+        event_bus.publish(EventType.CASE_STARTED, test_case, rerun=rerun)
+        start_time = perf_counter()
+        usage = self.local.worker_usage
+        if usage:
+            self.worker_monitor.start_run(usage, test_case, start_time)
+        outcome = self._execute_test_case(test_case, rerun)
+        if usage:
+            self.worker_monitor.stop_run(usage, perf_counter() - start_time)
+        if outcome is None:  # 测试用例已被判定为超时，此时才释放其占用的资源和夹具
+            with self.condition:
+                handled = self.abandoned.pop(id(test_case), None) is not None
+                if not handled:
+                    self.abandoned[id(test_case)] = None  # 看门狗线程尚未处理超时，由其释放
+            if handled:
+                self._release_resources(test_case)
+                self.fixture_manager.release(test_case)
+            return False
+        self._release_resources(test_case)
+        self._handle_result(test_case, rerun, perf_counter() - start_time, *outcome)
+        return True
+
+    def _execute_test_case(self, test_case: TestCase, rerun: bool):
+        """
+        在工作线程中执行单次测试用例
+        :param test_case: 测试用例
+        :param rerun: 是否为重新执行
+        :return: 测试结果、结果详情、资源消耗和基准测试结果，若测试用例已被看门狗判定为超时则返回None
+        """
+        timeout = self._get_timeout(test_case)  # 每次执行（包括重新执行）单独计算超时时间
+        profile_level = self.profiler.get_level(test_case)
+        if profile_level == ProfileLevel.MEMORY and self.parallel > 1:
+            # tracemalloc跟踪整个进程的内存分配，多个工作线程同时执行时无法归属到单个测试用例，因此只测量时间
+            profile_level = ProfileLevel.TIME
+        entry = self.watchdog.watch(timeout, lambda: self._handle_timeout(test_case, rerun))
+        outcome = _execute(test_case, self.fixture_manager, profile_level)
+        if not self.watchdog.cancel(entry):
+            return None
+        return outcome
+
+    def _get_process_worker(self):
+        """
+        获取当前工作线程独占的子进程工作者，首次获取时创建。
+        :return:
+        """
+        process_worker = getattr(self.local, 'process_worker', None)
+        if process_worker is None:
+            process_worker = self.local.process_worker = ProcessWorker(self.cancel_event)
+            with self.process_workers_lock:
+                self.process_workers.append(process_worker)
+        return process_worker
+
+    def _get_timeout(self, test_case: TestCase):
+        """
+        获取测试用例的超时时间：测试用例未设置时，使用测试执行器的超时时间。
+        :param test_case: 测试用例
+        :return:
+        """
+        return test_case.timeout if test_case.timeout else self.timeout
+
+    def _handle_timeout(self, test_case: TestCase, rerun: bool):
+        """
+        处理超时的测试用例：在看门狗线程中调用，启动新的工作线程替换被阻塞的工作线程。
+        被阻塞的工作线程可能仍在使用该测试用例及其夹具和资源，因此不重新执行该测试用例，其夹具和资源在该线程返回后才释放。
+        :param test_case: 测试用例
+        :param rerun: 是否为重新执行
+        :return:
+        """
+        timeout = self._get_timeout(test_case)
+        with self.condition:
+            self.worker_count -= 1
+            returned = id(test_case) in self.abandoned  # 被阻塞的工作线程已经返回
+            if returned:
+                del self.abandoned[id(test_case)]
             else:
-                self.test_recorder.stop_run(test_case, TestCaseResult.BLOCK, traceback.format_exc())
-            if self.stop_strategy == StopStrategy.FIRST_NOT_PASS or self.stop_strategy == StopStrategy.FIRST_P0_NOT_PASS and test_case.priority == TestCasePriority.P0:
+                self.abandoned[id(test_case)] = test_case
+        if returned:
+            self._release_resources(test_case)
+        self._handle_result(test_case, rerun, timeout, TestCaseResult.TIMEOUT,
+                            f'执行单个测试用例超时，超时时间为：{timeout}秒', abandoned=not returned)
+        self._start_worker()  # 先处理测试结果，确保重新执行的测试用例能被新的工作线程获取
+
+    def _handle_result(self, test_case: TestCase, rerun: bool, duration: float, result: TestCaseResult,
+                       result_detail: str, profile_result: Optional[CaseProfile] = None,
+                       benchmark_result: Optional[BenchmarkResult] = None, abandoned: bool = False):
+        """
+        记录测试结果，并根据终止策略和重试策略决定后续操作
+        :param test_case: 测试用例
+        :param rerun: 是否为重新执行
+        :param duration: 执行耗时（单位秒）
+        :param result: 测试结果
+        :param result_detail: 结果详情
+        :param profile_result: 资源消耗，未测量时为None
+        :param benchmark_result: 基准测试结果，非基准测试用例为None
+        :param abandoned: 测试用例是否仍在被放弃的工作线程中执行：是则不立即重新执行，也不释放其夹具
+        :return:
+        """
+        _set_result_attr(test_case, 'profile_result', profile_result)  # 测试记录器可通过测试用例获取资源消耗
+        _set_result_attr(test_case, 'benchmark_result', benchmark_result)
+        self.test_recorder.stop_run(test_case, result, result_detail)
+        event_bus.publish(EventType.CASE_FINISHED, test_case, result=result, result_detail=result_detail,
+                          duration=duration, rerun=rerun)
+        self._record_run(test_case, result, duration)
+        rerun_now = False
+        lazy_test_cases = []
+        with self.condition:
+            if result != TestCaseResult.PASS and not rerun:
+                if self._should_stop(test_case):
+                    self.retry_strategy = RetryStrategy.NOT_RERUN  # 终止策略优先级大于重试策略
+                    # 立即丢弃剩余的测试用例（包括等待资源的测试用例），不再生成惰性参数化测试用例
+                    self.unsettled_count -= len(self.pending) + self.resource_manager.clear()
+                    lazy_test_cases = self._pop_lazy_ids([item[0] for item in self.pending])
+                    self.pending.clear()
+                    self.lazy_iterator = None
+                    self.cancel_event.set()  # 通知正在执行的测试用例
+                    self.condition.notify_all()
+                elif self.retry_strategy == RetryStrategy.RERUN_NOW and not abandoned:
+                    self.fixture_manager.retain(test_case)  # 重新执行前不清理夹具
+                    self.pending.appendleft((test_case, True))
+                    if self.worker_monitor:
+                        self.worker_monitor.submit([test_case])
+                    rerun_now = True
+            if not rerun_now:
+                self.unsettled_count -= 1
+                if not self.unsettled_count:
+                    self.condition.notify_all()
+                lazy_test_cases.extend(self._pop_lazy_ids([test_case]))
+        if rerun_now:
+            event_bus.publish(EventType.CASE_RETRIED, test_case, result=result)
+        if not abandoned:
+            self.fixture_manager.release(test_case)
+        for lazy_test_case in lazy_test_cases:
+            self._settle_lazy(lazy_test_case)
+
+    def _record_run(self, test_case: TestCase, result: TestCaseResult, duration: float):
+        """
+        记录执行耗时历史和测试结果缓存
+        :param test_case: 测试用例
+        :param result: 测试结果
+        :param duration: 执行耗时（单位秒）
+        :return:
+        """
+        if self.duration_history and result != TestCaseResult.NOT_EXECUTED:  # 提前结束的耗时不代表正常执行的耗时
+            self.duration_history.record(test_case, duration)
+        if self.result_cache:
+            self.result_cache.record(test_case, result)
+
+    def _should_stop(self, test_case: TestCase):
+        """
+        测试用例未执行成功时，判断是否满足终止策略
+        :param test_case: 测试用例
+        :return:
+        """
+        return self.stop_strategy == StopStrategy.FIRST_NOT_PASS or \
+            self.stop_strategy == StopStrategy.FIRST_P0_NOT_PASS and test_case.priority == TestCasePriority.P0
+
+
+class AsyncTestRunner(DefaultTestRunner):
+    """
+    异步测试执行器实现类：在一个事件循环中并发执行测试用例，此时parallel表示最大并发数量。
+    定义为async def的setup、test_case和teardown直接在事件循环中执行，超时后会被取消；
+    普通方法则在最多min(parallel, max_threads)个线程的线程池中执行，超时后无法被取消。
+    """
+
+    def __init__(self, max_threads: int = 100):
+        """
+        :param max_threads: 执行普通方法的线程池的最大线程数量，避免最大并发数量很大时创建过多线程。
+        """
+        if not isinstance(max_threads, int) or max_threads <= 0:
+            raise ValueError('max_threads必须是正整数！')
+        super().__init__()
+        self.max_threads = max_threads
+
+    def run(self, test_task: TestTask, test_recorder: TestRecorder, stop_strategy: StopStrategy,
+            retry_strategy: RetryStrategy, timeout: int, parallel: int,
+            execution_mode: ExecutionMode = ExecutionMode.THREAD, duration_history: Optional[DurationHistory] = None,
+            test_scheduler: Optional[TestScheduler] = None, result_cache: Optional[ResultCache] = None,
+            resource_manager: Optional[ResourceManager] = None, profiler: Optional[Profiler] = None,
+            worker_monitor: Optional[WorkerMonitor] = None):
+        if execution_mode != ExecutionMode.THREAD:
+            raise ValueError(f'异步测试执行器不支持该执行模式：{execution_mode.value[0]}！')
+        if any(test_case.resources for test_case in test_task.test_cases):
+            raise ValueError('异步测试执行器不支持占用资源的测试用例！')
+        if worker_monitor:
+            raise ValueError('异步测试执行器不支持工作者监视器！')
+        super().run(test_task, test_recorder, stop_strategy, retry_strategy, timeout, parallel, execution_mode,
+                    duration_history, test_scheduler, result_cache, resource_manager, profiler)
+
+    def _run_test_task(self):
+        # 普通方法在单独的线程池中执行，默认线程池的线程数量较少，会限制并发数量；线程数量同时受max_threads限制
+        self.executor = ThreadPoolExecutor(min(self.parallel, self.max_threads))
+        try:
+            asyncio.run(self._run_test_task_async())
+        finally:
+            self.executor.shutdown(wait=False)  # 超时的普通方法无法被取消，不等待其执行完毕
+
+    async def _run_test_task_async(self):
+        """
+        执行测试任务：启动parallel个协程从同一个迭代器中获取测试用例，内存占用与测试用例数量无关。
+        :return:
+        """
+        test_cases = self._get_test_cases_to_run()
+        worker_scoped = any(fixture_class.scope == FixtureScope.WORKER
+                            for test_case in test_cases for fixture_class in test_case.fixtures)
+        self._start_lazy()
+        if self.lazy_iterator:
+            worker_scoped = worker_scoped or any(fixture_class.scope == FixtureScope.WORKER
+                                                 for lazy_test_cases in self.test_task.lazy_test_cases
+                                                 for fixture_class in lazy_test_cases.test_case_class.fixtures)
+            test_cases = chain(test_cases, self._mark_lazy(self.lazy_iterator))
+        test_cases = iter(test_cases)
+        bind_cancel_event(self.cancel_event)  # 协程会继承当前上下文
+
+        async def worker():
+            self.fixture_manager.start_worker()  # 每个工作协程在独立的上下文中运行
+            try:
+                for test_case in test_cases:
+                    if self.cancel_event.is_set():  # 满足终止策略，则不再执行测试用例
+                        return
+                    await self._run_test_case_async(test_case)
+                    if id(test_case) in self.lazy_ids:
+                        self.lazy_ids.discard(id(test_case))
+                        self._settle_lazy(test_case)
+            finally:
+                if worker_scoped:  # 夹具清理可能阻塞，因此在线程池中执行
+                    await asyncio.get_event_loop().run_in_executor(self.executor, copy_context().run,
+                                                                   self.fixture_manager.stop_worker)
+
+        await asyncio.gather(*[worker() for _ in range(self.parallel)])
+
+    def _mark_lazy(self, lazy_iterator):
+        """
+        记录生成的惰性参数化测试用例
+        :param lazy_iterator: 惰性参数化测试用例的迭代器
+        :return:
+        """
+        for test_case in lazy_iterator:
+            self.lazy_ids.add(id(test_case))
+            event_bus.publish(EventType.CASE_QUEUED, test_case)
+            yield test_case
+
+    async def _run_test_case_async(self, test_case: TestCase):
+        """
+        执行测试用例，执行完毕后释放其依赖的夹具
+        :param test_case: 测试用例
+        :return:
+        """
+        self.test_recorder.start_run(test_case)
+        try:
+            result = await self._run_once_async(test_case)
+            if result == TestCaseResult.PASS:
+                return
+            if self._should_stop(test_case):
                 self.retry_strategy = RetryStrategy.NOT_RERUN  # 终止策略优先级大于重试策略
-                stop_event.set()
-                raise Exception
+                self.cancel_event.set()
+                return
             if self.retry_strategy == RetryStrategy.RERUN_NOW:
-                try:
-                    start_time = perf_counter()
-                    thread = TestCaseThread(test_case)
-                    thread.start()
-                    thread.join(self.timeout)
-                    end_time = perf_counter()
-                    take_time = end_time - start_time
-                    if take_time > self.timeout:
-                        raise TimeoutError
-                    elif thread.exception:
-                        raise thread.exception
-                    else:
-                        self.test_recorder.stop_run(test_case, TestCaseResult.PASS)
-                except Exception as second:
-                    if isinstance(second, AssertionError):
-                        self.test_recorder.stop_run(test_case, TestCaseResult.FAIL, traceback.format_exc())
-                    elif isinstance(second, TimeoutError):
-                        self.test_recorder.stop_run(test_case, TestCaseResult.TIMEOUT,
-                                                    f'执行单个测试用例超时，超时时间为：{self.timeout}秒')
-                    else:
-                        self.test_recorder.stop_run(test_case, TestCaseResult.BLOCK, traceback.format_exc())
+                event_bus.publish(EventType.CASE_RETRIED, test_case, result=result)
+                await self._run_once_async(test_case, True)
+        finally:
+            if test_case.fixtures:  # 夹具清理可能阻塞，因此在线程池中执行
+                await asyncio.get_event_loop().run_in_executor(self.executor, self.fixture_manager.release, test_case)
+
+    async def _run_once_async(self, test_case: TestCase, rerun: bool = False):
+        """
+        执行单次测试用例并记录测试结果
+        :param test_case: 测试用例
+        :param rerun: 是否为重新执行
+        :return: 测试结果
+        """
+        event_bus.publish(EventType.CASE_STARTED, test_case, rerun=rerun)
+        start_time = perf_counter()
+        _set_result_attr(test_case, 'benchmark_result', None)
+        result, result_detail = await self._execute_test_case_async(test_case)
+        duration = perf_counter() - start_time
+        _set_result_attr(test_case, 'profile_result', None)  # 协程交替执行，无法单独测量资源消耗
+        self.test_recorder.stop_run(test_case, result, result_detail)
+        event_bus.publish(EventType.CASE_FINISHED, test_case, result=result, result_detail=result_detail,
+                          duration=duration, rerun=rerun)
+        self._record_run(test_case, result, duration)
+        return result
+
+    async def _execute_test_case_async(self, test_case: TestCase):
+        """
+        执行单次测试用例：超时后取消测试用例对应的协程。
+        :param test_case: 测试用例
+        :return: 测试结果和结果详情
+        """
+        timeout = self._get_timeout(test_case)
+        try:
+            await asyncio.wait_for(self._invoke_test_case(test_case), timeout)
+        except TestCaseCancelled as e:  # 满足终止策略后主动提前结束
+            return TestCaseResult.NOT_EXECUTED, str(e)
+        except AssertionError:
+            return TestCaseResult.FAIL, traceback.format_exc()
+        except (asyncio.TimeoutError, TimeoutError):
+            return TestCaseResult.TIMEOUT, f'执行单个测试用例超时，超时时间为：{timeout}秒'
+        except Exception:
+            return TestCaseResult.BLOCK, traceback.format_exc()
+        return TestCaseResult.PASS, ''
+
+    async def _invoke_test_case(self, test_case: TestCase):
+        """
+        获取依赖的夹具，并依次调用测试用例的setup、test_case和teardown方法
+        :param test_case: 测试用例
+        :return:
+        """
+        loop = asyncio.get_event_loop()
+        if test_case.fixtures:  # 夹具初始化可能阻塞，因此在线程池中执行
+            await loop.run_in_executor(self.executor, copy_context().run, self.fixture_manager.acquire, test_case)
+        for method in (test_case.setup, test_case.test_case, test_case.teardown):
+            if getattr(TestCase, method.__name__) is getattr(type(test_case), method.__name__):
+                continue  # 未重写的setup和teardown无需调度到线程池
+            if iscoroutinefunction(method):
+                await method()
+            else:
+                await loop.run_in_executor(self.executor, copy_context().run, method)  # 线程池中同样能获取取消事件
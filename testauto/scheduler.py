@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from .case import TestCase, TestCasePriority
+from .history import DurationHistory
+
+
+class TestScheduler(ABC):
+    """
+    测试调度器抽象类：决定测试用例的执行顺序。
+    """
+
+    @abstractmethod
+    def schedule(self, test_cases: List[TestCase]) -> List[TestCase]:
+        """
+        调度测试用例
+        :param test_cases: 待执行的测试用例
+        :return: 按执行顺序排列的测试用例
+        """
+        pass
+
+
+class DefaultTestScheduler(TestScheduler):
+    """
+    默认测试调度器实现类：按添加顺序执行测试用例。
+    """
+
+    def schedule(self, test_cases: List[TestCase]) -> List[TestCase]:
+        return list(test_cases)
+
+
+class LongestFirstTestScheduler(TestScheduler):
+    """
+    耗时最长优先测试调度器：按历史平均耗时从长到短执行测试用例，使并行执行时总耗时接近总工作量除以并行执行数量。
+    没有历史记录的测试用例，按有历史记录的测试用例的平均耗时估算。
+    """
+
+    def __init__(self, duration_history: DurationHistory, priority_first: bool = False):
+        """
+        :param duration_history: 执行耗时历史
+        :param priority_first: 是否优先按测试用例优先级排序，同优先级的测试用例再按耗时排序。
+        """
+        self.duration_history = duration_history
+        self.priority_first = priority_first
+
+    def schedule(self, test_cases: List[TestCase]) -> List[TestCase]:
+        durations = [self.duration_history.get_mean(test_case) for test_case in test_cases]
+        known_durations = [duration for duration in durations if duration is not None]
+        default_duration = sum(known_durations) / len(known_durations) if known_durations else 0.0
+        priorities = list(TestCasePriority)
+
+        def sort_key(index):
+            duration = durations[index] if durations[index] is not None else default_duration
+            if self.priority_first:
+                return priorities.index(test_cases[index].priority), -duration
+            return -duration
+
+        return [test_cases[index] for index in sorted(range(len(test_cases)), key=sort_key)]  # 稳定排序
@@ -0,0 +1,173 @@
+import json
+import zlib
+from heapq import heapify, heappop, heappush
+from typing import List, Optional, Tuple
+
+from .benchmark import BenchmarkResult
+from .case import TestCase, TestCasePriority, TestCaseResult
+from .histogram import LoadResult
+from .history import DurationHistory, get_test_case_key
+from .profiler import CaseProfile
+from .recorder import TestRecorder, DefaultTestRecorder, TestCaseRecord
+from .util import Writer
+
+SHARD_RESULT_VERSION = 1
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    解析分片
+    :param shard: 分片，格式：INDEX/TOTAL，比如2/20表示共20个分片中的第2个
+    :return: (分片序号, 分片总数)
+    """
+    index, _, total = shard.partition('/')
+    if not index.isdigit() or not total.isdigit() or not 1 <= int(index) <= int(total):
+        raise ValueError(f'分片的格式必须是INDEX/TOTAL，且1 <= INDEX <= TOTAL：{shard}！')
+    return int(index), int(total)
+
+
+def split_test_cases(test_cases: List[TestCase], total: int,
+                     duration_history: Optional[DurationHistory] = None) -> List[List[TestCase]]:
+    """
+    将测试用例确定性地划分为total个分片，分片内保持测试用例的原有顺序：
+    有执行耗时历史时按平均耗时均衡各分片的总耗时（耗时最长优先分配给当前总耗时最小的分片），无历史记录的测试用例按已知耗时的平均值计算；
+    全部测试用例均无历史记录时，按测试用例标识的哈希值划分。
+    注意各分片须使用相同的测试用例和执行耗时历史，否则划分结果不一致。
+    :param test_cases: 测试用例
+    :param total: 分片总数
+    :param duration_history: 执行耗时历史
+    :return: 各分片的测试用例
+    """
+    if total <= 0:
+        raise ValueError('分片总数必须是正整数！')
+    keys = [get_test_case_key(test_case) for test_case in test_cases]
+    if duration_history:
+        durations = [duration_history.get_mean(test_case) for test_case in test_cases]
+    else:
+        durations = [None] * len(test_cases)
+    known_durations = [duration for duration in durations if duration is not None]
+    assignments = [0] * len(test_cases)
+    if not known_durations:
+        for i, key in enumerate(keys):
+            assignments[i] = zlib.crc32(key.encode('UTF-8')) % total  # 与进程无关的稳定哈希
+    else:
+        default_duration = sum(known_durations) / len(known_durations)
+        weights = [duration if duration is not None else default_duration for duration in durations]
+        loads = [(0.0, shard_index) for shard_index in range(total)]  # (总耗时, 分片序号)
+        heapify(loads)
+        for i in sorted(range(len(test_cases)), key=lambda index: (-weights[index], keys[index], index)):
+            load, shard_index = heappop(loads)
+            assignments[i] = shard_index
+            heappush(loads, (load + weights[i], shard_index))
+    shards = [[] for _ in range(total)]
+    for i, test_case in enumerate(test_cases):
+        shards[assignments[i]].append(test_case)
+    return shards
+
+
+class _RecordedTestCase(TestCase):
+    """
+    从分片结果中还原的测试用例，只用于生成测试报告。
+    """
+
+    def test_case(self):
+        pass
+
+
+def dump_shard_result(path: str, index: int, total: int, test_recorder: TestRecorder):
+    """
+    保存分片结果，多个分片的结果可通过merge_shard_results()合并。
+    :param path: 文件路径
+    :param index: 分片序号
+    :param total: 分片总数
+    :param test_recorder: 执行该分片的测试记录器
+    :return:
+    """
+    records = list()
+    for test_case in test_recorder.test_cases:
+        profile_result = test_case.profile_result
+        benchmark_result = test_case.benchmark_result
+        records.append({
+            'key': test_case.key if isinstance(test_case, TestCaseRecord) else get_test_case_key(test_case),
+            'project': test_case.project,
+            'module': test_case.module,
+            'title': test_case.title,
+            'priority': test_case.priority.name,
+            'start_time': test_case.start_time,
+            'stop_time': test_case.stop_time,
+            'result': test_case.result.name,
+            'result_detail': test_case.result_detail,
+            'cached': test_case.cached,
+            'profile_result': vars(profile_result) if profile_result else None,
+            'benchmark_result': vars(benchmark_result) if benchmark_result else None,
+            'load_result': test_case.load_result.to_dict() if test_case.load_result else None,
+        })
+    data = {
+        'version': SHARD_RESULT_VERSION,
+        'index': index,
+        'total': total,
+        'start_time': test_recorder.start_time,
+        'end_time': test_recorder.end_time,
+        'test_cases': records,
+    }
+    with open(path, 'w', encoding='UTF-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+
+
+def merge_shard_results(*paths: str) -> DefaultTestRecorder:
+    """
+    合并多个分片的结果
+    :param paths: 分片结果的文件路径
+    :return: 包含全部分片测试结果的测试记录器，调用gen_test_report()即可生成完整的测试报告
+    """
+    if not paths:
+        raise ValueError('没有待合并的分片结果！')
+    shards = list()
+    for path in paths:
+        with open(path, encoding='UTF-8') as file:
+            data = json.load(file)
+        if data.get('version') != SHARD_RESULT_VERSION:
+            raise ValueError(f'不支持的分片结果版本：{path}！')
+        shards.append(data)
+    total = shards[0]['total']
+    if any(shard['total'] != total for shard in shards):
+        raise ValueError('分片结果的分片总数不一致！')
+    indexes = [shard['index'] for shard in shards]
+    if len(set(indexes)) != len(indexes):
+        raise ValueError('分片结果重复！')
+    missing_indexes = sorted(set(range(1, total + 1)) - set(indexes))
+    if missing_indexes:
+        Writer().write_warning(f'缺少以下分片的结果：{missing_indexes}')
+    test_recorder = DefaultTestRecorder()
+    test_recorder.test_cases = list()
+    shard_indexes = dict()  # 测试用例标识：所在的分片序号
+    duplicate_keys = list()
+    for shard in sorted(shards, key=lambda item: item['index']):
+        for record in shard['test_cases']:
+            if shard_indexes.setdefault(record['key'], shard['index']) != shard['index']:
+                duplicate_keys.append(record['key'])
+            test_case = _RecordedTestCase()
+            test_case.project = record['project']
+            test_case.module = record['module']
+            test_case.title = record['title']
+            test_case.priority = TestCasePriority[record['priority']]
+            test_case.start_time = record['start_time']
+            test_case.stop_time = record['stop_time']
+            test_case.result = TestCaseResult[record['result']]
+            test_case.result_detail = record['result_detail']
+            test_case.cached = record['cached']
+            if record['profile_result']:
+                test_case.profile_result = CaseProfile(**record['profile_result'])
+            if record.get('benchmark_result'):
+                test_case.benchmark_result = BenchmarkResult(**record['benchmark_result'])
+            if record.get('load_result'):
+                test_case.load_result = LoadResult.from_dict(record['load_result'])
+            test_recorder.test_cases.append(test_case)
+    if duplicate_keys:  # 各分片的测试用例或执行耗时历史不一致时，可能有测试用例被重复执行或遗漏
+        Writer().write_warning(f'以下{len(duplicate_keys)}个测试用例出现在多个分片中：{sorted(set(duplicate_keys))[:10]}')
+    executed_shards = [shard for shard in shards if shard['start_time']]  # 排除没有测试用例的分片
+    if executed_shards:
+        test_recorder.start_time = min(shard['start_time'] for shard in executed_shards)
+        test_recorder.end_time = max(shard['end_time'] for shard in executed_shards)
+    test_recorder.calculate_test_result()
+    return test_recorder
@@ -0,0 +1,392 @@
+import csv
+import json
+import mmap
+from abc import ABC, abstractmethod
+from array import array
+from copy import copy
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+
+class _MappedFile:
+    """
+    内存映射的数据文件及其稀疏偏移索引，同一文件的各个选取范围共享。
+    """
+
+    def __init__(self, file: str):
+        self.file = file
+        self.mm: Optional[mmap.mmap] = None
+        self.size = 0
+        self.data_offset = 0  # 第一行数据的偏移
+        self.header: Optional[list] = None  # 列名：CSV文件的表头或JSONL文件第一行数据的键
+        self.indexes: Optional[Tuple[int, ...]] = None  # columns对应的列序号（CSV文件）
+        self.offsets: Optional[array] = None  # 每index_interval行数据的起始偏移
+        self.row_count = 0
+
+
+class FileParamSource(ABC):
+    """
+    基于文件的参数值来源抽象类：作为@parameterized装饰器的参数值使用时，测试执行器会以惰性参数化的方式逐行读取文件，
+    文件通过内存映射读取，不会整体加载到内存中。
+    需要按行号随机访问（get_row()、select()、shard()和len()）时，首次访问会扫描一遍文件，每index_interval行记录一个偏移，
+    此后定位任意一行最多只需向后扫描index_interval - 1行。
+    """
+
+    def __init__(self, file: str, columns: Optional[Sequence[Union[str, int]]] = None,
+                 converters: Optional[Dict[Union[str, int], Callable]] = None, row_number: bool = False,
+                 encoding: str = 'UTF-8', index_interval: int = 1000):
+        """
+        :param file: 文件路径
+        :param columns: 依次对应@parameterized装饰器参数名的列，None-全部列
+        :param converters: 列：转换函数，用于将读取的值转换为参数值
+        :param row_number: 是否在参数值末尾追加行号（从0开始，不包括表头和空行），可用于按行号重建测试用例
+        :param encoding: 文件编码
+        :param index_interval: 偏移索引的间隔行数
+        """
+        if not isinstance(index_interval, int) or index_interval <= 0:
+            raise ValueError('index_interval必须是正整数！')
+        self.file = file
+        self.columns = tuple(columns) if columns is not None else None
+        self.converters = dict(converters) if converters else dict()
+        self.row_number = row_number
+        self.encoding = encoding
+        self.index_interval = index_interval
+        self.start = 0  # 选取范围的起始行号（包括）
+        self.stop: Optional[int] = None  # 选取范围的结束行号（不包括），None-直到文件末尾
+        self._mapped = _MappedFile(file)
+
+    def __call__(self) -> Iterator[tuple]:
+        """
+        逐行读取选取范围内的参数值
+        :return:
+        """
+        mapped = self._open()
+        row_number = self.start
+        for start, end in self._iter_records(self._get_offset(row_number)):
+            if self.stop is not None and row_number >= self.stop:
+                return
+            yield self._get_param_values(mapped.mm[start:end], row_number)
+            row_number += 1
+
+    def __len__(self) -> int:
+        row_count = self._build_index().row_count
+        stop = row_count if self.stop is None else min(self.stop, row_count)
+        return max(stop - min(self.start, row_count), 0)
+
+    def get_row(self, row_number: int) -> tuple:
+        """
+        按行号读取参数值
+        :param row_number: 行号（从0开始，不包括表头和空行）
+        :return:
+        """
+        mapped = self._build_index()
+        if not isinstance(row_number, int) or not 0 <= row_number < mapped.row_count:
+            raise ValueError(f'行号{row_number}超出范围！')
+        start, end = next(self._iter_records(self._get_offset(row_number)))
+        return self._get_param_values(mapped.mm[start:end], row_number)
+
+    def get_test_case(self, test_case_class, row_number: int):
+        """
+        按行号重建测试用例，比如重新执行分片结果中某个未执行成功的测试用例
+        :param test_case_class: 使用该参数值来源的测试用例类
+        :param row_number: 行号
+        :return:
+        """
+        return test_case_class(param_names=getattr(test_case_class, '_param_names'),
+                               param_values=self.get_row(row_number))
+
+    def select(self, start: int = 0, stop: Optional[int] = None):
+        """
+        选取行号范围，与原参数值来源共享内存映射和偏移索引
+        :param start: 起始行号（包括），相对于当前选取范围
+        :param stop: 结束行号（不包括），相对于当前选取范围，None-直到文件末尾
+        :return: 新的参数值来源
+        """
+        if start < 0 or stop is not None and stop < start:
+            raise ValueError('行号范围有误！')
+        source = copy(self)
+        source.start = self.start + start
+        source.stop = self.start + stop if stop is not None else self.stop
+        if self.stop is not None:
+            source.stop = min(source.stop, self.stop)
+        return source
+
+    def shard(self, index: int, total: int):
+        """
+        将选取范围内的行均分为total份，取第index份连续的行。
+        与测试任务的shard()方法不同，其它分片的行不会被读取和解析，适合每个节点只读取部分数据的场景。
+        :param index: 分片序号，从1开始
+        :param total: 分片总数
+        :return: 新的参数值来源
+        """
+        if not isinstance(total, int) or total <= 0:
+            raise ValueError('分片总数必须是正整数！')
+        if not isinstance(index, int) or not 1 <= index <= total:
+            raise ValueError('分片序号必须在1到分片总数之间！')
+        row_count = len(self)
+        return self.select(row_count * (index - 1) // total, row_count * index // total)
+
+    def close(self):
+        """
+        关闭内存映射
+        :return:
+        """
+        if self._mapped.mm is not None:
+            self._mapped.mm.close()
+            self._mapped.mm = None
+            self._mapped.offsets = None
+
+    def _open(self) -> _MappedFile:
+        """
+        打开内存映射，并定位第一行数据
+        :return:
+        """
+        mapped = self._mapped
+        if mapped.mm is not None:
+            return mapped
+        with open(self.file, 'rb') as file:
+            size = file.seek(0, 2)
+            # 空文件无法映射，使用空的匿名映射代替
+            mapped.mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else mmap.mmap(-1, 1)
+        mapped.size = size
+        mapped.data_offset = 3 if mapped.mm[:3] == b'\xef\xbb\xbf' else 0  # 跳过UTF-8 BOM
+        self._read_header(mapped)
+        return mapped
+
+    def _build_index(self) -> _MappedFile:
+        """
+        扫描文件，建立稀疏偏移索引
+        :return:
+        """
+        mapped = self._open()
+        if mapped.offsets is not None:
+            return mapped
+        offsets = array('Q')
+        row_count = 0
+        interval = self.index_interval
+        for start, _ in self._iter_records(mapped.data_offset):
+            if row_count % interval == 0:
+                offsets.append(start)
+            row_count += 1
+        mapped.row_count = row_count
+        mapped.offsets = offsets
+        return mapped
+
+    def _get_offset(self, row_number: int) -> int:
+        """
+        获取指定行的起始偏移
+        :param row_number: 行号
+        :return: 超出文件末尾时返回文件大小
+        """
+        mapped = self._open()
+        if row_number == 0:
+            return mapped.data_offset
+        mapped = self._build_index()
+        if row_number >= mapped.row_count:
+            return mapped.size
+        offset = mapped.offsets[row_number // self.index_interval]
+        skip = row_number % self.index_interval
+        if skip:
+            for start, _ in self._iter_records(offset):
+                if not skip:
+                    return start
+                skip -= 1
+        return offset
+
+    def _iter_records(self, offset: int) -> Iterator[Tuple[int, int]]:
+        """
+        从指定偏移开始逐行扫描，跳过空行
+        :param offset: 起始偏移
+        :return: 每行的(起始偏移, 结束偏移)，不包括换行符
+        """
+        mm = self._mapped.mm
+        size = self._mapped.size
+        while offset < size:
+            end = self._find_record_end(mm, offset, size)
+            start = offset
+            offset = end + 1
+            if end > start and mm[end - 1] == 13:  # 兼容\r\n换行
+                end -= 1
+            if end > start:
+                yield start, end
+
+    def _find_record_end(self, mm: mmap.mmap, offset: int, size: int) -> int:
+        """
+        查找一行数据的结束位置
+        :param mm: 内存映射
+        :param offset: 该行的起始偏移
+        :param size: 文件大小
+        :return: 换行符的偏移，最后一行没有换行符时返回文件大小
+        """
+        end = mm.find(b'\n', offset, size)
+        return size if end == -1 else end
+
+    def _get_param_values(self, data: bytes, row_number: int) -> tuple:
+        """
+        将一行数据转换为参数值
+        :param data: 一行数据
+        :param row_number: 行号
+        :return:
+        """
+        try:
+            text = data.decode(self.encoding)
+        except UnicodeDecodeError as e:
+            raise ValueError(f'{self.file}第{row_number}行解码失败：{e}！') from None
+        values = self._parse(text, row_number)
+        if self.converters:
+            values = [self.converters[column](value) if column in self.converters else value
+                      for column, value in zip(self._get_columns(values), values)]
+        if self.row_number:
+            return (*values, row_number)
+        return tuple(values)
+
+    def _read_header(self, mapped: _MappedFile):
+        """
+        读取列名，CSV文件有表头时将data_offset移动到第一行数据
+        :param mapped: 内存映射的数据文件
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def _get_columns(self, values: list) -> tuple:
+        """
+        获取一行参数值对应的列，用于匹配转换函数
+        :param values: 一行参数值
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def _parse(self, text: str, row_number: int) -> list:
+        """
+        解析一行数据，按columns的顺序返回各列的值
+        :param text: 一行数据
+        :param row_number: 行号
+        :return:
+        """
+        pass
+
+
+class CsvParamSource(FileParamSource):
+    """
+    CSV文件参数值来源：有表头时columns可以是列名或列序号，否则只能是列序号。读取的值均为字符串，可通过converters转换。
+    支持引号中包含换行符的字段。
+    """
+
+    def __init__(self, file: str, columns: Optional[Sequence[Union[str, int]]] = None,
+                 converters: Optional[Dict[Union[str, int], Callable]] = None, row_number: bool = False,
+                 encoding: str = 'UTF-8', index_interval: int = 1000, header: bool = True, delimiter: str = ',',
+                 quotechar: str = '"'):
+        """
+        :param header: 第一行是否为表头
+        :param delimiter: 分隔符
+        :param quotechar: 引号
+        其它参数同FileParamSource
+        """
+        super().__init__(file, columns, converters, row_number, encoding, index_interval)
+        if len(delimiter) != 1 or len(quotechar) != 1:
+            raise ValueError('分隔符和引号必须是单个字符！')
+        self.header = header
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self._quote = quotechar.encode(encoding)
+
+    def _read_header(self, mapped: _MappedFile):
+        if self.header:
+            for start, end in self._iter_records(mapped.data_offset):
+                mapped.header = self._parse_row(mapped.mm[start:end].decode(self.encoding), 0)
+                mapped.data_offset = self._find_record_end(mapped.mm, start, mapped.size) + 1
+                break
+        mapped.indexes = self._resolve_columns(mapped.header)
+
+    def _resolve_columns(self, header: Optional[list]) -> Optional[Tuple[int, ...]]:
+        """
+        将columns转换为列序号
+        :param header: 表头
+        :return: None-全部列
+        """
+        if self.columns is None:
+            return None
+        indexes = list()
+        for column in self.columns:
+            if isinstance(column, int):
+                indexes.append(column)
+            elif header is not None and column in header:
+                indexes.append(header.index(column))
+            else:
+                raise ValueError(f'{self.file}中不存在列{column}！')
+        return tuple(indexes)
+
+    def _find_record_end(self, mm: mmap.mmap, offset: int, size: int) -> int:
+        end = super()._find_record_end(mm, offset, size)
+        if mm.find(self._quote, offset, end) == -1:  # 大多数行不含引号，无需统计
+            return end
+        quotes = mm[offset:end].count(self._quote)
+        while quotes % 2 and end < size:  # 引号未闭合，换行符属于字段内容
+            next_end = super()._find_record_end(mm, end + 1, size)
+            quotes += mm[end + 1:next_end].count(self._quote)
+            end = next_end
+        return end
+
+    def _get_columns(self, values: list) -> tuple:
+        return self.columns if self.columns is not None else tuple(self._mapped.header or range(len(values)))
+
+    def _parse(self, text: str, row_number: int) -> list:
+        row = self._parse_row(text, row_number)
+        indexes = self._mapped.indexes
+        if indexes is None:
+            return row
+        try:
+            return [row[index] for index in indexes]
+        except IndexError:
+            raise ValueError(f'{self.file}第{row_number}行的列数不足！') from None
+
+    def _parse_row(self, text: str, row_number: int) -> list:
+        """
+        解析一行CSV数据
+        :param text: 一行数据
+        :param row_number: 行号
+        :return: 全部列的值
+        """
+        try:
+            return next(csv.reader([text], delimiter=self.delimiter, quotechar=self.quotechar))
+        except csv.Error as e:
+            raise ValueError(f'{self.file}第{row_number}行数据有误：{e}！') from None
+
+
+class JsonlParamSource(FileParamSource):
+    """
+    JSONL文件参数值来源：每行一个JSON对象，columns为键名，None-第一行数据的全部键。
+    """
+
+    def _read_header(self, mapped: _MappedFile):
+        if self.columns is not None:
+            return
+        for start, end in self._iter_records(mapped.data_offset):
+            mapped.header = list(self._parse_row(mapped.mm[start:end].decode(self.encoding), 0))
+            break
+
+    def _get_columns(self, values: list) -> tuple:
+        return self.columns if self.columns is not None else tuple(self._mapped.header or ())
+
+    def _parse(self, text: str, row_number: int) -> list:
+        row = self._parse_row(text, row_number)
+        try:
+            return [row[column] for column in self._get_columns([])]
+        except KeyError as e:
+            raise ValueError(f'{self.file}第{row_number}行缺少键{e}！') from None
+
+    def _parse_row(self, text: str, row_number: int) -> dict:
+        """
+        解析一行JSON数据
+        :param text: 一行数据
+        :param row_number: 行号
+        :return:
+        """
+        try:
+            row = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'{self.file}第{row_number}行数据有误：{e}！') from None
+        if not isinstance(row, dict):
+            raise ValueError(f'{self.file}第{row_number}行不是JSON对象！')
+        return row
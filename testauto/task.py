@@ -1,11 +1,18 @@
+import marshal
 import os
+import sys
+import zlib
 from abc import ABC, abstractmethod
 from enum import Enum
 from importlib import import_module, util
-from inspect import getmembers, isclass
-from typing import List
+from inspect import getmembers, isclass, isabstract
+from typing import List, Optional
 
 from .case import TestCase, TestCasePriority
+from .discovery import TestCaseIndex, compile_files
+from .event import EventType, event_bus
+from .history import DurationHistory, get_test_case_key
+from .shard import split_test_cases
 from .util import handle_path
 
 
@@ -71,6 +78,67 @@ class TestCasePriorityShouldBe(TestCaseFilter):
             raise ValueError(f'不支持的操作方法：{self.operation_method.value}！')
 
 
+class LazyTestCases:
+    """
+    惰性参数化测试用例：参数值不是列表时，添加测试用例时不生成测试用例实例，而是由测试执行器在工作者空闲时逐个生成，
+    执行成功的测试用例记录测试结果后即可释放，因此内存占用取决于并发数量而不是参数值数量。
+    """
+
+    def __init__(self, test_case_class):
+        """
+        :param test_case_class: 配合@parameterized装饰器使用的测试用例类
+        """
+        if not self.is_lazy(test_case_class):
+            raise ValueError('不是惰性参数化的测试用例类！')
+        if test_case_class.resources:
+            raise ValueError('惰性参数化的测试用例不支持占用资源！')
+        param_names = getattr(test_case_class, '_param_names')
+        if not isinstance(param_names, tuple) or not all(isinstance(param_name, str) for param_name in param_names):
+            raise ValueError('参数名不是字符串！')
+        self.test_case_class = test_case_class
+        self.param_names = param_names
+        self.param_values = getattr(test_case_class, '_param_values')
+        self.test_case_filters: List[TestCaseFilter] = []  # 生成测试用例时逐个执行的过滤器
+        self.shard: Optional[tuple] = None  # (分片序号, 分片总数)，生成测试用例时按测试用例标识的哈希值选取
+        self._iterated = False
+
+    @staticmethod
+    def is_lazy(test_case_class) -> bool:
+        """
+        判断测试用例类的参数值是否需要惰性生成
+        :param test_case_class: 测试用例类
+        :return:
+        """
+        param_values = getattr(test_case_class, '_param_values', None)
+        if not getattr(test_case_class, '_param_names', None) or param_values is None:
+            return False
+        if isinstance(param_values, list):
+            return False
+        return callable(param_values) or hasattr(param_values, '__iter__')
+
+    def __iter__(self):
+        if callable(self.param_values):
+            rows = self.param_values()
+        else:
+            if self._iterated and iter(self.param_values) is self.param_values:
+                raise ValueError('参数值迭代器只能遍历一次，请改用返回可迭代对象的可调用对象！')
+            rows = self.param_values
+        self._iterated = True
+        for param_value in rows:
+            if not isinstance(param_value, tuple):
+                raise ValueError('该组参数值不是元组！')
+            if len(self.param_names) != len(param_value):
+                raise ValueError('参数名数量与参数值数量不匹配！')
+            test_case = self.test_case_class(param_names=self.param_names, param_values=param_value)
+            if self.shard:
+                index, total = self.shard
+                # 与split_test_cases()无执行耗时历史时的划分规则相同
+                if zlib.crc32(get_test_case_key(test_case).encode('UTF-8')) % total != index - 1:
+                    continue
+            if all(test_case_filter.filter([test_case]) for test_case_filter in self.test_case_filters):
+                yield test_case
+
+
 class TestTask(ABC):
     """
     测试任务抽象类
@@ -79,6 +147,7 @@ class TestTask(ABC):
     def __init__(self):
         self.test_cases: List[TestCase] = []
         self.test_case_filters: List[TestCaseFilter] = []
+        self.lazy_test_cases: List[LazyTestCases] = []  # 惰性参数化测试用例，由测试执行器在执行时逐个生成
 
     @abstractmethod
     def add_test_case(self, test_case: TestCase):
@@ -140,22 +209,67 @@ class TestTask(ABC):
     def clear_test_task(self):
         pass
 
+    def shard(self, index: int, total: int, duration_history: Optional[DurationHistory] = None):
+        """
+        分片：执行过滤器后只保留第index个分片的测试用例，用于在多台机器上分别执行同一个测试任务，划分规则见split_test_cases()。
+        :param index: 分片序号，取值范围：1~total
+        :param total: 分片总数
+        :param duration_history: 执行耗时历史，为None时按测试用例标识的哈希值划分（惰性参数化测试用例始终按哈希值划分）
+        :return:
+        """
+        if not 1 <= index <= total:
+            raise ValueError('分片序号的取值范围必须是1~分片总数！')
+        self.filter_test_cases()
+        self.test_cases = split_test_cases(self.test_cases, total, duration_history)[index - 1]
+        for lazy_test_cases in self.lazy_test_cases:  # 惰性参数化测试用例的数量未知，只能按哈希值划分
+            lazy_test_cases.shard = (index, total)
+
 
 class DefaultTestTask(TestTask):
     """
     默认测试任务实现类
     """
 
-    def __init__(self):
+    def __init__(self, test_case_index: Optional[TestCaseIndex] = None, discovery_workers: Optional[int] = None):
+        """
+        :param test_case_index: 测试用例索引，通过文件或路径添加测试用例时先静态解析文件，只导入包含所需测试用例类的模块
+        :param discovery_workers: 通过文件或路径添加测试用例时并行解析和编译文件的进程数量，为None时等于CPU核数，为1时不使用多进程
+        """
+        if discovery_workers is not None and discovery_workers < 1:
+            raise ValueError('discovery_workers必须是正整数！')
         super().__init__()
         default_filter = TestCaseCompletedShouldBe(OperationMethod.EQUAL, True)
         self.test_case_filters: List[TestCaseFilter] = [default_filter]
+        self.source_paths: List[str] = []  # 通过文件或路径添加测试用例时的文件和路径，供测试监视器使用
+        self.test_case_index = test_case_index
+        self.discovery_workers = discovery_workers
 
     def add_test_case(self, test_case: TestCase):
         self.test_cases.append(test_case)
+        event_bus.publish(EventType.TEST_CASES_DISCOVERED, test_cases=(test_case,))
 
     def add_test_cases(self, *test_cases: TestCase):
         self.test_cases.extend(test_cases)
+        event_bus.publish(EventType.TEST_CASES_DISCOVERED, test_cases=test_cases)
+
+    def add_lazy_test_cases(self, lazy_test_cases: LazyTestCases):
+        """
+        增加惰性参数化测试用例，生成测试用例实例时不发布TEST_CASES_DISCOVERED事件。
+        :param lazy_test_cases: 惰性参数化测试用例
+        :return:
+        """
+        self.lazy_test_cases.append(lazy_test_cases)
+
+    def _add_test_case_class(self, test_case_class):
+        """
+        通过测试用例类增加测试用例：参数值需要惰性生成时只增加惰性参数化测试用例。
+        :param test_case_class: 测试用例类
+        :return:
+        """
+        if LazyTestCases.is_lazy(test_case_class):
+            self.add_lazy_test_cases(LazyTestCases(test_case_class))
+        else:
+            self.add_test_cases(*self._gen_test_case_instances(test_case_class))
 
     def add_test_cases_by_classes(self, *class_names: str):
         """
@@ -169,7 +283,7 @@ class DefaultTestTask(TestTask):
             if hasattr(tmp_module, tmp_class_str):
                 tmp_class = getattr(tmp_module, tmp_class_str)
                 if issubclass(tmp_class, TestCase):
-                    self.add_test_cases(*self._gen_test_case_instances(tmp_class))
+                    self._add_test_case_class(tmp_class)
                 else:
                     raise ValueError(f'{tmp_class_str}不是测试用例类！')
             else:
@@ -186,7 +300,7 @@ class DefaultTestTask(TestTask):
             tmp_classes = getmembers(tmp_module, isclass)  # 获取模块中的所有类
             for _, tmp_class in tmp_classes:
                 if issubclass(tmp_class, TestCase) and tmp_class is not TestCase:  # 排除TestCase本身
-                    self.add_test_cases(*self._gen_test_case_instances(tmp_class))
+                    self._add_test_case_class(tmp_class)
 
     def add_test_cases_by_files(self, *files: str):
         """
@@ -196,12 +310,15 @@ class DefaultTestTask(TestTask):
             macOS/Linux：/path/to/dictionary/module.py
         :return:
         """
+        file_paths = list()
         for _file in files:
             new_file = handle_path(_file)
             new_file_name = new_file.split(os.sep)[-1]
             if not new_file_name.endswith('.py') or new_file_name == '__init__.py':
                 continue
-            self._add_test_cases_by_file(new_file, new_file_name)
+            self.source_paths.append(new_file)
+            file_paths.append(new_file)
+        self._add_test_cases_by_file_paths(file_paths)
 
     def add_test_cases_by_paths(self, *paths: str):
         """
@@ -211,28 +328,91 @@ class DefaultTestTask(TestTask):
             macOS/Linux：/path/to/dictionary
         :return:
         """
+        file_paths = list()
         for path in paths:
             new_path = handle_path(path)
+            self.source_paths.append(new_path)
+            if self.test_case_index:
+                self.test_case_index.add_search_path(new_path)
             for root_dir, _, file_names in os.walk(new_path):
                 for file_name in file_names:
                     if not file_name.endswith('.py') or file_name == '__init__.py':
                         continue
-                    file_path = os.path.join(root_dir, file_name)
-                    self._add_test_cases_by_file(file_path, file_name)
+                    file_paths.append(os.path.join(root_dir, file_name))
+        self._add_test_cases_by_file_paths(file_paths)
 
-    def _add_test_cases_by_file(self, file_path, file_name):
+    def _add_test_cases_by_file_paths(self, file_paths: List[str]):
         """
-        通过文件增加测试用例
-        :param file_path: 文件全路径
-        :param file_name: 文件名
+        通过文件增加测试用例：先并行解析（使用测试用例索引时）和编译需要导入的文件，再在当前线程中按顺序执行模块。
+        使用测试用例索引时，只导入包含测试用例类的文件，并且只增加文件中定义的测试用例类，过滤器同样由filter_test_cases()执行。
+        :param file_paths: 文件全路径列表
         :return:
         """
-        tmp_module_spec = util.spec_from_file_location(file_name[:-3], file_path)
-        tmp_module = tmp_module_spec.loader.load_module(tmp_module_spec.name)
-        tmp_classes = getmembers(tmp_module, isclass)  # 获取模块中的所有类
-        for _, tmp_class in tmp_classes:
-            if issubclass(tmp_class, TestCase) and tmp_class is not TestCase:  # 排除TestCase本身
-                self.add_test_cases(*self._gen_test_case_instances(tmp_class))
+        class_names = dict()  # 文件全路径：测试用例类的类名列表，为None时增加模块中的全部测试用例类
+        if self.test_case_index:
+            self.test_case_index.update(file_paths, self.discovery_workers)
+            for file_path in file_paths:
+                class_names[file_path] = self.test_case_index.find_test_case_classes(file_path)
+            self.test_case_index.flush()
+        file_paths = [file_path for file_path in file_paths if class_names.get(file_path) != []]
+        # 已导入的模块无需编译
+        codes = compile_files([file_path for file_path in dict.fromkeys(file_paths)
+                               if self._get_loaded_module(file_path) is None], self.discovery_workers)
+        for file_path in file_paths:
+            tmp_module = self._load_module(file_path, codes.pop(file_path, None))
+            if class_names.get(file_path) is not None:
+                for class_name in class_names[file_path]:
+                    tmp_class = getattr(tmp_module, class_name, None)
+                    if isclass(tmp_class) and issubclass(tmp_class, TestCase) and not isabstract(tmp_class):
+                        self._add_test_case_class(tmp_class)
+            else:
+                tmp_classes = getmembers(tmp_module, isclass)  # 获取模块中的所有类
+                for _, tmp_class in tmp_classes:
+                    if issubclass(tmp_class, TestCase) and tmp_class is not TestCase:  # 排除TestCase本身
+                        self._add_test_case_class(tmp_class)
+
+    @staticmethod
+    def _get_loaded_module(file_path: str):
+        """
+        获取文件对应的已导入模块：模块名为文件名（通过文件添加）或相对于sys.path的点分路径（通过模块名导入）
+        :param file_path: 文件全路径
+        :return: 未导入时返回None
+        """
+        file_path = os.path.abspath(file_path)
+        module_names = [os.path.basename(file_path)[:-3]]
+        for search_path in sys.path:
+            relative_path = os.path.relpath(file_path, os.path.abspath(search_path or os.curdir))
+            if not relative_path.startswith(os.pardir):
+                module_names.append(relative_path[:-3].replace(os.sep, '.'))
+        for module_name in module_names:
+            module = sys.modules.get(module_name)
+            module_file = getattr(module, '__file__', None)
+            if module_file and os.path.abspath(module_file) == file_path:
+                return module
+        return None
+
+    def _load_module(self, file_path: str, code: Optional[bytes] = None):
+        """
+        导入文件：文件已通过文件或模块名导入时直接使用已导入的模块，避免重复执行模块。
+        :param file_path: 文件全路径
+        :param code: 预先编译的序列化代码对象，为None时由导入系统读取字节码缓存或编译
+        :return: 模块
+        """
+        module = self._get_loaded_module(file_path)
+        if module is not None:
+            return module
+        tmp_module_spec = util.spec_from_file_location(os.path.basename(file_path)[:-3], file_path)
+        module = util.module_from_spec(tmp_module_spec)
+        sys.modules[tmp_module_spec.name] = module
+        try:
+            if code is None:
+                tmp_module_spec.loader.exec_module(module)
+            else:
+                exec(marshal.loads(code), module.__dict__)
+        except BaseException:
+            sys.modules.pop(tmp_module_spec.name, None)
+            raise
+        return module
 
     @staticmethod
     def _gen_test_case_instances(test_case):
@@ -243,6 +423,8 @@ class DefaultTestTask(TestTask):
         """
         if not issubclass(test_case, TestCase):
             raise ValueError('不是测试用例类！')
+        if LazyTestCases.is_lazy(test_case):
+            return list(LazyTestCases(test_case))
         param_names = getattr(test_case, '_param_names') if hasattr(test_case, '_param_names') else None
         param_values = getattr(test_case, '_param_values') if hasattr(test_case, '_param_values') else None
         if param_names and param_values:  # 测试用例有参数化数据
@@ -289,7 +471,12 @@ class DefaultTestTask(TestTask):
     def filter_test_cases(self):
         for test_case_filter in self.test_case_filters:
             self.test_cases = test_case_filter.filter(self.test_cases)
+        for lazy_test_cases in self.lazy_test_cases:
+            lazy_test_cases.test_case_filters.extend(test_case_filter for test_case_filter in self.test_case_filters
+                                                     if test_case_filter not in lazy_test_cases.test_case_filters)
 
     def clear_test_task(self):
         self.test_cases.clear()
+        self.lazy_test_cases.clear()
+        self.source_paths.clear()
         self.test_case_filters.clear()
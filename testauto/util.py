@@ -2,7 +2,7 @@ import logging
 import os
 import sys
 from time import localtime, strftime
-from typing import AnyStr, Tuple, List
+from typing import AnyStr, Callable, Iterable, List, Tuple, Union
 
 from .case import TestCase
 
@@ -58,11 +58,14 @@ def assert_not_raise(callable_obj, exception, msg=None):
             raise AssertionError(msg) if msg else AssertionError()
 
 
-def parameterized(param_names: Tuple[str, ...], param_values: List[tuple]):
+def parameterized(param_names: Tuple[str, ...],
+                  param_values: Union[List[tuple], Iterable[tuple], Callable[[], Iterable[tuple]]]):
     """
     参数化测试装饰器
     :param param_names: 参数名
-    :param param_values: 参数值
+    :param param_values: 参数值：列表在添加测试用例时生成全部测试用例实例；
+        其它可迭代对象（比如生成器）或返回可迭代对象的可调用对象则由测试执行器在执行时逐个生成，参数值数量不影响内存占用。
+        生成器只能遍历一次，需要多次执行同一测试任务时请使用可调用对象。
     :return:
     """
 
@@ -0,0 +1,148 @@
+import os
+import sys
+import traceback
+from inspect import getfile
+from time import sleep
+from typing import Any, Callable, Dict, List, Optional
+
+from .case import TestCase, TestCaseResult
+from .task import TestTask, DefaultTestTask
+from .util import Writer
+
+
+class TestWatcher:
+    """
+    测试监视器：进程常驻，轮询测试任务通过文件或路径添加的测试模块，文件发生变化时只重新加载变化的模块，
+    并只重新执行其中的测试用例和此前未执行成功的测试用例。
+    注意测试模块依赖的其它模块（比如被测代码或公共模块）不会被重新加载。
+    """
+
+    def __init__(self, test_task: TestTask, interval: float = 0.5):
+        """
+        :param test_task: 测试任务，须为通过add_test_cases_by_files()或add_test_cases_by_paths()添加测试用例的DefaultTestTask对象
+        :param interval: 轮询间隔（单位秒）
+        """
+        source_paths = getattr(test_task, 'source_paths', None)
+        if not source_paths:
+            raise ValueError('监视模式只支持通过文件或路径添加测试用例的测试任务！')
+        if interval <= 0:
+            raise ValueError('轮询间隔必须是正数！')
+        self.test_task = test_task
+        self.source_paths = list(source_paths)
+        self.interval = interval
+        self.writer = Writer()
+        self._snapshot = self.scan()
+        self._test_cases: Dict[Optional[str], List[TestCase]] = dict()  # 测试模块文件：其中的测试用例
+        for test_case in test_task.test_cases:
+            self._test_cases.setdefault(self._get_file(test_case), []).append(test_case)
+
+    def scan(self) -> Dict[str, tuple]:
+        """
+        扫描测试模块文件
+        :return: {文件全路径: (修改时间, 文件大小)}
+        """
+        snapshot = dict()
+        for source_path in self.source_paths:
+            if os.path.isfile(source_path):
+                file_paths = [source_path]
+            else:
+                file_paths = [os.path.join(root_dir, file_name) for root_dir, _, file_names in os.walk(source_path)
+                              for file_name in file_names]
+            for file_path in file_paths:
+                file_name = os.path.basename(file_path)
+                if not file_name.endswith('.py') or file_name == '__init__.py':
+                    continue
+                try:
+                    stat = os.stat(file_path)
+                except OSError:  # 扫描期间被删除
+                    continue
+                snapshot[os.path.abspath(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Optional[TestTask]:
+        """
+        检查测试模块文件是否发生变化，重新加载新增或修改的测试模块。
+        :return: 受影响的测试用例组成的测试任务，文件未变化或没有受影响的测试用例时返回None
+        """
+        snapshot = self.scan()
+        changed_files = [file_path for file_path, state in snapshot.items() if self._snapshot.get(file_path) != state]
+        removed_files = [file_path for file_path in self._snapshot if file_path not in snapshot]
+        self._snapshot = snapshot
+        if not changed_files and not removed_files:
+            return None
+        for file_path in removed_files:
+            self._test_cases.pop(file_path, None)
+        test_cases = list()
+        lazy_test_cases = list()  # 变化的模块中的惰性参数化测试用例，全部重新执行
+        for file_path in changed_files:
+            self.writer.write_line(f'测试模块发生变化：{file_path}')
+            # 丢弃已加载的模块（包括通过模块名导入的），避免已删除的测试用例类残留在原模块中
+            for module_name, module in list(sys.modules.items()):
+                module_file = getattr(module, '__file__', None)
+                if module_file and os.path.abspath(module_file) == file_path:
+                    sys.modules.pop(module_name, None)
+            test_task = DefaultTestTask(getattr(self.test_task, 'test_case_index', None))
+            try:
+                test_task.add_test_cases_by_files(file_path)
+            except Exception:  # 模块存在错误时等待下次修改
+                self.writer.write_error(f'加载测试模块失败：{traceback.format_exc()}')
+                self._test_cases[file_path] = []
+                continue
+            self._test_cases[file_path] = test_task.test_cases
+            test_cases.extend(test_task.test_cases)
+            lazy_test_cases.extend(test_task.lazy_test_cases)
+        if not test_cases and not lazy_test_cases and not removed_files:  # 变化的模块均加载失败
+            return None
+        for file_path, file_test_cases in self._test_cases.items():
+            if file_path in changed_files:
+                continue
+            test_cases.extend(test_case for test_case in file_test_cases if test_case.result != TestCaseResult.PASS)
+        if not test_cases and not lazy_test_cases:
+            self.writer.write_line('没有受影响的测试用例。')
+            return None
+        test_task = DefaultTestTask()
+        test_task.add_test_cases(*test_cases)
+        for item in lazy_test_cases:
+            test_task.add_lazy_test_cases(item)
+        return test_task
+
+    def watch(self, run: Callable[[TestTask], Any], rounds: Optional[int] = None):
+        """
+        先执行完整的测试任务，然后持续监视测试模块文件，每次变化后执行受影响的测试用例，按Ctrl+C退出。
+        :param run: 执行测试任务的可调用对象
+        :param rounds: 文件变化后执行测试任务的最大次数，None-不限制
+        :return:
+        """
+        self._run(run, self.test_task)
+        count = 0
+        while rounds is None or count < rounds:
+            sleep(self.interval)
+            test_task = self.poll()
+            if test_task is None:
+                continue
+            count += 1
+            self._run(run, test_task)
+
+    def _run(self, run: Callable[[TestTask], Any], test_task: TestTask):
+        try:
+            run(test_task)
+        except Exception:  # 执行失败不影响继续监视
+            self.writer.write_error(f'执行测试任务失败：{traceback.format_exc()}')
+        # 惰性参数化测试用例在执行时才生成，未执行成功的会加入所执行的测试任务，记录下来以便下次重新执行
+        watched_ids = {id(test_case) for test_cases in self._test_cases.values() for test_case in test_cases}
+        for test_case in test_task.test_cases:
+            if test_case.result != TestCaseResult.PASS and id(test_case) not in watched_ids:
+                self._test_cases.setdefault(self._get_file(test_case), []).append(test_case)
+        self.writer.write_line(f'正在监视{len(self._snapshot)}个测试模块的变化，按Ctrl+C退出……')
+
+    @staticmethod
+    def _get_file(test_case: TestCase) -> Optional[str]:
+        """
+        获取测试用例类所在的文件
+        :param test_case: 测试用例
+        :return: 文件全路径，无法获取时返回None
+        """
+        try:
+            return os.path.abspath(getfile(type(test_case)))
+        except (TypeError, OSError):
+            return None
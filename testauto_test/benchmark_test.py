@@ -0,0 +1,75 @@
+from testauto import main
+from testauto.benchmark import BenchmarkCase, calculate_statistics, measure_timer_overhead
+from testauto.case import TestCaseResult
+from testauto.runner import DefaultTestRunner, ExecutionMode
+from testauto.task import DefaultTestTask
+from testauto.util import parameterized
+
+
+@parameterized(('size',), [(10,), (1000,)])
+class TestCase01(BenchmarkCase):
+    title = '排序'
+    rounds = 5
+
+    def setup(self):
+        self.data = list(range(self.size, 0, -1))
+
+    def benchmark(self):
+        sorted(self.data)
+
+
+class TestCase02(BenchmarkCase):
+    title = '固定迭代次数'
+    iterations = 100
+    warmup_rounds = 0
+
+    def benchmark(self):
+        pass
+
+
+class TestCase03(BenchmarkCase):
+    title = '超过中位数上限'
+    max_median_time = 1e-9
+
+    def benchmark(self):
+        sum(range(1000))
+
+
+if __name__ == '__main__':
+    # 统计结果
+    benchmark_result = calculate_statistics([1.0, 1.1, 0.9, 1.0, 1.05, 10.0], 10, 0.0)
+    assert benchmark_result.min_time == 0.9 and benchmark_result.max_time == 10.0
+    assert benchmark_result.median_time == 1.025 and benchmark_result.outliers == 1
+    assert calculate_statistics([1.0], 1, 0.0).stddev == 0.0
+    assert 0 < measure_timer_overhead() < 0.001
+
+    # 自动校准迭代次数，参数化测试不同的输入规模
+    test_task_01 = DefaultTestTask()
+    test_task_01.add_test_cases_by_classes('testauto_test.benchmark_test.TestCase01',
+                                           'testauto_test.benchmark_test.TestCase02',
+                                           'testauto_test.benchmark_test.TestCase03')
+    small, large, fixed, limited = test_task_01.test_cases
+    small.setup()
+    small.test_case()
+    assert small.benchmark_result.rounds == 5 and small.benchmark_result.iterations > 1
+    assert small.benchmark_result.min_time <= small.benchmark_result.median_time <= small.benchmark_result.max_time
+    large.setup()
+    large.test_case()
+    assert large.benchmark_result.median_time > small.benchmark_result.median_time
+    fixed.test_case()
+    assert fixed.benchmark_result.iterations == 100
+
+    # 多进程执行时基准测试结果随测试结果返回主进程
+    test_task_02 = DefaultTestTask()
+    test_task_02.add_test_cases_by_classes('testauto_test.benchmark_test.TestCase01',
+                                           'testauto_test.benchmark_test.TestCase03')
+    main(test_task=test_task_02, test_runner=DefaultTestRunner(), execution_mode=ExecutionMode.PROCESS)
+    assert all(test_case.benchmark_result for test_case in test_task_02.test_cases)
+    assert test_task_02.test_cases[2].result == TestCaseResult.FAIL
+
+    # HTML测试报告展示基准测试结果
+    # test_task_03 = DefaultTestTask()
+    # test_task_03.add_test_cases_by_classes('testauto_test.benchmark_test.TestCase01',
+    #                                        'testauto_test.benchmark_test.TestCase02',
+    #                                        'testauto_test.benchmark_test.TestCase03')
+    # main(test_task=test_task_03)
@@ -0,0 +1,49 @@
+import os
+
+from testauto.cache import ResultCache
+from testauto.case import TestCase, TestCaseResult
+from testauto.util import parameterized
+
+
+@parameterized(
+    ('username',),
+    [
+        ('zhangsan',),
+        ('lisi',)
+    ]
+)
+class TestCase01(TestCase):
+
+    def test_case(self):
+        ...
+
+
+if __name__ == '__main__':
+    test_case_01 = TestCase01(('username',), ('zhangsan',))
+    test_case_02 = TestCase01(('username',), ('lisi',))
+    result_cache = ResultCache('cache_test.db')
+    result_cache.clear()
+    assert result_cache.get_module_hash(test_case_01) is not None
+    assert not result_cache.is_passed(test_case_01)
+
+    # 只缓存执行成功的测试用例
+    result_cache.record(test_case_01, TestCaseResult.PASS)
+    result_cache.record(test_case_02, TestCaseResult.FAIL)
+    assert result_cache.is_passed(test_case_01)
+    assert not result_cache.is_passed(test_case_02)
+    result_cache.close()
+
+    # 重新加载后缓存仍然有效
+    result_cache = ResultCache('cache_test.db')
+    assert result_cache.is_passed(test_case_01)
+
+    # 再次执行失败后缓存失效
+    result_cache.record(test_case_01, TestCaseResult.FAIL)
+    assert not result_cache.is_passed(test_case_01)
+
+    # 清空缓存
+    result_cache.record(test_case_02, TestCaseResult.PASS)
+    result_cache.clear()
+    assert not result_cache.is_passed(test_case_02)
+    result_cache.close()
+    os.remove('cache_test.db')
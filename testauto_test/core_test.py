@@ -3,7 +3,7 @@ from time import sleep
 from testauto import main
 from testauto.case import TestCase, TestCasePriority
 from testauto.recorder import DefaultTestRecorder
-from testauto.runner import DefaultTestRunner
+from testauto.runner import TestRunner, DefaultTestRunner
 from testauto.task import DefaultTestTask
 
 
@@ -43,11 +43,27 @@ class TestCase05(TestCase):
         ...
 
 
+class LegacyTestRunner(TestRunner):
+    """
+    只接收基本参数的自定义测试执行器
+    """
+
+    def run(self, test_task, test_recorder, stop_strategy, retry_strategy, timeout, parallel):
+        self.test_cases = test_task.test_cases
+
+
 # 测试IDE执行入口
 if __name__ == '__main__':
     main(__file__)
     main(test_recorder=DefaultTestRecorder(), test_runner=DefaultTestRunner())
 
+    # 未使用扩展功能时，只传递基本参数
+    legacy_test_runner = LegacyTestRunner()
+    legacy_test_task = DefaultTestTask()
+    legacy_test_task.add_test_cases(TestCase05())
+    main(test_task=legacy_test_task, test_runner=legacy_test_runner)
+    assert legacy_test_runner.test_cases == legacy_test_task.test_cases
+
 
 # 测试命令行执行入口
 def test_task_func_01():
@@ -0,0 +1,169 @@
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+from importlib import import_module
+
+from testauto.case import TestCasePriority
+from testauto.discovery import TestCaseIndex
+from testauto.task import DefaultTestTask, TestCasePriorityShouldBe, OperationMethod
+
+test_dir = tempfile.mkdtemp()
+sys.path.insert(0, test_dir)
+test_files = {
+    'discovery_base.py': '''
+from abc import abstractmethod
+
+from testauto.case import TestCase
+
+
+class BaseTestCase(TestCase):
+
+    @abstractmethod
+    def login(self):
+        pass
+
+
+class TestCase02(TestCase):
+    title = '直接继承'
+
+    def test_case(self):
+        pass
+''',
+    'discovery_derived.py': '''
+from testauto.case import TestCasePriority
+
+import discovery_base
+from discovery_base import TestCase02
+
+
+class TestCase03(TestCase02):
+    title = '间接继承'
+    priority = TestCasePriority.P1
+
+
+class TestCase04(discovery_base.BaseTestCase):
+    title = '实现抽象方法'
+
+    def login(self):
+        pass
+
+    def test_case(self):
+        pass
+
+
+class TestCase05(discovery_base.BaseTestCase):
+    title = '未实现抽象方法'
+''',
+    'discovery_helper.py': '''
+class Helper(dict):
+    pass
+''',
+    'discovery_incomplete.py': '''
+from testauto.case import TestCase
+
+
+class TestCase06(TestCase):
+    completed = False
+
+    def test_case(self):
+        pass
+''',
+    'discovery_counted.py': '''
+import builtins
+
+from testauto.case import TestCase
+
+builtins.discovery_count = getattr(builtins, 'discovery_count', 0) + 1
+
+
+class TestCase08(TestCase):
+
+    def test_case(self):
+        pass
+''',
+    'discovery_patched.py': '''
+from testauto.case import TestCase
+
+
+class TestCase09(TestCase):
+
+    def test_case(self):
+        pass
+
+
+TestCase09.tags = '模块级修改类属性'
+''',
+    'discovery_generated.py': '''
+from testauto.case import TestCase
+
+
+def make_test_case():
+    return type('TestCase10', (TestCase,), {'test_case': lambda self: None})
+
+
+TestCase10 = make_test_case()
+''',
+}
+for index in range(20):
+    test_files[os.path.join('parallel', f'discovery_parallel_{index}.py')] = f'''
+from testauto.case import TestCase
+
+
+class ParallelTestCase{index:02d}(TestCase):
+
+    def test_case(self):
+        pass
+'''
+os.mkdir(os.path.join(test_dir, 'parallel'))
+for file_name, content in test_files.items():
+    with open(os.path.join(test_dir, file_name), 'w', encoding='UTF-8') as file:
+        file.write(content)
+index_file = os.path.join(test_dir, 'testauto-index.db')
+
+if __name__ == '__main__':
+    # 静态解析：识别跨文件的间接子类，排除抽象类，不导入任何模块
+    test_case_index = TestCaseIndex(index_file)
+    derived_file = os.path.join(test_dir, 'discovery_derived.py')
+    assert test_case_index.find_test_case_classes(derived_file) == ['TestCase03', 'TestCase04']
+    assert test_case_index.find_test_case_classes(os.path.join(test_dir, 'discovery_helper.py')) == []
+    assert test_case_index.find_test_case_classes(os.path.join(test_dir, 'discovery_incomplete.py')) == ['TestCase06']
+    assert 'discovery_base' not in sys.modules and 'discovery_derived' not in sys.modules
+    # 模块级修改类属性时仍保留该类，存在无法静态确定的模块级名称时返回None，由导入后确认
+    assert test_case_index.find_test_case_classes(os.path.join(test_dir, 'discovery_patched.py')) == ['TestCase09']
+    assert test_case_index.find_test_case_classes(os.path.join(test_dir, 'discovery_generated.py')) is None
+
+    # 通过路径添加测试用例：只导入包含测试用例类的模块，过滤器在导入后执行
+    test_task_01 = DefaultTestTask(test_case_index)
+    test_task_01.add_filter(TestCasePriorityShouldBe(OperationMethod.EQUAL, TestCasePriority.P0))
+    test_task_01.add_test_cases_by_paths(test_dir)
+    assert 'discovery_helper' not in sys.modules
+    assert 'TestCase06' in [test_case.__class__.__name__ for test_case in test_task_01.test_cases]
+    test_task_01.filter_test_cases()
+    assert sorted(test_case.__class__.__name__ for test_case in test_task_01.test_cases) == \
+           [f'ParallelTestCase{index:02d}' for index in range(20)] + ['TestCase02', 'TestCase04', 'TestCase08',
+                                                                      'TestCase09', 'TestCase10']
+    test_case_index.close()
+
+    # 重新加载后直接使用索引，文件变化时重新解析
+    test_case_index = TestCaseIndex(index_file)
+    assert test_case_index.find_test_case_classes(derived_file) == ['TestCase03', 'TestCase04']
+    with open(derived_file, 'a', encoding='UTF-8') as file:
+        file.write('\n\nclass TestCase07(TestCase03):\n    pass\n')
+    assert test_case_index.find_test_case_classes(derived_file) == ['TestCase03', 'TestCase04', 'TestCase07']
+    test_case_index.close()
+
+    # 多个进程并行编译，已通过模块名导入的模块不再重复执行
+    for module_name in [module_name for module_name in sys.modules if module_name.startswith('discovery_')]:
+        sys.modules.pop(module_name)
+    parallel_module = import_module('parallel.discovery_parallel_0')
+    test_task_02 = DefaultTestTask(discovery_workers=2)
+    test_task_02.add_test_cases_by_files(os.path.join(test_dir, 'discovery_counted.py'))
+    test_task_02.add_test_cases_by_paths(os.path.join(test_dir, 'parallel'))
+    assert len(test_task_02.test_cases) == 1 + 20
+    assert parallel_module.ParallelTestCase00 in [type(test_case) for test_case in test_task_02.test_cases]
+    assert builtins.discovery_count == 2
+
+    sys.path.remove(test_dir)
+    shutil.rmtree(test_dir)
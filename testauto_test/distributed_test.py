@@ -0,0 +1,98 @@
+import os
+import signal
+from time import perf_counter, sleep
+
+from testauto import main, distributed
+from testauto.case import TestCase, TestCaseResult
+from testauto.distributed import DistributedTestRunner
+from testauto.runner import StopStrategy
+from testauto.task import DefaultTestTask
+
+
+class TestCase01(TestCase):
+
+    def test_case(self):
+        sleep(1)
+
+
+class TestCase02(TestCase):
+    title = 'TestCase02'
+
+    def test_case(self):
+        assert False
+
+
+# 导致工作节点异常退出的测试用例
+class TestCase03(TestCase):
+    title = 'TestCase03'
+
+    def test_case(self):
+        os._exit(1)
+
+
+# 导致工作节点本身崩溃的测试用例：测试用例在工作节点的子进程中执行
+class TestCase04(TestCase):
+    title = 'TestCase04'
+
+    def test_case(self):
+        os.kill(os.getppid(), signal.SIGKILL)
+
+
+# 导致工作节点本身失去响应的测试用例：工作节点反序列化测试用例时阻塞
+class TestCase05(TestCase):
+    title = 'TestCase05'
+    timeout = 1
+
+    def __setstate__(self, state):
+        sleep(60)
+
+    def test_case(self):
+        ...
+
+
+if __name__ == '__main__':
+    # 本机自动启动4个工作节点
+    test_task_01 = DefaultTestTask()
+    test_task_01.add_test_cases(*[TestCase01() for _ in range(8)])
+    main(test_task=test_task_01, test_runner=DistributedTestRunner(), parallel=4)
+
+    # 工作节点异常退出时，其它测试用例不受影响
+    # test_task_02 = DefaultTestTask()
+    # test_task_02.add_test_cases(TestCase01(), TestCase03(), TestCase01())
+    # main(test_task=test_task_02, test_runner=DistributedTestRunner(), parallel=2)
+
+    # 导致工作节点崩溃的测试用例只重新分配一次，之后记录为阻塞
+    test_task_05 = DefaultTestTask()
+    test_task_05.add_test_cases(TestCase04(), TestCase01())
+    main(test_task=test_task_05, test_runner=DistributedTestRunner(), parallel=2)
+    assert test_task_05.test_cases[0].result == TestCaseResult.BLOCK
+    assert test_task_05.test_cases[1].result == TestCaseResult.PASS
+
+    # 失去响应的本机工作节点被终止并替换，导致其失去响应的测试用例只重新分配一次，之后记录为超时
+    distributed.RESPONSE_GRACE = 1
+    test_task_06 = DefaultTestTask()
+    test_task_06.add_test_cases(TestCase05(), TestCase01())
+    main(test_task=test_task_06, test_runner=DistributedTestRunner(), parallel=1)
+    assert test_task_06.test_cases[0].result == TestCaseResult.TIMEOUT
+    assert test_task_06.test_cases[1].result == TestCaseResult.PASS
+
+    # 持续没有工作节点连接时，剩余的测试用例记为未执行
+    test_task_07 = DefaultTestTask()
+    test_task_07.add_test_cases(TestCase01(), TestCase01())
+    start_time = perf_counter()
+    main(test_task=test_task_07, test_runner=DistributedTestRunner(local_workers=0, connect_timeout=1))
+    assert perf_counter() - start_time < 10
+    assert all(test_case.result == TestCaseResult.NOT_EXECUTED for test_case in test_task_07.test_cases)
+
+    # 终止策略在所有工作节点中生效
+    # test_task_03 = DefaultTestTask()
+    # test_task_03.add_test_cases(TestCase02(), *[TestCase01() for _ in range(8)])
+    # main(test_task=test_task_03, test_runner=DistributedTestRunner(), parallel=2,
+    #      stop_strategy=StopStrategy.FIRST_NOT_PASS)
+
+    # 只使用其它主机上的工作节点，工作节点的启动命令：
+    # python -m testauto -w 192.168.1.100:9000 -ak secret -p 4
+    # test_task_04 = DefaultTestTask()
+    # test_task_04.add_test_cases_by_classes('testauto_test.distributed_test.TestCase01')
+    # main(test_task=test_task_04,
+    #      test_runner=DistributedTestRunner(address='0.0.0.0:9000', authkey=b'secret', local_workers=0))
@@ -0,0 +1,66 @@
+from testauto import main
+from testauto.case import TestCase, TestCaseResult
+from testauto.event import Event, EventBus, EventListener, EventType, event_bus
+from testauto.task import DefaultTestTask
+
+
+class TestCase01(TestCase):
+
+    def test_case(self):
+        ...
+
+
+class TestCase02(TestCase):
+
+    def test_case(self):
+        assert False
+
+
+class RecordListener(EventListener):
+
+    def __init__(self):
+        self.events = []
+
+    def on_event(self, event: Event):
+        self.events.append(event)
+
+
+class ProgressListener(EventListener):
+    event_types = (EventType.CASE_FINISHED,)
+
+    def on_event(self, event: Event):
+        print(f'{event.test_case.title}：{event.data["result"].value[0]}')
+
+
+if __name__ == '__main__':
+    # 没有监听器时发布事件不做任何操作
+    event_bus_01 = EventBus()
+    event_bus_01.publish(EventType.CASE_QUEUED, TestCase01())
+    assert event_bus_01.flush()
+
+    # 监听器按发布顺序批量接收事件
+    listener_01 = RecordListener()
+    event_bus_01.subscribe(listener_01)
+    test_case_01 = TestCase01()
+    event_bus_01.publish(EventType.CASE_STARTED, test_case_01, rerun=False)
+    event_bus_01.publish(EventType.CASE_FINISHED, test_case_01, result=TestCaseResult.PASS)
+    assert event_bus_01.flush(5)
+    assert [event.event_type for event in listener_01.events] == [EventType.CASE_STARTED, EventType.CASE_FINISHED]
+    assert listener_01.events[1].data['result'] == TestCaseResult.PASS
+
+    # 取消订阅后不再接收事件
+    event_bus_01.unsubscribe(listener_01)
+    event_bus_01.publish(EventType.CASE_QUEUED, test_case_01)
+    assert event_bus_01.flush(5) and len(listener_01.events) == 2
+
+    # 发现测试用例时发布事件
+    listener_02 = RecordListener()
+    event_bus.subscribe(listener_02)
+    test_task_01 = DefaultTestTask()
+    test_task_01.add_test_cases(TestCase01(), TestCase02())
+    event_bus.unsubscribe(listener_02)
+    assert listener_02.events[0].event_type == EventType.TEST_CASES_DISCOVERED
+    assert len(listener_02.events[0].data['test_cases']) == 2
+
+    # 执行期间实时输出测试结果
+    # main(test_task=test_task_01, event_listeners=[ProgressListener()])
@@ -0,0 +1,121 @@
+from testauto import main
+from testauto.case import TestCase, TestCaseResult
+from testauto.fixture import Fixture, FixtureScope, FixtureManager, FixtureError
+from testauto.runner import ExecutionMode
+from testauto.task import DefaultTestTask
+from testauto.util import parameterized
+
+
+class LoginFixture(Fixture):
+    scope = FixtureScope.CLASS
+
+    def setup(self):
+        self.token = 'token'
+        self.closed = False
+
+    def teardown(self):
+        self.closed = True
+
+
+class ConnectionFixture(Fixture):
+    scope = FixtureScope.WORKER
+
+    def setup(self):
+        self.closed = False
+
+    def teardown(self):
+        self.closed = True
+
+
+class ServerFixture(Fixture):
+    scope = FixtureScope.SESSION
+
+    def setup(self):
+        raise ConnectionError('桩服务启动失败')
+
+
+@parameterized(('username',), [('zhangsan',), ('lisi',)])
+class TestCase01(TestCase):
+    fixtures = (LoginFixture,)
+
+    def test_case(self):
+        assert self.get_fixture(LoginFixture).token == 'token'
+
+
+class TestCase02(TestCase):
+    fixtures = (ServerFixture,)
+
+    def test_case(self):
+        ...
+
+
+class TestCase03(TestCase):
+    fixtures = (ConnectionFixture,)
+
+    def test_case(self):
+        assert not self.get_fixture(ConnectionFixture).closed
+
+
+if __name__ == '__main__':
+    test_case_01 = TestCase01(param_names=('username',), param_values=('zhangsan',))
+    test_case_02 = TestCase01(param_names=('username',), param_values=('lisi',))
+    test_case_03 = TestCase02()
+    fixture_manager = FixtureManager()
+    fixture_manager.start([test_case_01, test_case_02, test_case_03])
+
+    # 同一测试用例类共享夹具对象，且只初始化一次
+    fixture_manager.acquire(test_case_01)
+    fixture_manager.acquire(test_case_02)
+    login_fixture = test_case_01.get_fixture(LoginFixture)
+    assert login_fixture is test_case_02.get_fixture(LoginFixture)
+    usage = fixture_manager.usages[(LoginFixture, TestCase01)]
+    assert usage.setup_count == 1 and usage.shared_count == 2
+
+    # 最后一个依赖夹具的测试用例执行完毕后清理夹具
+    fixture_manager.release(test_case_01)
+    assert not login_fixture.closed
+    fixture_manager.release(test_case_02)
+    assert login_fixture.closed
+
+    # 夹具初始化失败
+    try:
+        fixture_manager.acquire(test_case_03)
+        assert False
+    except FixtureError:
+        pass
+    # 同一工作者复用夹具，工作者退出时清理
+    test_case_04 = TestCase03()
+    test_case_05 = TestCase03()
+    fixture_manager.start_worker()
+    fixture_manager.acquire(test_case_04)
+    fixture_manager.release(test_case_04)
+    fixture_manager.acquire(test_case_05)
+    connection_fixture = test_case_04.get_fixture(ConnectionFixture)
+    assert connection_fixture is test_case_05.get_fixture(ConnectionFixture)
+    assert not connection_fixture.closed
+    fixture_manager.stop_worker()
+    assert connection_fixture.closed
+    fixture_manager.finish()
+
+    # 在子进程中执行时只支持工作者作用域的夹具
+    test_task_03 = DefaultTestTask()
+    test_task_03.add_test_cases(TestCase02(), TestCase03())
+    try:
+        main(test_task=test_task_03, execution_mode=ExecutionMode.PROCESS)
+        assert False
+    except ValueError as e:
+        assert 'ServerFixture' in str(e) and 'ConnectionFixture' not in str(e)
+    test_task_04 = DefaultTestTask()
+    test_task_04.add_test_cases(*[TestCase03() for _ in range(4)])
+    main(test_task=test_task_04, parallel=2, execution_mode=ExecutionMode.PROCESS)
+    assert all(test_case.result == TestCaseResult.PASS for test_case in test_task_04.test_cases)
+
+    # 参数化生成的测试用例共享夹具
+    # test_task_01 = DefaultTestTask()
+    # test_task_01.add_test_cases_by_classes('fixture_test.TestCase01', 'fixture_test.TestCase02')
+    # main(test_task=test_task_01, parallel=2)
+
+    # 每个工作线程只初始化一次夹具
+    # test_task_02 = DefaultTestTask()
+    # test_task_02.add_test_cases(*[TestCase03() for _ in range(100)])
+    # main(test_task=test_task_02, parallel=4)
@@ -0,0 +1,56 @@
+import os
+from time import sleep
+
+from testauto.case import TestCase
+from testauto.history import DurationHistory, get_test_case_key
+from testauto.util import parameterized
+
+
+@parameterized(
+    ('seconds',),
+    [
+        (0.1,),
+        (0.2,)
+    ]
+)
+class TestCase01(TestCase):
+
+    def test_case(self):
+        sleep(self.get_param_value('seconds'))
+
+
+class Point:
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+if __name__ == '__main__':
+    test_case_01 = TestCase01(('seconds',), (0.1,))
+    test_case_02 = TestCase01(('seconds',), (0.2,))
+    assert get_test_case_key(test_case_01) == '__main__.TestCase01(0.1,)'
+    assert get_test_case_key(test_case_01) != get_test_case_key(test_case_02)
+    # 参数值的默认repr()包含内存地址，标识改用类名和实例属性，在不同进程中保持一致
+    test_case_03 = TestCase01(('seconds',), (Point(1, 2),))
+    assert get_test_case_key(test_case_03) == '__main__.TestCase01(Point(x=1, y=2),)'
+    test_case_04 = TestCase01(('seconds',), (({'b', 'a'}, TestCase01),))
+    assert get_test_case_key(test_case_04) == "__main__.TestCase01(({'a', 'b'}, __main__.TestCase01),)"
+
+    # 统计最近若干次执行的耗时
+    duration_history = DurationHistory('history_test.db', last_n=3, batch_size=2)
+    assert duration_history.get_mean(test_case_01) is None
+    for duration in (1.0, 2.0, 3.0, 4.0):
+        duration_history.record(test_case_01, duration)
+    assert duration_history.get_durations(test_case_01) == [2.0, 3.0, 4.0]
+    assert duration_history.get_last(test_case_01) == 4.0
+    assert duration_history.get_mean(test_case_01) == 3.0
+    assert duration_history.get_p95(test_case_01) == 4.0
+    assert duration_history.get_durations(test_case_02) == []
+    duration_history.close()
+
+    # 重新加载后耗时仍然存在
+    duration_history = DurationHistory('history_test.db', last_n=3)
+    assert duration_history.get_durations(test_case_01) == [2.0, 3.0, 4.0]
+    duration_history.close()
+    os.remove('history_test.db')
@@ -0,0 +1,82 @@
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from random import randint
+from threading import Thread
+
+from testauto import main
+from testauto.case import TestCase, TestCaseResult
+from testauto.histogram import LatencyHistogram
+from testauto.load import LoadTestRunner, LoadModel
+from testauto.task import DefaultTestTask
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(500 if self.path == '/error' else 200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+stub_server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+
+
+class TestCase01(TestCase):
+    title = '请求本地桩服务'
+    path = '/'
+
+    def setup(self):
+        self.connection = HTTPConnection(*stub_server.server_address)
+
+    def test_case(self):
+        self.connection.request('GET', self.path)
+        response = self.connection.getresponse()
+        response.read()
+        assert response.status == 200
+
+    def teardown(self):
+        self.connection.close()
+
+
+class TestCase02(TestCase01):
+    title = '请求出错'
+    path = '/error'
+
+
+if __name__ == '__main__':
+    # 直方图的百分位数误差不超过2 ** (1 - significant_bits)，可合并
+    values = [randint(0, 10 ** 9) for _ in range(10000)]
+    histogram_01 = LatencyHistogram()
+    histogram_02 = LatencyHistogram()
+    for value in values[:5000]:
+        histogram_01.record(value)
+    for value in values[5000:]:
+        histogram_02.record(value)
+    histogram_01.merge(histogram_02)
+    sorted_values = sorted(values)
+    assert abs(histogram_01.get_percentile(99) - sorted_values[9899]) <= sorted_values[9899] / 128
+    assert histogram_01.get_percentile(100) == sorted_values[-1]
+    assert LatencyHistogram.from_dict(histogram_01.to_dict()).counts == histogram_01.counts
+
+    Thread(target=stub_server.serve_forever, daemon=True).start()
+
+    # 封闭模型：4个工作者连续发起请求
+    test_task_01 = DefaultTestTask()
+    test_task_01.add_test_cases(TestCase01(), TestCase02())
+    main(test_task=test_task_01, test_runner=LoadTestRunner(duration=1.0), parallel=4)
+    load_result = test_task_01.test_cases[0].load_result
+    assert test_task_01.test_cases[0].result == TestCaseResult.PASS and load_result.requests > 0
+    assert test_task_01.test_cases[1].result == TestCaseResult.FAIL
+    assert test_task_01.test_cases[1].load_result.error_rate == 1.0
+
+    # 开放模型：每秒200次请求
+    test_task_02 = DefaultTestTask()
+    test_task_02.add_test_cases(TestCase01())
+    main(test_task=test_task_02, test_runner=LoadTestRunner(LoadModel.OPEN, duration=1.0, rate=200), parallel=4)
+    assert test_task_02.test_cases[0].load_result.requests == 200
@@ -0,0 +1,45 @@
+from time import sleep
+
+from testauto import main
+from testauto.case import TestCase
+from testauto.monitor import WorkerMonitor
+from testauto.runner import DefaultTestRunner, ExecutionMode
+from testauto.task import DefaultTestTask
+
+
+class TestCase01(TestCase):
+
+    def test_case(self):
+        sleep(1)
+
+
+class TestCase02(TestCase):
+
+    def test_case(self):
+        ...
+
+
+if __name__ == '__main__':
+    # 排队时间为从进入待执行队列到开始执行的时间
+    worker_monitor_01 = WorkerMonitor()
+    worker_monitor_01.start()
+    test_case_01 = TestCase02()
+    worker_monitor_01.submit([test_case_01])
+    usage_01 = worker_monitor_01.start_worker()
+    worker_monitor_01.start_run(usage_01, test_case_01)
+    worker_monitor_01.stop_run(usage_01, 0.5)
+    worker_monitor_01.stop()
+    assert usage_01.executed_count == 1 and usage_01.busy_time == 0.5
+    assert usage_01.queue_time >= 0.0 and usage_01.idle_time == 0.0
+
+    # 预取数量不能是负数
+    try:
+        DefaultTestRunner(prefetch=-1)
+        assert False
+    except ValueError:
+        pass
+
+    # 耗时较长的测试用例不会导致其它子进程空闲
+    # test_task_01 = DefaultTestTask()
+    # test_task_01.add_test_cases(TestCase01(), *[TestCase02() for _ in range(100)])
+    # main(test_task=test_task_01, parallel=2, execution_mode=ExecutionMode.PROCESS, worker_monitor=WorkerMonitor())
@@ -0,0 +1,222 @@
+"""
+框架开销基准测试：使用空测试用例组成的合成测试任务，分阶段测量testauto自身的耗时和内存峰值，并将结果保存为JSON文件。
+示例：
+python testauto_test/overhead_benchmark.py -s 1000 10000 100000 1000000 -p 1 8 -o overhead-benchmark.json
+python testauto_test/overhead_benchmark.py -s 1000 10000 -b overhead-benchmark.json
+指定-b/--baseline时与基线结果对比，任一阶段的耗时超过基线的threshold倍时退出码为1。
+"""
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stderr
+from io import StringIO
+from time import perf_counter, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testauto.case import TestCase, TestCaseResult  # noqa: E402
+from testauto.recorder import TestRecorder, DefaultTestRecorder  # noqa: E402
+from testauto.runner import DefaultTestRunner, StopStrategy, RetryStrategy  # noqa: E402
+from testauto.task import DefaultTestTask  # noqa: E402
+
+CASES_PER_FILE = 10000
+CLASSES_PER_FILE = 10
+MODULE_SRC = '''from testauto.case import TestCase
+from testauto.util import parameterized
+'''
+CLASS_SRC = '''
+
+@parameterized(('i',), [(i,) for i in range({count})])
+class NoOp{index}(TestCase):
+
+    def test_case(self):
+        pass
+'''
+
+
+class NullTestRecorder(TestRecorder):
+    """
+    不做任何记录的测试记录器，用于单独测量测试执行器的调度开销。
+    """
+
+    def start_run(self, test_case: TestCase):
+        pass
+
+    def stop_run(self, test_case: TestCase, result: TestCaseResult, result_detail=''):
+        pass
+
+    def calculate_test_result(self):
+        pass
+
+    def gen_test_report(self):
+        pass
+
+
+def gen_test_modules(path: str, size: int):
+    """
+    生成合成测试模块：每个文件包含CLASSES_PER_FILE个参数化的空测试用例类，共size个测试用例。
+    :param path: 目录
+    :param size: 测试用例数量
+    :return:
+    """
+    file_count = max(1, -(-size // CASES_PER_FILE))
+    class_count = file_count * CLASSES_PER_FILE
+    for file_index in range(file_count):
+        with open(os.path.join(path, f'overhead_{size}_{file_index}.py'), 'w', encoding='UTF-8') as file:
+            file.write(MODULE_SRC)
+            for class_index in range(CLASSES_PER_FILE):
+                index = file_index * CLASSES_PER_FILE + class_index
+                count = size // class_count + (1 if index < size % class_count else 0)
+                file.write(CLASS_SRC.format(count=count, index=index))
+
+
+def measure(stage, trace_memory: bool):
+    """
+    测量单个阶段
+    :param stage: 无参数的可调用对象
+    :param trace_memory: 是否测量内存峰值（开启后耗时不具参考价值）
+    :return: (耗时, 内存峰值)，未测量内存时内存峰值为None
+    """
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start_time = perf_counter()
+    stage()
+    duration = perf_counter() - start_time
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return duration, peak_memory
+
+
+def run_stages(path: str, size: int, parallels: list, trace_memory: bool) -> list:
+    """
+    依次执行各阶段：发现（包括导入模块和实例化）、实例化、调度执行（每个并行执行数量各一次）、记录、统计和生成测试报告。
+    :param path: 合成测试模块所在的目录
+    :param size: 测试用例数量
+    :param parallels: 并行执行数量
+    :param trace_memory: 是否测量内存峰值
+    :return: [(阶段, 并行执行数量, 耗时, 内存峰值)]
+    """
+    for module_name in [name for name in sys.modules if name.startswith(f'overhead_{size}_')]:
+        del sys.modules[module_name]
+    results = list()
+    test_task = DefaultTestTask()
+    results.append(('discovery', None, *measure(lambda: test_task.add_test_cases_by_paths(path), trace_memory)))
+    assert len(test_task.test_cases) == size
+    test_classes = list({type(test_case): None for test_case in test_task.test_cases})
+    instances = list()
+    results.append(('instantiation', None, *measure(
+        lambda: instances.extend(test_case for test_class in test_classes
+                                 for test_case in DefaultTestTask._gen_test_case_instances(test_class)),
+        trace_memory)))
+    del instances
+    for parallel in parallels:
+        test_runner = DefaultTestRunner()
+        results.append(('scheduling', parallel, *measure(
+            lambda: test_runner.run(test_task, NullTestRecorder(), StopStrategy.ALL_COMPLETED,
+                                    RetryStrategy.NOT_RERUN, 60, parallel), trace_memory)))
+    with redirect_stderr(StringIO()):
+        test_recorder = DefaultTestRecorder()
+        test_recorder.test_cases = test_task.test_cases
+
+        def record():
+            for test_case in test_task.test_cases:
+                test_recorder.start_run(test_case)
+                test_recorder.stop_run(test_case, TestCaseResult.PASS)
+
+        results.append(('recording', None, *measure(record, trace_memory)))
+        results.append(('calculation', None, *measure(test_recorder.calculate_test_result, trace_memory)))
+        test_recorder.end_time = test_recorder.start_time + 1
+        results.append(('report', None, *measure(test_recorder.gen_test_report, trace_memory)))
+    return results
+
+
+def benchmark(sizes: list, parallels: list, trace_memory: bool) -> list:
+    """
+    执行基准测试：先测量耗时，再单独测量内存峰值，避免tracemalloc影响耗时。
+    :param sizes: 测试用例数量
+    :param parallels: 并行执行数量
+    :param trace_memory: 是否测量内存峰值
+    :return: 结果列表
+    """
+    results = list()
+    cwd = os.getcwd()
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            module_path = os.path.join(tmp_dir, 'cases')
+            os.mkdir(module_path)
+            gen_test_modules(module_path, size)
+            os.chdir(tmp_dir)  # 测试报告写入临时目录
+            try:
+                timings = run_stages(module_path, size, parallels, False)
+                memories = run_stages(module_path, size, parallels, True) if trace_memory else None
+            finally:
+                os.chdir(cwd)
+        for i, (stage, parallel, duration, _) in enumerate(timings):
+            peak_memory = memories[i][3] if memories else None
+            results.append({
+                'size': size,
+                'stage': stage,
+                'parallel': parallel,
+                'seconds': round(duration, 6),
+                'per_case_us': round(duration / size * 1e6, 3),
+                'peak_memory': peak_memory,
+            })
+            memory = f'{peak_memory / 1024 / 1024:.1f}' if peak_memory is not None else '--'
+            print(f'{size:<10}{stage:<15}{parallel if parallel else "--":<10}{duration:<12.3f}'
+                  f'{duration / size * 1e6:<15.3f}{memory}')
+    return results
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> bool:
+    """
+    与基线结果对比
+    :param results: 本次结果
+    :param baseline_path: 基线结果的文件路径
+    :param threshold: 允许的耗时倍数
+    :return: 是否全部阶段均未超过阈值
+    """
+    with open(baseline_path, encoding='UTF-8') as file:
+        baseline = {(item['size'], item['stage'], item['parallel']): item for item in json.load(file)['results']}
+    passed = True
+    for item in results:
+        base = baseline.get((item['size'], item['stage'], item['parallel']))
+        if not base or not base['seconds']:
+            continue
+        ratio = item['seconds'] / base['seconds']
+        if ratio > threshold:
+            passed = False
+            print(f'耗时退化：{item["size"]}个测试用例的{item["stage"]}阶段（并行执行数量：{item["parallel"]}）'
+                  f'为基线的{ratio:.2f}倍')
+    return passed
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='overhead_benchmark')
+    parser.add_argument('-s', '--sizes', type=int, nargs='*', default=[1000, 10000, 100000, 1000000],
+                        help='测试用例数量。示例：-s 1000 10000')
+    parser.add_argument('-p', '--parallels', type=int, nargs='*', default=[1, 8], help='并行执行数量。示例：-p 1 8')
+    parser.add_argument('-o', '--output', default='overhead-benchmark.json', help='结果文件路径。')
+    parser.add_argument('-nm', '--no-memory', action='store_true', help='不测量内存峰值。')
+    parser.add_argument('-b', '--baseline', help='基线结果的文件路径。')
+    parser.add_argument('-th', '--threshold', type=float, default=1.2, help='允许的耗时倍数，默认为1.2。')
+    args = parser.parse_args()
+    print(f'{"用例数量":<10}{"阶段":<15}{"并行数量":<10}{"耗时（秒）":<12}{"单用例（微秒）":<15}内存峰值（MB）')
+    benchmark_results = benchmark(args.sizes, args.parallels, not args.no_memory)
+    with open(args.output, 'w', encoding='UTF-8') as output_file:
+        json.dump({
+            'timestamp': time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'results': benchmark_results,
+        }, output_file, ensure_ascii=False, indent=2)
+    if args.baseline and not compare(benchmark_results, args.baseline, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,55 @@
+from testauto import main
+from testauto.case import TestCase
+from testauto.profiler import Profiler, ProfileLevel, start_profile, stop_profile
+from testauto.task import DefaultTestTask
+
+
+class TestCase01(TestCase):
+    profile = True
+
+    def test_case(self):
+        data = [str(i) for i in range(100000)]
+        assert len(data) == 100000
+
+
+class TestCase02(TestCase):
+
+    def test_case(self):
+        ...
+
+
+if __name__ == '__main__':
+    # 声明了profile = True的测试用例始终测量时间和内存
+    assert Profiler().get_level(TestCase01()) == ProfileLevel.MEMORY
+    assert Profiler().get_level(TestCase02()) == ProfileLevel.NONE
+    assert Profiler(1.0).get_level(TestCase02()) == ProfileLevel.MEMORY
+    assert Profiler(1.0, trace_memory=False).get_level(TestCase02()) == ProfileLevel.TIME
+
+    # 测量内存
+    start = start_profile(ProfileLevel.MEMORY)
+    data = [str(i) for i in range(100000)]
+    profile_result = stop_profile(start)
+    assert profile_result.cpu_time > 0 and profile_result.peak_memory > 0 and profile_result.allocated_blocks > 0
+
+    # 只测量时间
+    start = start_profile(ProfileLevel.TIME)
+    profile_result = stop_profile(start)
+    assert profile_result.peak_memory is None and profile_result.allocated_blocks is None
+
+    # HTML测试报告展示资源消耗最多的测试用例
+    # test_task_01 = DefaultTestTask()
+    # test_task_01.add_test_cases(TestCase01(), TestCase02())
+    # main(test_task=test_task_01, profiler=Profiler(sample_rate=1.0))
+
+    # 串行执行时测量每个测试用例的内存
+    test_task_02 = DefaultTestTask()
+    test_task_02.add_test_cases(TestCase01(), TestCase01())
+    main(test_task=test_task_02, parallel=1)
+    assert all(test_case.profile_result.peak_memory > 0 for test_case in test_task_02.test_cases)
+
+    # 多线程并行执行时无法区分各个测试用例的内存分配，只测量时间
+    test_task_03 = DefaultTestTask()
+    test_task_03.add_test_cases(TestCase01(), TestCase01())
+    main(test_task=test_task_03, parallel=2)
+    assert all(test_case.profile_result.cpu_time > 0 and test_case.profile_result.peak_memory is None
+               for test_case in test_task_03.test_cases)
@@ -47,3 +47,10 @@ if __name__ == '__main__':
     test_recorder.end_time = time()
     test_recorder.calculate_test_result()
     test_recorder.gen_test_report()
+    # 没有命中缓存的测试用例时不显示缓存列
+    with open('test-report.html', encoding='UTF-8') as file:
+        assert '<th style="width: 5%">缓存</th>' not in file.read()
+    test_recorder.test_cases[0].cached = True
+    test_recorder.gen_test_report()
+    with open('test-report.html', encoding='UTF-8') as file:
+        assert '<th style="width: 5%">缓存</th>' in file.read()
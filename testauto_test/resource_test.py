@@ -0,0 +1,64 @@
+from time import sleep
+
+from testauto import main
+from testauto.case import TestCase
+from testauto.resource import ResourceManager
+from testauto.task import DefaultTestTask
+
+
+class TestCase01(TestCase):
+    resources = ('database',)
+
+    def test_case(self):
+        sleep(1)
+
+
+class TestCase02(TestCase):
+    resources = {'device': 1, 'license': 2}
+
+    def test_case(self):
+        sleep(1)
+
+
+class TestCase03(TestCase):
+
+    def test_case(self):
+        sleep(1)
+
+
+if __name__ == '__main__':
+    test_case_01 = TestCase01()
+    test_case_02 = TestCase02()
+    test_case_03 = TestCase03()
+    test_case_04 = TestCase01()
+    resource_manager = ResourceManager({'license': 3})
+    resource_manager.start([test_case_01, test_case_02, test_case_03, test_case_04])
+    assert resource_manager.get_capacity('database') == 1
+    assert resource_manager.get_capacity('license') == 3
+
+    # 不占用资源的测试用例直接执行
+    assert resource_manager.acquire(test_case_03, test_case_03)
+
+    # 互斥资源：第二个测试用例排队，第一个测试用例释放资源后被唤醒
+    assert resource_manager.acquire(test_case_01, test_case_01)
+    assert not resource_manager.acquire(test_case_04, test_case_04)
+    assert resource_manager.waiting_count == 1
+    assert resource_manager.release(test_case_01) == [test_case_04]
+    assert resource_manager.waiting_count == 0
+    assert resource_manager.acquire(test_case_04, test_case_04)
+    resource_manager.release(test_case_04)
+    resource_manager.stop()
+    assert resource_manager.usages['database'].acquired_count == 2
+    assert resource_manager.usages['database'].queued_count == 1
+
+    # 资源需求超过容量
+    try:
+        ResourceManager().start([test_case_02])
+        assert False
+    except ValueError:
+        pass
+
+    # 占用相同资源的测试用例排队执行，其它测试用例并行执行
+    # test_task_01 = DefaultTestTask()
+    # test_task_01.add_test_cases(TestCase01(), TestCase01(), TestCase02(), TestCase02(), TestCase03(), TestCase03())
+    # main(test_task=test_task_01, parallel=6, resource_manager=ResourceManager({'device': 2, 'license': 3}))
@@ -1,8 +1,10 @@
-from time import sleep
+import asyncio
+from time import perf_counter, sleep
 
 from testauto import main
-from testauto.case import TestCase, TestCasePriority
-from testauto.runner import StopStrategy, RetryStrategy
+from testauto.case import TestCase, TestCasePriority, TestCaseResult
+from testauto.fixture import Fixture
+from testauto.runner import StopStrategy, RetryStrategy, ExecutionMode, AsyncTestRunner
 from testauto.task import DefaultTestTask
 
 
@@ -42,6 +44,98 @@ class TestCase05(TestCase):
         ...
 
 
+# CPU密集型测试用例
+class TestCase06(TestCase):
+
+    def test_case(self):
+        assert sum(i * i for i in range(10 ** 7)) > 0
+
+
+# 异步测试用例
+class TestCase07(TestCase):
+
+    async def setup(self):
+        await asyncio.sleep(0.5)
+
+    async def test_case(self):
+        await asyncio.sleep(1)
+
+
+# 单独设置超时时间的测试用例
+class TestCase08(TestCase):
+    timeout = 1
+
+    def test_case(self):
+        sleep(60)
+
+
+# 可协作式提前结束的测试用例
+class TestCase09(TestCase):
+
+    def test_case(self):
+        for _ in range(60):
+            self.check_cancelled()
+            sleep(1)
+
+
+# setup、test_case和teardown在同一个事件循环中执行的异步测试用例
+class TestCase10(TestCase):
+
+    async def setup(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        await self.queue.put('data')
+
+    async def test_case(self):
+        assert asyncio.get_running_loop() is self.loop
+        assert await self.queue.get() == 'data'
+
+    async def teardown(self):
+        assert asyncio.get_running_loop() is self.loop
+
+
+# 可协作式提前结束的异步测试用例
+class TestCase11(TestCase):
+
+    async def test_case(self):
+        for _ in range(60):
+            self.check_cancelled()
+            await asyncio.sleep(1)
+
+
+events = []  # 执行过程中发生的事件
+
+
+class Fixture01(Fixture):
+
+    def setup(self):
+        pass
+
+    def teardown(self):
+        events.append('fixture-teardown')
+
+
+# 超时后仍在被放弃的工作线程中执行的测试用例
+class TestCase12(TestCase):
+    timeout = 1
+    resources = ('device',)
+    fixtures = (Fixture01,)
+    calls = 0
+
+    def test_case(self):
+        TestCase12.calls += 1
+        sleep(3)
+        events.append('hang-end')
+
+
+# 与超时的测试用例占用同一资源的测试用例
+class TestCase13(TestCase):
+    resources = ('device',)
+
+    def test_case(self):
+        events.append('device-start')
+
+
 if __name__ == '__main__':
     # 单线程和多线程执行测试用例
     # main()
@@ -63,3 +157,78 @@ if __name__ == '__main__':
     test_task_03 = DefaultTestTask()
     test_task_03.add_test_cases(TestCase01(), TestCase02())
     main(test_task=test_task_03, timeout=2)
+
+    # 超时后由新的工作线程继续执行其它测试用例，超时的测试用例不会立即重新执行，避免两个线程同时执行同一个测试用例
+    test_task_12 = DefaultTestTask()
+    test_task_12.add_test_cases(TestCase12(), TestCase05())
+    start_time = perf_counter()
+    main(test_task=test_task_12, retry_strategy=RetryStrategy.RERUN_NOW)
+    assert perf_counter() - start_time < 2.5
+    assert [test_case.result for test_case in test_task_12.test_cases] == [TestCaseResult.TIMEOUT, TestCaseResult.PASS]
+    assert TestCase12.calls == 1
+    sleep(3)  # 等待被放弃的工作线程返回
+    events.clear()
+
+    # 被放弃的工作线程返回后才释放超时的测试用例占用的资源和夹具
+    test_task_13 = DefaultTestTask()
+    test_task_13.add_test_cases(TestCase12(), TestCase13())
+    main(test_task=test_task_13, parallel=2)
+    assert [test_case.result for test_case in test_task_13.test_cases] == [TestCaseResult.TIMEOUT, TestCaseResult.PASS]
+    assert events.index('hang-end') < events.index('device-start')
+    assert events.index('hang-end') < events.index('fixture-teardown')
+
+    # 多进程执行测试用例
+    # test_task_04 = DefaultTestTask()
+    # test_task_04.add_test_cases(TestCase06(), TestCase06(), TestCase06(), TestCase06())
+    # main(test_task=test_task_04, parallel=4, execution_mode=ExecutionMode.PROCESS)
+
+    # 异步执行测试用例
+    # test_task_05 = DefaultTestTask()
+    # test_task_05.add_test_cases(*[TestCase07() for _ in range(10000)])
+    # main(test_task=test_task_05, test_runner=AsyncTestRunner(), parallel=10000, timeout=2)
+
+    # 强制终止超时的测试用例
+    # test_task_06 = DefaultTestTask()
+    # test_task_06.add_test_cases(TestCase08(), TestCase01())
+    # main(test_task=test_task_06, parallel=2, execution_mode=ExecutionMode.PROCESS)
+
+    # 满足终止策略后，正在执行的测试用例提前结束
+    # test_task_07 = DefaultTestTask()
+    # test_task_07.add_test_cases(TestCase09(), TestCase03())
+    # main(test_task=test_task_07, parallel=2, stop_strategy=StopStrategy.FIRST_NOT_PASS)
+
+    # 异步方法在同一个事件循环中执行
+    test_task_08 = DefaultTestTask()
+    test_task_08.add_test_cases(TestCase10(), TestCase10())
+    main(test_task=test_task_08)
+    assert all(test_case.result == TestCaseResult.PASS for test_case in test_task_08.test_cases)
+
+    # 异步测试执行器中的普通方法在线程池中并发执行，线程数量为parallel且不超过max_threads
+    test_task_09 = DefaultTestTask()
+    test_task_09.add_test_cases(*[TestCase01() for _ in range(40)])
+    start_time = perf_counter()
+    main(test_task=test_task_09, test_runner=AsyncTestRunner(), parallel=40, timeout=20)
+    assert perf_counter() - start_time < 5
+    assert all(test_case.result == TestCaseResult.PASS for test_case in test_task_09.test_cases)
+    test_task_15 = DefaultTestTask()
+    test_task_15.add_test_cases(*[TestCase01() for _ in range(20)])
+    start_time = perf_counter()
+    main(test_task=test_task_15, test_runner=AsyncTestRunner(max_threads=10), parallel=1000, timeout=20)
+    assert 2 <= perf_counter() - start_time < 5
+    assert all(test_case.result == TestCaseResult.PASS for test_case in test_task_15.test_cases)
+
+    # 满足终止策略后通过check_cancelled()提前结束的测试用例记为未执行，正常执行完毕的测试用例仍记为成功
+    test_task_10 = DefaultTestTask()
+    test_task_10.add_test_cases(TestCase09(), TestCase03())
+    main(test_task=test_task_10, parallel=2, stop_strategy=StopStrategy.FIRST_NOT_PASS)
+    assert [test_case.result for test_case in test_task_10.test_cases] == \
+           [TestCaseResult.NOT_EXECUTED, TestCaseResult.FAIL]
+    test_task_11 = DefaultTestTask()
+    test_task_11.add_test_cases(TestCase11(), TestCase03())
+    main(test_task=test_task_11, test_runner=AsyncTestRunner(), parallel=2, stop_strategy=StopStrategy.FIRST_NOT_PASS)
+    assert [test_case.result for test_case in test_task_11.test_cases] == \
+           [TestCaseResult.NOT_EXECUTED, TestCaseResult.FAIL]
+    test_task_14 = DefaultTestTask()
+    test_task_14.add_test_cases(TestCase02(), TestCase03())
+    main(test_task=test_task_14, parallel=2, stop_strategy=StopStrategy.FIRST_NOT_PASS)
+    assert [test_case.result for test_case in test_task_14.test_cases] == [TestCaseResult.PASS, TestCaseResult.FAIL]
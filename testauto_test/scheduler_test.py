@@ -0,0 +1,60 @@
+import os
+
+from testauto.case import TestCase, TestCasePriority
+from testauto.history import DurationHistory
+from testauto.scheduler import DefaultTestScheduler, LongestFirstTestScheduler
+
+
+class TestCase01(TestCase):
+    priority = TestCasePriority.P1
+
+    def test_case(self):
+        ...
+
+
+class TestCase02(TestCase):
+    priority = TestCasePriority.P0
+
+    def test_case(self):
+        ...
+
+
+class TestCase03(TestCase):
+    priority = TestCasePriority.P0
+
+    def test_case(self):
+        ...
+
+
+# 无历史记录
+class TestCase04(TestCase):
+    priority = TestCasePriority.P0
+
+    def test_case(self):
+        ...
+
+
+if __name__ == '__main__':
+    test_case_01 = TestCase01()
+    test_case_02 = TestCase02()
+    test_case_03 = TestCase03()
+    test_case_04 = TestCase04()
+    test_cases = [test_case_01, test_case_02, test_case_03, test_case_04]
+    duration_history = DurationHistory('scheduler_test.db')
+    duration_history.record(test_case_01, 30.0)
+    duration_history.record(test_case_02, 10.0)
+    duration_history.record(test_case_03, 5.0)
+
+    # 按添加顺序
+    assert DefaultTestScheduler().schedule(test_cases) == test_cases
+
+    # 耗时最长优先：无历史记录的测试用例按平均耗时15秒估算
+    test_scheduler = LongestFirstTestScheduler(duration_history)
+    assert test_scheduler.schedule(test_cases) == [test_case_01, test_case_04, test_case_02, test_case_03]
+
+    # 优先级优先，同优先级耗时最长优先
+    test_scheduler = LongestFirstTestScheduler(duration_history, priority_first=True)
+    assert test_scheduler.schedule(test_cases) == [test_case_04, test_case_02, test_case_03, test_case_01]
+
+    duration_history.close()
+    os.remove('scheduler_test.db')
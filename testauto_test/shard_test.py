@@ -0,0 +1,72 @@
+import logging
+import os
+import tempfile
+
+from testauto.case import TestCase, TestCaseResult
+from testauto.history import DurationHistory
+from testauto.recorder import DefaultTestRecorder
+from testauto.shard import parse_shard, split_test_cases, dump_shard_result, merge_shard_results
+from testauto.task import DefaultTestTask
+from testauto.util import parameterized
+
+
+@parameterized(('duration',), [(i,) for i in range(10)])
+class TestCase01(TestCase):
+
+    def test_case(self):
+        ...
+
+
+if __name__ == '__main__':
+    assert parse_shard('2/20') == (2, 20)
+    try:
+        parse_shard('0/20')
+        assert False
+    except ValueError:
+        pass
+
+    test_task_01 = DefaultTestTask()
+    test_task_01.add_test_cases_by_classes('testauto_test.shard_test.TestCase01')
+    test_cases_01 = test_task_01.test_cases
+
+    # 无执行耗时历史时按哈希值划分，划分结果确定且各分片互不重复
+    shards_01 = split_test_cases(test_cases_01, 3)
+    assert shards_01 == split_test_cases(test_cases_01, 3)
+    assert sorted(map(id, sum(shards_01, []))) == sorted(map(id, test_cases_01))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 有执行耗时历史时按耗时均衡划分：总耗时45秒，各分片的总耗时接近15秒
+        duration_history_01 = DurationHistory(os.path.join(tmp_dir, 'history.db'))
+        for test_case in test_cases_01:
+            duration_history_01.record(test_case, test_case.duration)
+        shards_02 = split_test_cases(test_cases_01, 3, duration_history_01)
+        assert sorted(sum(test_case.duration for test_case in shard) for shard in shards_02) == [14, 15, 16]
+        duration_history_01.close()
+
+        # 合并各分片结果
+        paths = list()
+        for index, shard in enumerate(shards_02, 1):
+            test_recorder = DefaultTestRecorder()
+            test_recorder.test_cases = shard
+            for test_case in shard:
+                test_case.result = TestCaseResult.PASS if test_case.duration else TestCaseResult.FAIL
+            paths.append(os.path.join(tmp_dir, f'testauto-shard-{index}-of-3.json'))
+            dump_shard_result(paths[-1], index, 3, test_recorder)
+        test_recorder_01 = merge_shard_results(*paths)
+        assert test_recorder_01.total_count == 10 and test_recorder_01.fail_count == 1
+
+        # 同一测试用例出现在多个分片中时给出警告
+        warnings = list()
+        handler = logging.Handler(logging.WARNING)
+        handler.emit = lambda record: warnings.append(record.getMessage())
+        logging.getLogger().addHandler(handler)
+        test_recorder = DefaultTestRecorder()
+        test_recorder.test_cases = shards_02[0]
+        dump_shard_result(paths[1], 2, 3, test_recorder)
+        merge_shard_results(*paths)
+        logging.getLogger().removeHandler(handler)
+        assert len(warnings) == 1 and f'{len(shards_02[0])}个测试用例出现在多个分片中' in warnings[0]
+
+    # 命令行执行第2个分片，各分片执行完毕后合并结果
+    # python -m testauto -m testauto_test/case_for_doc.py -sh 2/3 -dh testauto-history.db
+    # python -m testauto -ms testauto-shard-1-of-3.json testauto-shard-2-of-3.json testauto-shard-3-of-3.json
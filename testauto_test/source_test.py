@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import tempfile
+
+from testauto import main
+from testauto.case import TestCase, TestCaseResult
+from testauto.runner import DefaultTestRunner
+from testauto.source import CsvParamSource, JsonlParamSource
+from testauto.task import DefaultTestTask
+from testauto.util import parameterized
+
+data_dir = tempfile.mkdtemp()
+csv_file = os.path.join(data_dir, 'users.csv')
+jsonl_file = os.path.join(data_dir, 'users.jsonl')
+with open(csv_file, 'w', encoding='UTF-8', newline='') as file:
+    file.write('user_id,username,remark\r\n')
+    for user_id in range(3000):
+        remark = '"第一行\n第二行"' if user_id % 100 == 0 else f'备注{user_id}'
+        file.write(f'{user_id},user{user_id},{remark}\r\n')
+with open(jsonl_file, 'w', encoding='UTF-8') as file:
+    for user_id in range(3000):
+        file.write(json.dumps({'user_id': user_id, 'username': f'user{user_id}'}) + '\n')
+
+csv_source = CsvParamSource(csv_file, columns=('username', 'user_id'), converters={'user_id': int}, row_number=True)
+
+
+@parameterized(('username', 'user_id', 'row_number'), csv_source)
+class TestCase01(TestCase):
+    title = 'CSV参数值'
+
+    def test_case(self):
+        assert self.get_param_value('username') == f'user{self.user_id}'
+        assert self.user_id != 1500
+
+
+if __name__ == '__main__':
+    # 按列名选取列，引号中的换行符属于字段内容
+    rows = list(csv_source())
+    assert len(rows) == len(csv_source) == 3000
+    assert rows[0] == ('user0', 0, 0)
+    assert list(CsvParamSource(csv_file, columns=(2,))())[100] == ('第一行\n第二行',)
+
+    # 按行号读取和重建测试用例
+    assert csv_source.get_row(2999) == rows[2999]
+    assert csv_source.get_test_case(TestCase01, 1234).user_id == 1234
+
+    # 选取行号范围和分片
+    assert list(csv_source.select(1000, 1010)()) == rows[1000:1010]
+    assert sum((list(csv_source.shard(index, 3)()) for index in range(1, 4)), []) == rows
+
+    # JSONL文件默认选取第一行数据的全部键
+    jsonl_source = JsonlParamSource(jsonl_file)
+    assert jsonl_source.get_row(2000) == (2000, 'user2000')
+    assert len(jsonl_source.shard(2, 4)) == 750
+
+    # 作为惰性参数化的参数值，测试用例在执行时逐行生成
+    test_task_01 = DefaultTestTask()
+    test_task_01.add_test_cases_by_classes('__main__.TestCase01')
+    main(test_task=test_task_01, test_runner=DefaultTestRunner(), parallel=4)
+    assert len(test_task_01.test_cases) == 1 and test_task_01.test_cases[0].result == TestCaseResult.FAIL
+    assert test_task_01.test_cases[0].row_number == 1500
+
+    csv_source.close()
+    jsonl_source.close()
+    shutil.rmtree(data_dir)
@@ -1,6 +1,12 @@
-from testauto.case import TestCase, TestCasePriority
+import pickle
+import tracemalloc
 
+from testauto import main
+from testauto.case import TestCase, TestCasePriority
+from testauto.recorder import TestCaseRecord
+from testauto.runner import DefaultTestRunner
 from testauto.task import DefaultTestTask, TestCasePriorityShouldBe, OperationMethod
+from testauto.util import parameterized
 
 
 # P0、已完成
@@ -39,6 +45,27 @@ class TestCase04(TestCase):
         print('TestCase04')
 
 
+# 惰性参数化：参数值由生成器函数逐组产生
+@parameterized(('number',), lambda: ((number,) for number in range(LAZY_COUNT)))
+class TestCase05(TestCase):
+    priority = TestCasePriority.P1
+    completed = True
+
+    def test_case(self):
+        assert self.number != 7
+
+
+LAZY_COUNT = 100
+
+
+# 参数化、未完成：测试用例只引用共享的参数值元组，参数名title与类属性同名
+@parameterized(('number', 'title'), [(number, f'标题{number}') for number in range(10)])
+class TestCase06(TestCase):
+    completed = False
+
+    def test_case(self):
+        pass
+
 if __name__ == '__main__':
     # 添加单个测试用例
     test_task_01 = DefaultTestTask()
@@ -94,7 +121,7 @@ if __name__ == '__main__':
     # 过滤测试用例
     test_task_08 = DefaultTestTask()
     test_task_08.add_test_cases_by_modules('testauto_test.task_test')
-    assert len(test_task_08.test_cases) == 4
+    assert len(test_task_08.test_cases) == 14
     test_task_08.add_filter(TestCasePriorityShouldBe(OperationMethod.EQUAL, TestCasePriority.P0))
     test_task_08.filter_test_cases()
     assert len(test_task_08.test_cases) == 2
@@ -107,3 +134,54 @@ if __name__ == '__main__':
     test_task_09.clear_test_task()
     assert len(test_task_09.test_cases) == 0
     assert len(test_task_09.test_case_filters) == 0
+
+    # 惰性参数化的测试用例不会在添加时生成
+    test_task_10 = DefaultTestTask()
+    test_task_10.add_test_cases_by_classes('testauto_test.task_test.TestCase05')
+    assert len(test_task_10.test_cases) == 0 and len(test_task_10.lazy_test_cases) == 1
+    assert len(list(test_task_10.lazy_test_cases[0])) == 100
+
+    # 过滤和分片在生成测试用例时逐个生效
+    test_task_11 = DefaultTestTask()
+    test_task_11.add_test_cases_by_modules('testauto_test.task_test')
+    test_task_11.add_filter(TestCasePriorityShouldBe(OperationMethod.EQUAL, TestCasePriority.P0))
+    test_task_11.filter_test_cases()
+    assert len(list(test_task_11.lazy_test_cases[0])) == 0
+    test_task_12 = DefaultTestTask()
+    test_task_12.add_test_cases_by_classes('testauto_test.task_test.TestCase05')
+    test_task_12.shard(1, 3)
+    shard_01 = {test_case.number for test_case in test_task_12.lazy_test_cases[0]}
+    test_task_12.shard(2, 3)
+    shard_02 = {test_case.number for test_case in test_task_12.lazy_test_cases[0]}
+    assert shard_01 and shard_02 and not shard_01 & shard_02
+
+    # 执行成功的测试用例只保留测试用例记录，未执行成功的测试用例加入测试任务
+    test_task_13 = DefaultTestTask()
+    test_task_13.add_test_cases_by_classes('testauto_test.task_test.TestCase05')
+    test_runner_13 = DefaultTestRunner()
+    main(test_task=test_task_13, test_runner=test_runner_13, parallel=4)
+    assert test_runner_13.test_recorder.total_count == 100 and test_runner_13.test_recorder.pass_count == 99
+    assert [test_case.number for test_case in test_task_13.test_cases] == [7]
+    assert sum(isinstance(test_case, TestCaseRecord) for test_case in test_runner_13.test_recorder.test_cases) == 99
+
+    # 执行成功的测试用例只保留约200字节的测试用例记录
+    # LAZY_COUNT = 1000000
+    # test_task_14 = DefaultTestTask()
+    # test_task_14.add_test_cases_by_classes('__main__.TestCase05')
+    # tracemalloc.start()
+    # main(test_task=test_task_14, parallel=8)
+    # print(f'内存峰值：{tracemalloc.get_traced_memory()[1] / 1024 / 1024:.2f}MB')
+
+    # 共享的参数值：不复制参数值，也不修改测试用例类
+    test_task_15 = DefaultTestTask()
+    test_task_15.add_test_cases_by_classes('testauto_test.task_test.TestCase06')
+    test_case_15 = test_task_15.test_cases[3]
+    assert test_case_15.get_param_values() is getattr(type(test_case_15), '_param_values')[3]
+    assert 'number' not in vars(type(test_case_15)) and 'number' not in vars(test_case_15)
+    assert test_case_15.number == test_case_15.get_param_value('number') == 3
+    assert test_case_15.title == '标题3' and test_case_15.get_param_values() == (3, '标题3')
+    test_case_15.number = 30  # 重新赋值
+    assert test_case_15.get_param_value('number') == 30 and test_task_15.test_cases[4].number == 4
+    test_case_16 = pickle.loads(pickle.dumps(test_task_15.test_cases[5]))
+    assert test_case_16.get_param_value('number') == 5 and test_case_16.title == '标题5'
+    assert not hasattr(test_case_16, 'missing') and test_case_16.cached is False
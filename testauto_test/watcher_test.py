@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+from testauto import main
+from testauto.case import TestCaseResult
+from testauto.task import DefaultTestTask
+from testauto.watcher import TestWatcher
+
+CASE_SRC = '''from testauto.case import TestCase
+
+
+class {name}(TestCase):
+    title = '{name}'
+
+    def test_case(self):
+        ...
+'''
+
+LAZY_CASE_SRC = '''from testauto.case import TestCase
+from testauto.util import parameterized
+
+
+@parameterized(('number',), lambda: ((number,) for number in range(3)))
+class {name}(TestCase):
+    title = '{name}'
+
+    def test_case(self):
+        ...
+'''
+
+FAILED_LAZY_CASE_SRC = '''from testauto.case import TestCase
+from testauto.util import parameterized
+
+
+@parameterized(('number',), lambda: ((number,) for number in range(3)))
+class {name}(TestCase):
+    title = '{name}'
+
+    def test_case(self):
+        assert self.number != 1
+'''
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_name, name in (('watcher_case_01.py', 'TestCase01'), ('watcher_case_02.py', 'TestCase02')):
+            with open(os.path.join(tmp_dir, file_name), 'w', encoding='UTF-8') as file:
+                file.write(CASE_SRC.format(name=name))
+        test_task_01 = DefaultTestTask()
+        test_task_01.add_test_cases_by_paths(tmp_dir)
+        assert test_task_01.source_paths == [tmp_dir]
+        test_watcher_01 = TestWatcher(test_task_01)
+        # 文件未变化
+        assert test_watcher_01.poll() is None
+        # 只重新加载变化的模块，并执行其中的测试用例和此前未执行成功的测试用例
+        for test_case in test_task_01.test_cases:
+            test_case.result = TestCaseResult.PASS if test_case.title == 'TestCase01' else TestCaseResult.FAIL
+        with open(os.path.join(tmp_dir, 'watcher_case_03.py'), 'w', encoding='UTF-8') as file:
+            file.write(CASE_SRC.format(name='TestCase03'))
+        test_task_02 = test_watcher_01.poll()
+        assert sorted(test_case.title for test_case in test_task_02.test_cases) == ['TestCase02', 'TestCase03']
+        # 变化的模块中的惰性参数化测试用例同样重新执行
+        with open(os.path.join(tmp_dir, 'watcher_case_04.py'), 'w', encoding='UTF-8') as file:
+            file.write(LAZY_CASE_SRC.format(name='TestCase04'))
+        test_task_03 = test_watcher_01.poll()
+        assert [lazy_test_cases.test_case_class.__name__ for lazy_test_cases in test_task_03.lazy_test_cases] == \
+               ['TestCase04']
+        assert [test_case.number for test_case in test_task_03.lazy_test_cases[0]] == [0, 1, 2]
+
+    # 执行时未执行成功的惰性参数化测试用例，在其它模块变化后同样重新执行
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, 'watcher_case_05.py'), 'w', encoding='UTF-8') as file:
+            file.write(FAILED_LAZY_CASE_SRC.format(name='TestCase05'))
+        test_task_04 = DefaultTestTask()
+        test_task_04.add_test_cases_by_paths(tmp_dir)
+        test_watcher_02 = TestWatcher(test_task_04)
+        test_watcher_02.watch(lambda test_task: main(test_task=test_task), rounds=0)
+        with open(os.path.join(tmp_dir, 'watcher_case_06.py'), 'w', encoding='UTF-8') as file:
+            file.write(CASE_SRC.format(name='TestCase06'))
+        test_task_05 = test_watcher_02.poll()
+        assert sorted((test_case.title, getattr(test_case, 'number', None)) for test_case in test_task_05.test_cases) \
+               == [('TestCase05', 1), ('TestCase06', None)]
+
+    # 命令行执行监视模式，测试模块发生变化时自动执行受影响的测试用例
+    # python -m testauto -m testauto_test/case_for_doc.py -wa